@@ -0,0 +1,232 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+First request latency to each prewarmed upstream, measured against local TLS stand-in servers.
+
+Every upstream gets its own HTTPS stand-in behind a proxy that delays traffic by half the round trip time
+each way, so TLS handshakes cost what they would over a real network. DNS isn't part of it, the stand-ins are
+addressed by IP. The first request through :class:`core.Upstreams` is timed:
+
+- cold: nothing has connected yet, like the first ``rtfm`` after a restart.
+- prewarmed: after :meth:`core.Upstreams.warm_all`, what the bot does after ``setup_hook``.
+- idle: prewarmed, then idle for longer than the keep-alive timeout.
+- kept warm: the same idle period, with the keep-warm requests the bot makes.
+
+Needs ``openssl`` on the PATH for a throwaway certificate. Run from a directory with a config.toml:
+``python -m benchmarks.first_request``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import pathlib
+import ssl
+import statistics
+import subprocess  # noqa: S404 # only runs openssl
+import tempfile
+import time
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+import core
+from core.upstreams import WARM_URLS
+
+if TYPE_CHECKING:
+    from multiprocessing.queues import Queue
+
+    from types_.config import Http
+
+UPSTREAMS = (*WARM_URLS, "snekbox")
+SCENARIOS = ("cold", "prewarmed", "idle", "kept warm")
+
+
+def _certificate(directory: pathlib.Path, /) -> tuple[pathlib.Path, pathlib.Path]:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(  # noqa: S603 # fixed arguments
+        [  # noqa: S607 # openssl from the PATH
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def _delay_line(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float, /) -> None:
+    # every chunk is forwarded ``delay`` seconds after it arrived, without holding up the chunks behind it.
+    pending: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue()
+
+    async def forward() -> None:
+        while True:
+            arrived, data = await pending.get()
+            await asyncio.sleep(max(arrived + delay - time.monotonic(), 0))
+            if not data:
+                writer.close()
+                return
+
+            writer.write(data)
+            await writer.drain()
+
+    forwarding = asyncio.create_task(forward())
+    try:
+        while data := await reader.read(65536):
+            pending.put_nowait((time.monotonic(), data))
+    except ConnectionError:
+        pass
+    finally:
+        pending.put_nowait((time.monotonic(), b""))
+        await forwarding
+
+
+async def _proxy(backend_port: int, rtt: float, /) -> asyncio.Server:
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        backend_reader, backend_writer = await asyncio.open_connection("127.0.0.1", backend_port)
+        await asyncio.gather(
+            _delay_line(client_reader, backend_writer, rtt / 2),
+            _delay_line(backend_reader, client_writer, rtt / 2),
+            return_exceptions=True,
+        )
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _ok(_: web.Request) -> web.Response:  # noqa: RUF029 # aiohttp handlers are coroutines
+    return web.Response(text="ok")
+
+
+def _measure(urls: dict[str, str], args: argparse.Namespace, results: Queue[dict[str, list[float]]], /) -> None:
+    # a short keep-alive timeout stands in for idle connections being dropped, the real ones are 15-30 seconds.
+    config: Http = {name: {"keepalive_timeout": args.keepalive} for name in urls}  # pyright: ignore[reportAssignmentType] # upstream names
+
+    async def first_request(upstreams: core.Upstreams, name: str) -> float:
+        start = time.perf_counter()
+        async with upstreams[name].get(urls[name]) as response:
+            await response.read()
+
+        return time.perf_counter() - start
+
+    async def keep_warm(upstreams: core.Upstreams) -> None:
+        while True:
+            await asyncio.sleep(args.interval)
+            await upstreams.warm_all(urls)
+
+    async def scenario(kind: str) -> dict[str, float]:
+        async with core.Upstreams(config) as upstreams:
+            if kind != "cold":
+                await upstreams.warm_all(urls)
+
+            if kind in {"idle", "kept warm"}:
+                keeping_warm = asyncio.create_task(keep_warm(upstreams)) if kind == "kept warm" else None
+                await asyncio.sleep(args.idle)
+                if keeping_warm:
+                    keeping_warm.cancel()
+
+            timings = await asyncio.gather(*(first_request(upstreams, name) for name in urls))
+            return dict(zip(urls, timings, strict=True))
+
+    async def run() -> dict[str, list[float]]:
+        measured: dict[str, list[float]] = {f"{name}/{kind}": [] for name in urls for kind in SCENARIOS}
+        for _ in range(args.repeat):
+            for kind in SCENARIOS:
+                for name, seconds in (await scenario(kind)).items():
+                    measured[f"{name}/{kind}"].append(seconds)
+
+        return measured
+
+    results.put(asyncio.run(run()))
+
+
+async def main(args: argparse.Namespace, /) -> dict[str, list[float]]:
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = _certificate(pathlib.Path(directory))
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_context.load_cert_chain(cert, key)
+
+        app = web.Application()
+        app.router.add_route("*", "/", _ok)
+        runner = web.AppRunner(app)
+        await runner.setup()
+
+        urls: dict[str, str] = {}
+        proxies: list[asyncio.Server] = []
+        for name in UPSTREAMS:
+            site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_context)
+            await site.start()
+            proxy = await _proxy(runner.addresses[-1][1], args.rtt)
+            proxies.append(proxy)
+            urls[name] = f"https://127.0.0.1:{proxy.sockets[0].getsockname()[1]}/"
+
+        # the measuring process trusts the certificate through the default SSL context, like it would a real one.
+        os.environ["SSL_CERT_FILE"] = str(cert)
+        context = multiprocessing.get_context("spawn")
+        results: Queue[dict[str, list[float]]] = context.Queue()
+        process = context.Process(target=_measure, args=(urls, args, results))
+        process.start()
+        try:
+            return await asyncio.to_thread(results.get)
+        finally:
+            await asyncio.to_thread(process.join)
+            for proxy in proxies:
+                proxy.close()
+
+            await runner.cleanup()
+
+
+def _run() -> None:
+    parser = argparse.ArgumentParser(description="First request latency to local stand-in upstreams.")
+    parser.add_argument("--rtt", type=float, default=0.05, help="simulated round trip time in seconds")
+    parser.add_argument("--keepalive", type=float, default=2.0, help="keep-alive timeout for idle connections")
+    parser.add_argument("--idle", type=float, default=3.0, help="idle time, longer than --keepalive")
+    parser.add_argument("--interval", type=float, default=1.0, help="keep-warm interval, shorter than --keepalive")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    measured = asyncio.run(main(args))
+
+    print(f"median of {args.repeat} runs, {args.rtt * 1e3:.0f}ms round trip")  # noqa: T201 # benchmark output
+    print(f"{'upstream':<12}" + "".join(f"{kind:>12}" for kind in SCENARIOS))  # noqa: T201 # benchmark output
+    for name in UPSTREAMS:
+        row = "".join(f"{statistics.median(measured[f'{name}/{kind}']) * 1e3:>10.1f}ms" for kind in SCENARIOS)
+        print(f"{name:<12}{row}")  # noqa: T201 # benchmark output
+
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,136 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+Event loop stall time while logging heavily, with the file and stream handlers attached directly
+(how LogHandler used to work) and behind a QueueHandler/QueueListener (how it works now).
+
+Run from a directory with a config.toml: ``python -m benchmarks.logging_stall``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import pathlib
+import queue
+import statistics
+import tempfile
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+
+from core.utils.logging import LocalQueueHandler
+
+MONITOR_INTERVAL = 0.001
+
+
+def _output_handlers(directory: pathlib.Path, max_bytes: int) -> list[logging.Handler]:
+    # the handlers LogHandler sets up, the stream goes to /dev/null so the terminal doesn't skew the numbers.
+    file_handler = RotatingFileHandler(directory / "bench.log", encoding="utf-8", maxBytes=max_bytes, backupCount=5)
+    file_handler.setFormatter(logging.Formatter("[{asctime}] [{levelname:<7}] {name}: {message}", style="{"))
+    stream_handler = logging.StreamHandler(open(os.devnull, "w", encoding="utf-8"))  # noqa: SIM115, PTH123 # closed with the handler
+    return [file_handler, stream_handler]
+
+
+async def _monitor(lags: list[float], done: asyncio.Event) -> None:
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(MONITOR_INTERVAL)
+        lags.append(max(time.perf_counter() - start - MONITOR_INTERVAL, 0.0))
+
+
+async def _log(logger: logging.Logger, records: int, calls: list[float]) -> None:
+    message = "x" * 200
+    for index in range(records):
+        start = time.perf_counter()
+        logger.info("record %d: %s", index, message)
+        calls.append(time.perf_counter() - start)
+
+        if index % 50 == 0:
+            await asyncio.sleep(0)  # let the monitor run, like the bot handling other events would
+
+
+def run(mode: str, /, *, records: int, max_bytes: int) -> tuple[list[float], list[float]]:
+    """Log ``records`` records from the event loop, returning the time each call took and the loop lag seen."""
+    logger = logging.getLogger(f"benchmark.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        handlers = _output_handlers(pathlib.Path(directory), max_bytes)
+        listener: QueueListener | None = None
+
+        if mode == "direct":
+            for handler in handlers:
+                logger.addHandler(handler)
+        else:
+            log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            logger.addHandler(LocalQueueHandler(log_queue))
+            listener = QueueListener(log_queue, *handlers)
+            listener.start()
+
+        async def main() -> tuple[list[float], list[float]]:
+            calls: list[float] = []
+            lags: list[float] = []
+            done = asyncio.Event()
+            monitor = asyncio.create_task(_monitor(lags, done))
+            await _log(logger, records, calls)
+            done.set()
+            await monitor
+            return calls, lags
+
+        try:
+            return asyncio.run(main())
+        finally:
+            if listener:
+                listener.stop()
+
+            for handler in handlers:
+                handler.close()
+
+            logger.handlers.clear()
+
+
+def _percentile(values: list[float], percentile: int, /) -> float:
+    return statistics.quantiles(values, n=100)[percentile - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event loop stall time while logging heavily, direct vs queued.")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--max-bytes", type=int, default=4 * 1024 * 1024, help="small enough to roll over a few times")
+    args = parser.parse_args()
+
+    print(f"{args.records} records, rolling over every {args.max_bytes / 1024 / 1024:.1f}MiB")  # noqa: T201 # benchmark output
+    print(f"{'mode':<8}{'p50 call':>10}{'p99 call':>10}{'max call':>10}{'blocked':>10}{'p99 lag':>10}{'max lag':>10}")  # noqa: T201 # benchmark output
+    for mode in ("direct", "queued"):
+        calls, lags = run(mode, records=args.records, max_bytes=args.max_bytes)
+        print(  # noqa: T201 # benchmark output
+            f"{mode:<8}{_percentile(calls, 50) * 1e6:>8.1f}us{_percentile(calls, 99) * 1e6:>8.1f}us"
+            f"{max(calls) * 1e3:>8.2f}ms{sum(calls) * 1e3:>8.0f}ms"
+            f"{_percentile(lags, 99) * 1e3:>8.2f}ms{max(lags) * 1e3:>8.2f}ms",
+        )
+
+
+if __name__ == "__main__":
+    main()
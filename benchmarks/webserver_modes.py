@@ -0,0 +1,242 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+Gateway event latency while the webserver is under HTTP load, with the webserver sharing the bot's event loop
+(``mode = "inline"``) and running in its own process (``mode = "process"``).
+
+A stand-in gateway in another process sends a timestamped event every few milliseconds and the bot side measures
+how late it gets to each one, first idle and then while a load generator posts modlog events to the webserver.
+The bot side consumes the modlog queue as it goes, like the moderation cog does.
+
+Uses [WEBSERVER], [DATABASE] and the pythonista token from config.toml, the modlog queue is emptied first
+so point it at a disposable database. Run from the directory with the config.toml:
+``python -m benchmarks.webserver_modes``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import asyncpg
+import uvicorn
+from aiohttp import web
+
+import core
+from core.modlog import ModLogQueue
+
+if TYPE_CHECKING:
+    from multiprocessing.queues import Queue
+
+MODLOG_EVENT = {
+    "moderation_event_type": 1,
+    "guild_id": 1,
+    "target_id": 2,
+    "author_id": 3,
+    "reason": "benchmark",
+    "event_time": "2024-01-01T00:00:00+00:00",
+}
+
+
+def _gateway(port: int, interval: float, /) -> None:
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async def send() -> None:
+            with contextlib.suppress(ConnectionError):
+                while not ws.closed:
+                    await ws.send_json({"sent": time.time()})
+                    await asyncio.sleep(interval)
+
+        sender = asyncio.create_task(send())
+        async for _ in ws:  # answers the client's close
+            pass
+
+        sender.cancel()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def _load(url: str, token: str, concurrency: int, seconds: float, results: Queue[dict[int, int]], /) -> None:
+    async def run() -> dict[int, int]:
+        statuses: dict[int, int] = {}
+        deadline = time.monotonic() + seconds
+
+        async def worker(session: aiohttp.ClientSession) -> None:
+            while time.monotonic() < deadline:
+                async with session.post(url, json=MODLOG_EVENT) as response:
+                    await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+
+        async with aiohttp.ClientSession(headers={"authorization": token}) as session:
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+
+        return statuses
+
+    results.put(asyncio.run(run()))
+
+
+async def _wait_for_port(host: str, port: int, /) -> None:
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            await asyncio.sleep(0.05)
+        else:
+            writer.close()
+            await writer.wait_closed()
+            return
+
+
+async def _gateway_latency(url: str, seconds: float, /) -> list[float]:
+    latencies: list[float] = []
+    deadline = time.monotonic() + seconds
+
+    async with aiohttp.ClientSession() as session, session.ws_connect(url) as ws:
+        async for message in ws:
+            latencies.append(time.time() - message.json()["sent"])
+            if time.monotonic() > deadline:
+                break
+
+    return latencies
+
+
+async def _consume(queue: ModLogQueue, stop: asyncio.Event, /) -> None:
+    while not stop.is_set():
+        await queue.wait(timeout=0.5)
+        while entries := await queue.claim(500, lease=60):
+            await queue.ack([entry.id for entry in entries])
+
+
+async def run(mode: str, /, *, seconds: float, concurrency: int, interval: float, gateway_port: int) -> dict[str, Any]:
+    """Measure gateway latency idle and under load in one webserver mode."""
+    webserver = core.CONFIG["WEBSERVER"]
+    url = f"http://{webserver['host']}:{webserver['port']}/dpy/modlog"
+    gateway_url = f"http://127.0.0.1:{gateway_port}/"
+    context = multiprocessing.get_context("spawn")
+
+    gateway = context.Process(target=_gateway, args=(gateway_port, interval), daemon=True)
+    gateway.start()
+
+    async with asyncpg.create_pool(core.CONFIG["DATABASE"]["dsn"]) as pool:
+        await pool.execute("TRUNCATE modlog_queue;")
+        queue = ModLogQueue(pool)
+        await queue.listen()
+        stop = asyncio.Event()
+        consumer = asyncio.create_task(_consume(queue, stop))
+
+        server: uvicorn.Server | None = None
+        serving: asyncio.Task[None] | None = None
+        process: asyncio.subprocess.Process | None = None
+        if mode == "inline":
+            from server.application import Application  # noqa: PLC0415 # starlette_plus is only imported when it's used
+
+            app = Application(bot=SimpleNamespace(modlog_queue=queue))  # pyright: ignore[reportArgumentType] # only the queue is used
+            server = uvicorn.Server(uvicorn.Config(app, host=webserver["host"], port=webserver["port"], log_level="warning"))
+            serving = asyncio.create_task(server.serve())
+        else:
+            process = await asyncio.create_subprocess_exec(sys.executable, "-m", "server")
+
+        try:
+            await _wait_for_port(webserver["host"], webserver["port"])
+            await _wait_for_port("127.0.0.1", gateway_port)
+
+            idle = await _gateway_latency(gateway_url, seconds)
+
+            results: Queue[dict[int, int]] = context.Queue()
+            load = context.Process(
+                target=_load,
+                args=(url, core.CONFIG["TOKENS"]["pythonista"], concurrency, seconds + 2, results),
+            )
+            load.start()
+            await asyncio.sleep(1)  # let the load generator get going
+            loaded = await _gateway_latency(gateway_url, seconds)
+            statuses = await asyncio.to_thread(results.get)
+            await asyncio.to_thread(load.join)
+        finally:
+            if server and serving:
+                server.should_exit = True
+                await serving
+
+            if process:
+                process.terminate()
+                await process.wait()
+
+            gateway.terminate()
+            stop.set()
+            await consumer
+            await queue.unlisten()
+
+    return {"idle": idle, "loaded": loaded, "statuses": statuses, "seconds": seconds + 2}
+
+
+def _summary(latencies: list[float], /) -> str:
+    percentiles = statistics.quantiles(latencies, n=100)
+    return f"{percentiles[49] * 1e3:>7.2f}ms{percentiles[98] * 1e3:>7.2f}ms{max(latencies) * 1e3:>8.2f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gateway event latency under HTTP load, inline vs process webserver.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="how long to measure for, idle and loaded")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent requests from the load generator")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between stand-in gateway events")
+    parser.add_argument("--gateway-port", type=int, default=8790)
+    parser.add_argument("--modes", nargs="+", choices=["inline", "process"], default=["inline", "process"])
+    args = parser.parse_args()
+
+    header = f"{'':<8}{'idle p50':>9}{'p99':>9}{'max':>10}{'load p50':>9}{'p99':>9}{'max':>10}{'req/s':>8}  statuses"
+    print(header)  # noqa: T201 # benchmark output
+    for mode in args.modes:
+        result = asyncio.run(
+            run(
+                mode,
+                seconds=args.seconds,
+                concurrency=args.concurrency,
+                interval=args.interval,
+                gateway_port=args.gateway_port,
+            ),
+        )
+        statuses = result["statuses"]
+        print(  # noqa: T201 # benchmark output
+            f"{mode:<8}{_summary(result['idle'])}{_summary(result['loaded'])}"
+            f"{sum(statuses.values()) / result['seconds']:>8.0f}  {statuses}",
+        )
+
+
+if __name__ == "__main__":
+    main()
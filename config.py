@@ -0,0 +1,113 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import tomllib
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, cast
+
+from types_.config import Config
+from types_.validation import validate
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+__all__ = (
+    "CONFIG",
+    "CONFIG_PATH",
+    "ConfigError",
+    "load",
+    "reload",
+    "snapshot",
+)
+
+
+CONFIG_PATH = pathlib.Path(os.environ.get("PYTHONISTABOT_CONFIG", "config.toml"))
+
+
+class ConfigError(Exception):
+    """The config file could not be read, or doesn't match :class:`types_.config.Config`."""
+
+
+def _freeze(value: Any, /) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})  # pyright: ignore[reportUnknownVariableType] # toml data
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)  # pyright: ignore[reportUnknownVariableType] # toml data
+    return value
+
+
+def load(path: pathlib.Path = CONFIG_PATH, /) -> Config:
+    """Parse and validate a config file, returning an immutable snapshot of it."""
+    try:
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        msg = f"Could not read {path}: {e}"
+        raise ConfigError(msg) from e
+
+    if errors := validate(Config, data):
+        msg = f"{path} is not valid:\n" + "\n".join(errors)
+        raise ConfigError(msg)
+
+    return _freeze(data)
+
+
+_snapshot: Config = load()
+
+
+def snapshot() -> Config:
+    """The current config, this object never changes even if the config is reloaded."""
+    return _snapshot
+
+
+def reload(path: pathlib.Path = CONFIG_PATH, /) -> Config:
+    """Load the config file again and swap it in, the current config is kept if the new one is invalid."""
+    global _snapshot  # noqa: PLW0603 # the single place the snapshot is swapped
+    _snapshot = load(path)
+    return _snapshot
+
+
+class _ConfigProxy(Mapping[str, Any]):
+    # lets ``CONFIG["..."]`` always read the latest snapshot, even where CONFIG was imported by name.
+    __slots__ = ()
+
+    def __getitem__(self, key: str, /) -> Any:
+        return _snapshot[key]  # pyright: ignore[reportUnknownVariableType] # TypedDict keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_snapshot)
+
+    def __len__(self) -> int:
+        return len(_snapshot)
+
+    def __repr__(self) -> str:
+        return f"<Config keys={list(_snapshot)!r}>"
+
+
+CONFIG: Config = cast("Config", _ConfigProxy())
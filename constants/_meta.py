@@ -25,22 +25,19 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, NoReturn, cast
 
-import toml
+from config import CONFIG
 
 if TYPE_CHECKING:
     from types_.config import Database, Logging, Tokens
 
 
-_config = toml.load("config.toml")
-
-
 class ConstantsMeta(type):
     def __new__(mcs, name: str, bases: tuple[type, ...], attrs: dict[str, Any]) -> type:
         if name == "CONSTANTS":
             return super().__new__(mcs, name, bases, attrs)
 
         try:
-            section = cast("Tokens | Database | Logging", _config[name.upper()])
+            section = cast("Tokens | Database | Logging", CONFIG[name.upper()])
         except KeyError:
             return super().__new__(mcs, name, bases, attrs)
 
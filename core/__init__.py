@@ -30,3 +30,10 @@ from .converters import *
 from .core import *
 from .enums import *
 from .errors import *
+from .gateway import *
+from .loader import *
+from .modlog import *
+from .papi import *
+from .resolver import *
+from .stats import *
+from .upstreams import *
@@ -23,58 +23,403 @@ SOFTWARE.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime
+import hashlib
 import json
+import logging
 import pathlib
+import signal
 import sys
 import textwrap
+import time
 import traceback
-from collections import deque
-from typing import TYPE_CHECKING, Any
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, NamedTuple
 
+import asyncpg
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+import config
 from constants import GUILD_ID
 
 from .context import Context
 from .core import CONFIG
+from .gateway import gateway_settings
+from .loader import LOADING_EXTENSION
+from .resolver import UserResolver
+from .stats import CommandStats
+from .upstreams import warm_urls
+from .utils.cache import TTLCache
+from .utils.fingerprint import ErrorAggregator, fingerprint
+from .utils.flight_recorder import FlightRecorder
+from .utils.listeners import ListenerStat, timed_listener
+from .utils.logging import LOG_CONTEXT
+from .utils.loop_monitor import LoopMonitor, LoopStall
+from .utils.metrics import UPSTREAM_WAIT, Counter, Gauge, Histogram, UpstreamWait
+from .utils.process import rss, uptime
 
 if TYPE_CHECKING:
-    from asyncio import Queue
-    from logging import LogRecord
+    from collections.abc import Callable, Coroutine, MutableMapping, Sized
 
     import aiohttp
-    import asyncpg
     import mystbin
     from discord.ext.commands.cog import Cog  # pyright: ignore[reportMissingTypeStubs] # stubs
 
+    from .gateway import GatewaySettings
+    from .modlog import ModLogQueue
+    from .upstreams import Upstreams
     from .utils import LogHandler
+    from .utils.cache import CacheStats
+    from .utils.logging import LogQueue
+
+
+# a DEBUG record with the latency of every command, for structured logs. See LogHandler for its level.
+COMMAND_LOGGER = logging.getLogger(f"{__name__}.commands")
+
+LOOP_MONITOR_INTERVAL = 0.1
+# repeats of an error within the window are counted rather than reported, and summarised every interval.
+ERROR_WINDOW = 300.0
+ERROR_SUMMARY_INTERVAL = 60.0
+# a slow listener is only warned about once per interval, every occurrence is still counted.
+SLOW_LISTENER_WARN_INTERVAL = 60.0
+# how often per command aggregates are written to the command_stats table.
+COMMAND_STATS_INTERVAL = 300.0
+# well within the keep-alive timeouts of our upstreams (and their servers), so one connection to each stays open.
+KEEP_WARM_INTERVAL = 20.0
+# gateway messages up to this size are decoded for the flight recorder, which covers every non-dispatch op.
+FLIGHT_RECORDER_DECODE_LIMIT = 512
+
+COMMAND_LATENCY = Histogram(
+    "command_seconds",
+    "Latency of command callbacks, once checks and conversion pass.",
+    ("command",),
+)
+COMMAND_UPSTREAM = Histogram(
+    "command_upstream_seconds",
+    "Time command callbacks spent waiting on outgoing HTTP requests.",
+    ("command",),
+)
+GATEWAY_LATENCY = Gauge("gateway_latency_seconds", "Latency between a gateway HEARTBEAT and its HEARTBEAT_ACK.")
+EVENT_LOOP_LAG = Gauge("event_loop_lag_seconds", "How late the event loop last woke up a sleeping task.")
+EVENT_LOOP_LAG_DISTRIBUTION = Histogram(
+    "event_loop_scheduling_lag_seconds",
+    "How late the event loop wakes up a sleeping task, sampled every 100ms.",
+)
+EVENT_LOOP_STALLS = Counter("event_loop_stalls", "Times the event loop was blocked for longer than the stall threshold.")
+LOGGING_QUEUE_DEPTH = Gauge("logging_queue_depth", "Log records waiting to be sent to the logging webhook.")
+LOGGING_DROPPED = Gauge("logging_records_dropped", "Log records dropped by the logging queue's overflow policy.")
+CACHE_SIZE = Gauge("cache_size", "Number of items held in the bot's caches.", ("cache",))
+GATEWAY_EVENTS = Counter("gateway_events", "Gateway events received, by event type.", ("event",))
+GATEWAY_EVENT_BYTES = Counter(
+    "gateway_event_bytes",
+    "Size of received gateway events, by event type. Only counted while the flight recorder is enabled.",
+    ("event",),
+)
+GATEWAY_PARSE_SECONDS = Counter(
+    "gateway_parse_seconds",
+    "Time spent parsing gateway events and dispatching them to listeners (synchronously), by event type.",
+    ("event",),
+)
+LISTENER_CALLS = Counter("event_listener_calls", "Listener invocations, by event.", ("event",))
+LISTENER_SECONDS = Counter(
+    "event_listener_seconds",
+    "Wall time spent in listeners (including awaits), by event.",
+    ("event",),
+)
+SLOW_LISTENER_STEPS = Counter(
+    "cog_listener_slow_steps",
+    "Synchronous steps of cog listeners that blocked the event loop past the threshold, by listener.",
+    ("listener",),
+)
+LIVE_VIEWS = Gauge("live_views", "Views currently attached to messages and listening for interactions.")
+
+
+# (start, upstream wait) of the command being invoked in this task, set by the before_invoke hook.
+_COMMAND_TIMING: ContextVar[tuple[float, UpstreamWait] | None] = ContextVar("_COMMAND_TIMING", default=None)
+
+
+class RegisteredCache(NamedTuple):
+    size: Callable[[], int]
+    owner: Cog | None
+    # hit and eviction counts, for caches that keep them.
+    stats: Callable[[], CacheStats] | None
 
 
 class Bot(commands.Bot):
     session: aiohttp.ClientSession
+    upstreams: Upstreams
     pool: asyncpg.Pool[asyncpg.Record]
     log_handler: LogHandler
     mb_client: mystbin.Client
-    logging_queue: Queue[LogRecord]
+    logging_queue: LogQueue
+    modlog_queue: ModLogQueue
 
     __slots__ = (
-        "_previous_websocket_events",
+        "_chunk_locks",
+        "_startup_reported",
+        "caches",
+        "cog_load_times",
+        "command_stats",
+        "error_aggregator",
+        "flight_recorder",
+        "gateway",
+        "listener_stats",
         "log_handler",
         "logging_queue",
+        "loop_monitor",
         "mb_client",
+        "modlog_queue",
         "pool",
+        "resolver",
         "session",
+        "slow_listener_threshold",
+        "started_at",
+        "upstreams",
     )
 
     def __init__(self) -> None:
+        debug_config = CONFIG.get("DEBUG", {})
+        self.flight_recorder: FlightRecorder | None = None
+        if (depth := debug_config.get("flight_recorder_depth", 1024)) > 0:
+            self.flight_recorder = FlightRecorder(depth, sample_rate=debug_config.get("flight_recorder_sample_rate", 100))
+
+        self.gateway: GatewaySettings = gateway_settings(CONFIG.get("GATEWAY", {}))
+
         super().__init__(
-            command_prefix=commands.when_mentioned_or(CONFIG["prefix"]),
-            intents=discord.Intents.all(),
+            command_prefix=self._prefix,
+            intents=self.gateway.intents,
+            member_cache_flags=self.gateway.member_cache_flags,
+            max_messages=self.gateway.max_messages,
+            chunk_guilds_at_startup=self.gateway.chunk_guilds_at_startup,
             allowed_mentions=discord.AllowedMentions.none(),
+            # the raw socket events are only needed to feed the flight recorder.
+            enable_debug_events=self.flight_recorder is not None,
+        )
+        self._chunk_locks: dict[int, asyncio.Lock] = {}
+        self._startup_reported: bool = False
+        self.error_aggregator: ErrorAggregator = ErrorAggregator(window=ERROR_WINDOW)
+        self.resolver: UserResolver = UserResolver(self)
+        self.cog_load_times: dict[str, float] = {}
+        self.command_stats: CommandStats = CommandStats()
+        self.listener_stats: dict[str, ListenerStat] = {}
+        self.slow_listener_threshold: float = debug_config.get("slow_listener_threshold", 0.05)
+        self.loop_monitor: LoopMonitor = LoopMonitor(
+            interval=LOOP_MONITOR_INTERVAL,
+            threshold=debug_config.get("loop_stall_threshold", 0.25),
+            on_lag=EVENT_LOOP_LAG_DISTRIBUTION.observe,
+            on_stall=self._on_loop_stall,
         )
-        self._previous_websocket_events: deque[Any] = deque(maxlen=10)
+        self.before_invoke(self._before_command)
+        self.after_invoke(self._after_command)
+
+        GATEWAY_LATENCY.set_function(lambda: self.latency)
+        EVENT_LOOP_LAG.set_function(lambda: self.loop_monitor.lag)
+        LOGGING_QUEUE_DEPTH.set_function(lambda: self.logging_queue.qsize())  # noqa: PLW0108 # the queue is assigned later
+        LOGGING_DROPPED.set_function(lambda: self.logging_queue.dropped)
+        LIVE_VIEWS.set_function(self._live_view_count)
+
+        self.caches: dict[str, RegisteredCache] = {}
+        self.register_cache("users", lambda: len(self.users))
+        self.register_cache("guilds", lambda: len(self.guilds))
+        self.register_cache("members", lambda: sum(len(guild.members) for guild in self.guilds))
+        self.register_cache("messages", lambda: len(self.cached_messages))
+        self.register_cache("views", self._live_view_count)
+        self.register_cache("resolved_users", self.resolver.cache)
+        self.register_cache("error_fingerprints", self.error_aggregator)
+        if self.flight_recorder is not None:
+            self.register_cache("flight_recorder", self.flight_recorder)
+
+        self.started_at: float = time.monotonic()
+        self._instrument_parsers()
+
+    def register_cache(self, name: str, cache: Sized | Callable[[], int], /, *, owner: Cog | None = None) -> None:
+        """Make a cache's size visible to the ``memory`` command and as the ``cache_size`` metric.
+
+        Caches owned by a cog are unregistered when it is removed.
+        """
+        size = cache if callable(cache) else cache.__len__
+        stats = cache.stats if isinstance(cache, TTLCache) else None
+        self.caches[name] = RegisteredCache(size, owner, stats)
+        CACHE_SIZE.labels(name).set_function(size)
+
+    def unregister_cache(self, name: str, /) -> None:
+        if self.caches.pop(name, None):
+            CACHE_SIZE.remove(name)
+
+    def _instrument_parsers(self) -> None:
+        # the gateway calls these synchronously for every DISPATCH, so this measures the CPU cost of each event type.
+        parsers: dict[str, Callable[[Any], None]] = self._connection.parsers  # pyright: ignore[reportPrivateUsage] # no public hook
+        for event, parser in parsers.items():
+            parsers[event] = self._timed_parser(event, parser)
+
+    def _timed_parser(self, event: str, parser: Callable[[Any], None], /) -> Callable[[Any], None]:
+        count = GATEWAY_EVENTS.labels(event)
+        cost = GATEWAY_PARSE_SECONDS.labels(event)
+        recorder = self.flight_recorder
+        received = GATEWAY_EVENT_BYTES.labels(event)
+
+        def timed(data: Any) -> None:
+            if recorder is not None:
+                # the gateway has decoded the message and set its sequence by now, the raw message was just recorded.
+                recorder.dispatched(event, self.ws.sequence)
+                if (size := recorder.last_size) >= 0:
+                    received.inc(size)
+
+            start = time.perf_counter()
+            try:
+                parser(data)
+            finally:
+                cost.inc(time.perf_counter() - start)
+                count.inc()
+
+        return timed
+
+    def _live_view_count(self) -> int:
+        return len(self._connection._view_store._synced_message_views)  # pyright: ignore[reportPrivateUsage] # no public equivalent
+
+    @staticmethod
+    def _prefix(bot: commands.Bot, message: discord.Message, /) -> list[str]:
+        # read on every message so a reloaded config can change it.
+        return commands.when_mentioned_or(CONFIG["prefix"])(bot, message)
+
+    async def setup_hook(self) -> None:
+        self.loop_monitor.start()
+        self.error_summary_loop.start()
+        self.command_stats_loop.start()
+
+        # the first iteration runs right away and doubles as the prewarm, so it doesn't hold up connecting.
+        self.keep_warm_loop.start()
+
+        # not available on Windows.
+        with contextlib.suppress(NotImplementedError, AttributeError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload_config)
+
+    def reload_config(self) -> None:
+        """Swap in a freshly parsed ``config.toml``, keeping the current one if the new file is invalid.
+
+        ``core.CONFIG`` reads from the new snapshot straight away, cogs that copied values out of it
+        can listen to ``on_config_reload`` to pick up changes.
+        """
+        try:
+            new = config.reload()
+        except config.ConfigError:
+            self.log_handler.log.exception("Could not reload the config, the current one is still in use.")
+            return
+
+        self.log_handler.info("Reloaded %s.", config.CONFIG_PATH)
+        self.dispatch("config_reload", new)
+
+    @tasks.loop(seconds=ERROR_SUMMARY_INTERVAL)
+    async def error_summary_loop(self) -> None:
+        for summary in self.error_aggregator.drain():
+            self.log_handler.warning(
+                "%s (fingerprint %s) was seen %d more time(s) in the last %d seconds.",
+                summary.title,
+                summary.fingerprint,
+                summary.count,
+                summary.window,
+            )
+
+    @tasks.loop(seconds=COMMAND_STATS_INTERVAL)
+    async def command_stats_loop(self) -> None:
+        await self._flush_command_stats()
+
+    async def _flush_command_stats(self) -> None:
+        try:
+            await self.command_stats.flush(self.pool)
+        except (asyncpg.PostgresError, OSError):
+            self.log_handler.log.exception("Could not write command stats.")
+
+    @tasks.loop(seconds=KEEP_WARM_INTERVAL)
+    async def keep_warm_loop(self) -> None:
+        results = await self.upstreams.warm_all(warm_urls(CONFIG))
+        if self.keep_warm_loop.current_loop > 0:
+            for result in results:
+                if result.error:
+                    self.log_handler.debug("Could not keep %s warm: %s", result.upstream, result.error)
+            return
+
+        lines = [f"{'Upstream':<12}{'First request':>15}  URL"]
+        for result in results:
+            first_request = f"{result.seconds * 1e3:.0f}ms" if not result.error else "failed"
+            lines.append(f"{result.upstream:<12}{first_request:>15}  {result.url}")
+            if result.error:
+                self.log_handler.warning("Could not prewarm %s (%s): %s", result.upstream, result.url, result.error)
+
+        self.log_handler.info("Prewarmed upstream connections:\n%s", "\n".join(lines))
+
+        # read once, so a reload can't change whether we keep going after already picking an interval.
+        interval = CONFIG.get("HTTP", {}).get("keep_warm_interval", KEEP_WARM_INTERVAL)
+        if interval > 0:
+            self.keep_warm_loop.change_interval(seconds=interval)
+        else:
+            self.keep_warm_loop.stop()
+
+    @staticmethod
+    def _is_lazy_stub(ctx: Context, /) -> bool:
+        # a stub invokes the real command itself, which is what gets measured and reported.
+        return ctx.command is not None and "lazy_extension" in ctx.command.extras
+
+    async def _before_command(self, ctx: Context, /) -> None:
+        if self._is_lazy_stub(ctx):
+            return
+
+        wait = UpstreamWait()
+        UPSTREAM_WAIT.set(wait)
+        _COMMAND_TIMING.set((time.perf_counter(), wait))
+
+    async def _after_command(self, ctx: Context, /) -> None:
+        timing = _COMMAND_TIMING.get()
+        if not timing or not ctx.command or self._is_lazy_stub(ctx):
+            return
+
+        start, wait = timing
+        elapsed = time.perf_counter() - start
+        name = ctx.command.qualified_name
+
+        # anything logged for this command from here on, like its error, carries the latency too.
+        if context := LOG_CONTEXT.get():
+            context["latency"] = round(elapsed, 6)
+        COMMAND_LOGGER.debug("Command %s finished in %.1fms.", name, elapsed * 1e3)
+
+        COMMAND_LATENCY.labels(name).observe(elapsed)
+        COMMAND_UPSTREAM.labels(name).observe(wait.seconds)
+        self.command_stats.record(
+            name,
+            elapsed,
+            upstream_seconds=wait.seconds,
+            upstream_requests=wait.requests,
+            failed=ctx.command_failed,
+        )
+
+    def _on_loop_stall(self, stall: LoopStall, /) -> None:
+        EVENT_LOOP_STALLS.inc()
+
+        # the same blocking code tends to stall the loop over and over, repeats are summarised like errors are.
+        key = hashlib.blake2b(stall.stack.encode(), digest_size=8).hexdigest()
+        if not self.error_aggregator.record(key, title="Event loop stall"):
+            return
+
+        self.log_handler.warning(
+            "The event loop was blocked for %.0fms (stall %s), it was running:\n%s",
+            stall.lag * 1e3,
+            key,
+            stall.stack,
+        )
+
+    async def invoke(self, ctx: Context, /) -> None:  # pyright: ignore[reportIncompatibleMethodOverride] # weird narrowing on Context generic
+        if not ctx.command:
+            return await super().invoke(ctx)
+
+        guild_id = ctx.guild and ctx.guild.id
+        token = LOG_CONTEXT.set({"command": ctx.command.qualified_name, "guild": guild_id, "channel": ctx.channel.id})
+        try:
+            await super().invoke(ctx)
+        finally:
+            LOG_CONTEXT.reset(token)
 
     async def get_context(
         self,
@@ -86,18 +431,160 @@ class Bot(commands.Bot):
         return await super().get_context(message, cls=Context)
 
     async def add_cog(self, cog: Cog, /, *, override: bool = False) -> None:  # pyright: ignore[reportIncompatibleMethodOverride] # weird narrowing on Context generic
+        self._time_listeners(cog)
+
         # we patch this since we're a single guild bot.
         # it allows for guild syncing only.
-        return await super().add_cog(cog, override=override, guild=discord.Object(id=GUILD_ID))
+        start = time.perf_counter()
+        try:
+            return await super().add_cog(cog, override=override, guild=discord.Object(id=GUILD_ID))
+        finally:
+            # this is mostly cog_load, reported per extension at startup.
+            extension = LOADING_EXTENSION.get() or cog.__module__
+            self.cog_load_times[extension] = self.cog_load_times.get(extension, 0.0) + time.perf_counter() - start
+
+    def _time_listeners(self, cog: Cog, /) -> None:
+        # listeners are looked up on the instance when the cog is injected (and ejected), so shadowing them is enough.
+        wrapped: set[str] = set()
+        for _, method_name in cog.__cog_listeners__:
+            if method_name in wrapped:
+                continue
+
+            name = f"{cog.qualified_name}.{method_name}"
+            stat = self.listener_stats[name] = ListenerStat(name)
+            listener = timed_listener(
+                getattr(cog, method_name),
+                stat,
+                threshold=self.slow_listener_threshold,
+                on_slow=self._on_slow_listener,
+            )
+            setattr(cog, method_name, listener)
+            wrapped.add(method_name)
+
+    def _on_slow_listener(self, stat: ListenerStat, elapsed: float, stack: str, /) -> None:
+        SLOW_LISTENER_STEPS.labels(stat.name).inc()
+
+        now = time.monotonic()
+        if now - stat.last_warned < SLOW_LISTENER_WARN_INTERVAL:
+            return
+
+        stat.last_warned = now
+        self.log_handler.warning(
+            "Listener %s blocked the event loop for %.1fms (%d time(s) so far), it was next suspended at:\n%s",
+            stat.name,
+            elapsed * 1e3,
+            stat.slow_steps,
+            stack,
+        )
+
+    async def remove_cog(self, name: str, /, **kwargs: Any) -> Cog | None:
+        cog = await super().remove_cog(name, **kwargs)
+        if cog:
+            for cache_name, cache in list(self.caches.items()):
+                if cache.owner is cog:
+                    self.unregister_cache(cache_name)
+
+        return cog
 
     async def on_ready(self) -> None:
         """On Bot ready - cache is built."""
         assert self.user
         self.log_handler.info("Online. Logged in as %s || %s", self.user.name, self.user.id)
 
-    async def on_socket_response(self, message: Any) -> None:
-        """Quick override to log websocket events."""
-        self._previous_websocket_events.append(message)
+        # on_ready fires again after a session is invalidated, only the first one says anything about startup.
+        if not self._startup_reported:
+            self._startup_reported = True
+            await asyncio.to_thread(self._startup_report)
+
+    def _startup_report(self) -> None:
+        path = self.log_handler.logging_path / "startup.jsonl"
+        # lazily loaded extensions change startup time and memory as much as the gateway profile does.
+        profile = f"{self.gateway.profile}+lazy" if CONFIG.get("lazy_extensions") else self.gateway.profile
+        report = {
+            "profile": profile,
+            "intents": self.intents.value,
+            "member_cache": self._connection.member_cache_flags.value,  # pyright: ignore[reportPrivateUsage] # no public equivalent
+            "max_messages": self.gateway.max_messages,
+            "chunk_guilds_at_startup": self.gateway.chunk_guilds_at_startup,
+            "time_to_ready": uptime(),
+            "rss": rss(),
+            "members": sum(len(guild.members) for guild in self.guilds),
+            "recorded_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        }
+
+        # the most recent startup of every profile, so a profile change can be compared against what it replaced.
+        latest: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    previous = json.loads(line)
+                    latest[previous["profile"]] = previous
+                except (ValueError, KeyError):
+                    continue
+
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+
+        latest[profile] = report
+        lines = [f"{'Profile':<15}{'Ready in':>10}{'RSS MiB':>10}{'Members':>10}  Recorded"]
+        for name, entry in sorted(latest.items()):
+            time_to_ready = "?" if entry["time_to_ready"] is None else f"{entry['time_to_ready']:.1f}s"
+            rss_mib = entry["rss"] / 1024**2
+            lines.append(f"{name:<15}{time_to_ready:>10}{rss_mib:>10.1f}{entry['members']:>10}  {entry['recorded_at']}")
+
+        self.log_handler.info("Startup report (%s profile):\n%s", profile, "\n".join(lines))
+
+    async def ensure_chunked(self, guild: discord.Guild, /) -> None:
+        """Make sure every member of the guild is cached, for the few places that need all of them (e.g. ``role.members``).
+
+        Guilds aren't chunked at startup unless the gateway profile asks for it, this chunks on first use instead.
+        """
+        if guild.chunked or not self.intents.members:
+            return
+
+        lock = self._chunk_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            if not guild.chunked:
+                await guild.chunk(cache=True)
+
+    def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
+        # the flight recorder is fed here rather than from listeners, so it doesn't cost a task per gateway event.
+        if self.flight_recorder is not None and event_name == "socket_raw_receive":
+            self._record_gateway_message(self.flight_recorder, args[0])
+        elif event_name in {"command", "command_completion"} and args and self._is_lazy_stub(args[0]):
+            return
+
+        super().dispatch(event_name, *args, **kwargs)
+
+    @staticmethod
+    def _record_gateway_message(recorder: FlightRecorder, raw: str | bytes, /) -> None:
+        # dispatched events are filled in by their parser, only sampled payloads and the small
+        # non-dispatch messages (heartbeat acks, hello, ...) are decoded a second time here.
+        size = len(raw)
+        sample = recorder.record(size)
+        if not sample and size > FLIGHT_RECORDER_DECODE_LIMIT:
+            return
+
+        try:
+            payload = discord.utils._from_json(raw)  # pyright: ignore[reportPrivateUsage] # orjson when it's installed
+        except ValueError:
+            return
+
+        recorder.fill(payload, sample=sample)
+
+    async def _run_event(
+        self,
+        coro: Callable[..., Coroutine[Any, Any, Any]],
+        event_name: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            LISTENER_SECONDS.labels(event_name).inc(time.perf_counter() - start)
+            LISTENER_CALLS.labels(event_name).inc()
 
     async def on_error(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
         exc_type, exception, traceback_ = sys.exc_info()
@@ -105,8 +592,14 @@ class Bot(commands.Bot):
         if isinstance(exception, commands.CommandInvokeError):
             return
 
+        # this is checked before any formatting, a hot listener failing repeatedly would otherwise be very expensive.
+        key = fingerprint(exception, scope=event_name) if exception else event_name
+        if not self.error_aggregator.record(key, title=f"Event Error in {event_name}"):
+            return
+
         embed = discord.Embed(title="Event Error", colour=discord.Colour.random())
         embed.add_field(name="Event", value=event_name)
+        embed.set_footer(text=f"Fingerprint: {key}")
 
         traceback_text = "".join(traceback.format_exception(exc_type, exception, traceback_))
 
@@ -130,7 +623,12 @@ class Bot(commands.Bot):
         if isinstance(error, (discord.Forbidden, discord.NotFound)):
             return
 
+        key = fingerprint(error, scope=ctx.command.qualified_name)
+        if not self.error_aggregator.record(key, title=f"Command Error in {ctx.command.qualified_name}"):
+            return
+
         embed = discord.Embed(title="Command Error", colour=0xCC3366)
+        embed.set_footer(text=f"Fingerprint: {key}")
         embed.add_field(name="Name", value=ctx.command.qualified_name)
         embed.add_field(name="Author", value=f"{ctx.author} (ID: {ctx.author.id})")
 
@@ -153,28 +651,11 @@ class Bot(commands.Bot):
         /,
         *,
         guild: discord.Guild | None = None,
-        cache: dict[int, discord.User | discord.Member] | None = None,
+        cache: MutableMapping[int, discord.User | discord.Member] | None = None,
+        refresh: bool = False,
     ) -> discord.User | discord.Member | None:
-        if guild:
-            user = guild.get_member(target_id)
-            if not user:
-                try:
-                    user = await guild.fetch_member(target_id)
-                except discord.HTTPException:
-                    return None
-
-            if cache:
-                cache[target_id] = user
-            return user
-
-        user = self.get_user(target_id)
-        if not user:
-            try:
-                user = await self.fetch_user(target_id)
-            except discord.HTTPException:
-                return None
-
-        if cache:
+        user = await self.resolver.resolve(target_id, guild=guild, refresh=refresh)
+        if user and cache is not None:
             cache[target_id] = user
 
         return user
@@ -183,18 +664,22 @@ class Bot(commands.Bot):
         try:
             await super().start(token=token, reconnect=reconnect)
         finally:
-            path = pathlib.Path("logs/prev_events.log")
+            if self.flight_recorder is not None:
+                path = pathlib.Path("logs/prev_events.log")
 
-            with path.open("w+", encoding="utf-8") as f:  # noqa: ASYNC230 # this is okay as we're in cleanup phase
-                for event in self._previous_websocket_events:
-                    try:
-                        last_log = json.dumps(event, ensure_ascii=True, indent=2)
-                    except (ValueError, TypeError):
-                        f.write(f"{event}\n")
-                    else:
-                        f.write(f"{last_log}\n")
+                with path.open("w+", encoding="utf-8") as f:  # noqa: ASYNC230 # this is okay as we're in cleanup phase
+                    f.write(self.flight_recorder.snapshot().format())
 
     async def close(self) -> None:
-        """Closes the Bot. It will also close the internal :class:`aiohttp.ClientSession`."""
-        await self.session.close()
+        """Closes the Bot. It also writes pending command stats and closes every upstream's HTTP session."""
+        self.loop_monitor.stop()
+        self.error_summary_loop.cancel()
+        self.command_stats_loop.cancel()
+        self.keep_warm_loop.cancel()
+
+        # the aggregates collected since the last iteration would otherwise be lost on every restart.
+        if not self.pool.is_closing():
+            await self._flush_command_stats()
+
+        await self.upstreams.close()
         await super().close()
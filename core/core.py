@@ -23,14 +23,9 @@ SOFTWARE.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
-import toml
 from discord.ext import commands
 
-if TYPE_CHECKING:
-    from types_.config import Config
-
+from config import CONFIG
 
 __all__ = (
     "CONFIG",
@@ -38,8 +33,5 @@ __all__ = (
 )
 
 
-CONFIG: Config = toml.load("config.toml")  # pyright: ignore[reportAssignmentType] # weirdly narrow library type
-
-
 class Cog(commands.Cog):
     HELP_THUMBNAIL: str = "https://i.imgur.com/J2FKHNW.png"
@@ -1,6 +1,9 @@
 from discord.enums import Enum
 
-__all__ = ("DiscordPyModerationEvent",)
+__all__ = (
+    "DiscordPyModerationEvent",
+    "PythonistaAPIOp",
+)
 
 
 class DiscordPyModerationEvent(Enum):
@@ -13,3 +16,16 @@ class DiscordPyModerationEvent(Enum):
     unmute = 7
     ungeneralblock = 8
     unhelpblock = 9
+
+
+class PythonistaAPIOp(Enum):
+    event = 0
+    heartbeat = 1
+    identify = 2
+    resume = 3
+    subscribe = 4
+    unsubscribe = 5
+    reconnect = 7
+    invalid_session = 9
+    hello = 10
+    heartbeat_ack = 11
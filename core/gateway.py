@@ -0,0 +1,118 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, TypeVar
+
+import discord
+
+if TYPE_CHECKING:
+    from types_.config import Gateway
+
+__all__ = (
+    "PROFILES",
+    "GatewaySettings",
+    "gateway_settings",
+)
+
+FlagsT = TypeVar("FlagsT", discord.Intents, discord.MemberCacheFlags)
+
+
+class GatewaySettings(NamedTuple):
+    profile: str
+    intents: discord.Intents
+    member_cache_flags: discord.MemberCacheFlags
+    max_messages: int | None
+    chunk_guilds_at_startup: bool
+
+
+def _full() -> GatewaySettings:
+    return GatewaySettings(
+        profile="full",
+        intents=discord.Intents.all(),
+        member_cache_flags=discord.MemberCacheFlags.all(),
+        max_messages=1000,
+        chunk_guilds_at_startup=True,
+    )
+
+
+def _lean() -> GatewaySettings:
+    # members are still cached as they're seen, but guilds are only chunked when something needs every member.
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = True
+    return GatewaySettings(
+        profile="lean",
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+        max_messages=250,
+        chunk_guilds_at_startup=False,
+    )
+
+
+def _minimal() -> GatewaySettings:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    return GatewaySettings(
+        profile="minimal",
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        max_messages=None,
+        chunk_guilds_at_startup=False,
+    )
+
+
+PROFILES = {
+    "full": _full,
+    "lean": _lean,
+    "minimal": _minimal,
+}
+
+
+def _flags(cls: type[FlagsT], names: list[str], /) -> FlagsT:
+    unknown = [name for name in names if name not in cls.VALID_FLAGS]
+    if unknown:
+        msg = f"Unknown {cls.__name__} flag(s) in the GATEWAY config: {', '.join(unknown)}"
+        raise ValueError(msg)
+
+    return cls(**dict.fromkeys(names, True))
+
+
+def gateway_settings(config: Gateway, /) -> GatewaySettings:
+    """Resolve the GATEWAY config section, explicit keys override the chosen profile."""
+    settings = PROFILES[config.get("profile", "full")]()
+
+    if (intents := config.get("intents")) is not None:
+        intents = _flags(discord.Intents, intents)
+        # the profile's member cache may need intents that are no longer requested.
+        settings = settings._replace(intents=intents, member_cache_flags=discord.MemberCacheFlags.from_intents(intents))
+    if (member_cache := config.get("member_cache")) is not None:
+        settings = settings._replace(member_cache_flags=_flags(discord.MemberCacheFlags, member_cache))
+    if "max_messages" in config:
+        # toml has no null, 0 disables the message cache.
+        settings = settings._replace(max_messages=config["max_messages"] or None)
+    if "chunk_guilds_at_startup" in config:
+        settings = settings._replace(chunk_guilds_at_startup=config["chunk_guilds_at_startup"])
+
+    return settings
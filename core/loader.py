@@ -0,0 +1,383 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import importlib
+import importlib.abc
+import importlib.util
+import inspect
+import logging
+import pathlib
+import sys
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from discord.ext import commands
+
+from .core import CONFIG
+from .utils.process import uptime
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+    from .bot import Bot
+
+
+__all__ = (
+    "LOADING_EXTENSION",
+    "ExtensionTiming",
+    "LazyCommand",
+    "LazyExtension",
+    "load_extensions",
+    "scan_lazy_extension",
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# the extension being loaded in this task, a package extension's cogs live in its submodules.
+LOADING_EXTENSION: ContextVar[str | None] = ContextVar("LOADING_EXTENSION", default=None)
+
+# decorators that need the extension loaded to work at all, their presence makes an extension load eagerly.
+_EAGER_DECORATORS = frozenset({"listener", "loop", "hybrid_command", "hybrid_group", "describe"})
+# these may only assign attributes, anything more (scheduling tasks, etc) is work that has to happen at startup.
+_EAGER_METHODS = frozenset({"cog_load", "__init__"})
+# a stub has none of the real command's checks, so help would list commands to people who can't use them.
+_CHECK_METHODS = frozenset({"cog_check", "bot_check", "bot_check_once"})
+# these only matter once the real command runs, anything else on a command is assumed to be a check.
+_STUB_SAFE_DECORATORS = frozenset({"command", "group", "cooldown", "dynamic_cooldown", "max_concurrency"})
+_PLAIN_STATEMENTS = (ast.Expr, ast.Assign, ast.AnnAssign, ast.Pass)
+
+
+class ExtensionTiming(NamedTuple):
+    name: str
+    import_: float
+    setup: float
+    cog_load: float
+
+    @property
+    def total(self) -> float:
+        return self.import_ + self.setup + self.cog_load
+
+
+class LazyCommand(NamedTuple):
+    name: str
+    aliases: list[str]
+    brief: str | None
+    help: str | None
+    hidden: bool
+
+
+class LazyExtension:
+    """An extension that is only imported and loaded once one of its commands is first used.
+
+    Until then, every top level prefix command it defines is registered as a stub that loads the extension
+    and invokes the real command in its place.
+    """
+
+    __slots__ = ("_lock", "commands", "name")
+
+    def __init__(self, name: str, commands: list[LazyCommand], /) -> None:
+        self.name: str = name
+        self.commands: list[LazyCommand] = commands
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def register(self, bot: Bot, /) -> None:
+        for lazy in self.commands:
+            bot.add_command(self._stub(lazy))
+
+    def _stub(self, lazy: LazyCommand, /) -> commands.Command[Any, ..., Any]:
+        # a plain function, discord.py would expect a bound method's signature to start with self.
+        async def stub(ctx: commands.Context[Any]) -> None:
+            await self._invoke(ctx)
+
+        return commands.Command(
+            stub,
+            name=lazy.name,
+            aliases=lazy.aliases,
+            brief=lazy.brief,
+            help=lazy.help,
+            hidden=lazy.hidden,
+            extras={"lazy_extension": self.name},
+        )
+
+    async def load(self, bot: Bot, /) -> None:
+        async with self._lock:
+            if self.name in bot.extensions:
+                return
+
+            for lazy in self.commands:
+                bot.remove_command(lazy.name)
+
+            start = time.perf_counter()
+            token = LOADING_EXTENSION.set(self.name)
+            try:
+                await bot.load_extension(self.name)
+            except Exception:
+                self.register(bot)
+                raise
+            finally:
+                LOADING_EXTENSION.reset(token)
+
+            LOGGER.info("Lazily loaded extension %s in %.1fms.", self.name, (time.perf_counter() - start) * 1e3)
+
+    async def _invoke(self, ctx: commands.Context[Any]) -> None:
+        bot: Bot = ctx.bot
+        await self.load(bot)
+
+        # parse the message again so the real command (and its converters) take over.
+        context = await bot.get_context(ctx.message)
+        if not context.command or "lazy_extension" in context.command.extras:
+            await ctx.send("Sorry, this command is currently unavailable.")
+            return
+
+        await bot.invoke(context)
+
+
+def _decorator_name(decorator: ast.expr, /) -> tuple[str | None, str | None]:
+    """The (object, attribute) of a decorator such as ``@commands.command(...)``."""
+    target = decorator.func if isinstance(decorator, ast.Call) else decorator
+    if isinstance(target, ast.Attribute):
+        return (target.value.id if isinstance(target.value, ast.Name) else None), target.attr
+    if isinstance(target, ast.Name):
+        return None, target.id
+    return None, None
+
+
+def _lazy_command(function: ast.AsyncFunctionDef, decorator: ast.Call, /) -> LazyCommand:
+    kwargs = {keyword.arg: keyword.value for keyword in decorator.keywords if keyword.arg}
+    # literal_eval raises ValueError for anything that isn't a literal, which makes the extension eager.
+    name = ast.literal_eval(decorator.args[0] if decorator.args else kwargs.get("name", ast.Constant(function.name)))
+    aliases = ast.literal_eval(kwargs["aliases"]) if "aliases" in kwargs else []
+    brief = ast.literal_eval(kwargs["brief"]) if "brief" in kwargs else None
+    hidden = ast.literal_eval(kwargs["hidden"]) if "hidden" in kwargs else False
+    docstring = ast.get_docstring(function)
+
+    return LazyCommand(name or function.name, list(aliases), brief, docstring and inspect.cleandoc(docstring), bool(hidden))
+
+
+def _assigned(node: ast.stmt, name: str, /) -> ast.expr | None:
+    if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == name for target in node.targets):
+        return node.value
+
+    return None
+
+
+def _opts_out(node: ast.stmt, /) -> bool:
+    if (lazy := _assigned(node, "LAZY")) is not None:
+        return not (isinstance(lazy, ast.Constant) and lazy.value)
+
+    # setup adds nothing without this config section, stubs would only show up in help and then fail.
+    if (section := _assigned(node, "REQUIRES_CONFIG")) is not None:
+        return not (isinstance(section, ast.Constant) and isinstance(section.value, str) and CONFIG.get(section.value))
+
+    return False
+
+
+def scan_lazy_extension(name: str, /) -> LazyExtension | None:
+    """Read an extension's source, without importing it, to find out whether it can be loaded lazily.
+
+    Extensions with listeners, task loops, app commands, checks, setup work in ``__init__``/``cog_load``, or no prefix
+    commands at all are loaded eagerly, as are those that set ``LAZY = False`` and those whose ``REQUIRES_CONFIG``
+    section is missing from the config.
+    """
+    spec = importlib.util.find_spec(name)
+    if not spec or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+
+    tree = ast.parse(pathlib.Path(spec.origin).read_text(encoding="utf-8"))
+    found: list[LazyCommand] = []
+
+    for node in tree.body:
+        if _opts_out(node):
+            return None
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        for item in node.body:
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if item.name in _CHECK_METHODS:
+                return None
+            if item.name in _EAGER_METHODS and not all(isinstance(stmt, _PLAIN_STATEMENTS) for stmt in item.body):
+                return None
+
+            command: ast.Call | None = None
+            for decorator in item.decorator_list:
+                owner, attribute = _decorator_name(decorator)
+                if attribute in _EAGER_DECORATORS or owner == "app_commands":
+                    return None
+                # subcommands (``@group.command``) come along with their parent.
+                if owner == "commands" and attribute in {"command", "group"} and isinstance(decorator, ast.Call):
+                    command = decorator
+
+            if command is None:
+                continue
+            if not isinstance(item, ast.AsyncFunctionDef) or any(
+                _decorator_name(decorator)[1] not in _STUB_SAFE_DECORATORS for decorator in item.decorator_list
+            ):
+                return None
+
+            try:
+                found.append(_lazy_command(item, command))
+            except (ValueError, TypeError, SyntaxError):
+                return None
+
+    return LazyExtension(name, found) if found else None
+
+
+def _preimport(name: str, /) -> tuple[float, tuple[str, ...]]:
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+
+    requires: tuple[str, ...] = tuple(getattr(module, "REQUIRES", ()))
+    return elapsed, requires
+
+
+class _Preimported(importlib.abc.Loader):
+    # hands discord.py the module imported by _preimport, instead of executing it a second time.
+    def __init__(self, module: ModuleType, /) -> None:
+        self.module: ModuleType = module
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType:
+        return self.module
+
+    def exec_module(self, module: ModuleType) -> None:
+        pass
+
+
+def _waves(requirements: dict[str, tuple[str, ...]], /, *, loaded: Sequence[str]) -> list[list[str]]:
+    waves: list[list[str]] = []
+    done = set(loaded)
+    remaining = dict(requirements)
+
+    while remaining:
+        wave = [name for name, requires in remaining.items() if done.issuperset(requires)]
+        if not wave:
+            msg = f"Unresolvable extension requirements: {remaining!r}"
+            raise RuntimeError(msg)
+
+        waves.append(wave)
+        done.update(wave)
+        for name in wave:
+            del remaining[name]
+
+    return waves
+
+
+async def _load(bot: Bot, name: str, /) -> float:
+    start = time.perf_counter()
+    token = LOADING_EXTENSION.set(name)
+    try:
+        module = sys.modules.get(name)
+        if module is None:
+            await bot.load_extension(name)
+        elif name in bot.extensions:
+            raise commands.ExtensionAlreadyLoaded(name)
+        else:
+            # module_from_spec replaces the module's spec with ours, later reloads need the real one.
+            original = module.__spec__
+            try:
+                # load_extension can only find a spec and execute it, this is the rest of what it does.
+                spec = importlib.util.spec_from_loader(name, _Preimported(module))
+                await bot._load_from_module_spec(spec, name)  # pyright: ignore[reportPrivateUsage, reportArgumentType] # no public way to load an imported module
+            finally:
+                module.__spec__ = original
+    finally:
+        LOADING_EXTENSION.reset(token)
+
+    return time.perf_counter() - start
+
+
+async def load_extensions(bot: Bot, names: Sequence[str], /, *, lazy: bool = False) -> list[ExtensionTiming]:
+    """Load extensions concurrently, logging how long each took to import, set up and run ``cog_load``.
+
+    Modules (and their dependencies) are imported in worker threads first. An extension that needs another
+    one loaded before it declares this with a module level ``REQUIRES`` tuple of extension names,
+    everything else is loaded at the same time.
+
+    With ``lazy``, extensions that :func:`scan_lazy_extension` allows only get command stubs for now.
+    """
+    start = time.perf_counter()
+
+    deferred: dict[str, LazyExtension] = {}
+    if lazy:
+        scanned = await asyncio.gather(*(asyncio.to_thread(scan_lazy_extension, name) for name in names))
+        deferred = {extension.name: extension for extension in scanned if extension}
+
+    eager = [name for name in names if name not in deferred]
+    imports: dict[str, tuple[float, tuple[str, ...]]] = {}
+    while pending := [name for name in eager if name not in imports]:
+        results = await asyncio.gather(*(asyncio.to_thread(_preimport, name) for name in pending))
+        imports.update(zip(pending, results, strict=True))
+
+        # anything an eager extension needs can't wait to be loaded lazily.
+        for _, requires in results:
+            eager.extend(name for name in requires if deferred.pop(name, None))
+
+    import_times = {name: elapsed for name, (elapsed, _) in imports.items()}
+    waves = _waves({name: requires for name, (_, requires) in imports.items()}, loaded=list(bot.extensions))
+
+    timings: list[ExtensionTiming] = []
+    for wave in waves:
+        results = await asyncio.gather(*(_load(bot, name) for name in wave), return_exceptions=True)
+
+        failed = [(name, result) for name, result in zip(wave, results, strict=True) if isinstance(result, BaseException)]
+        for name, error in failed:
+            LOGGER.error("Failed to load extension %s.", name, exc_info=error)
+        if failed:
+            raise failed[0][1]
+
+        for name, elapsed in zip(wave, results, strict=True):
+            assert isinstance(elapsed, float)
+            cog_load = bot.cog_load_times.get(name, 0.0)
+            timings.append(ExtensionTiming(name, import_times[name], elapsed - cog_load, cog_load))
+
+    lines = [f"{'Extension':<32}{'Import ms':>11}{'Setup ms':>10}{'Cog load ms':>13}{'Total ms':>10}"]
+    lines.extend(
+        f"{timing.name:<32}{timing.import_ * 1e3:>11.1f}{timing.setup * 1e3:>10.1f}"
+        f"{timing.cog_load * 1e3:>13.1f}{timing.total * 1e3:>10.1f}"
+        for timing in sorted(timings, key=lambda timing: timing.total, reverse=True)
+    )
+
+    for extension in deferred.values():
+        extension.register(bot)
+
+    since_start = uptime()
+    LOGGER.info(
+        "Loaded %d extension(s) in %d wave(s) and deferred %d, taking %.1fms (%s since process start):\n%s",
+        len(timings),
+        len(waves),
+        len(deferred),
+        (time.perf_counter() - start) * 1e3,
+        "?" if since_start is None else f"{since_start:.2f}s",
+        "\n".join(lines),
+    )
+
+    return timings
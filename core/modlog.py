@@ -0,0 +1,214 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import asyncpg
+from discord.backoff import ExponentialBackoff
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from types_.papi import ModLogPayload
+
+
+__all__ = (
+    "ModLogQueue",
+    "QueuedModLog",
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+# producers in other processes (the out of process webserver) wake the consumer through this channel.
+NOTIFY_CHANNEL = "modlog_queue"
+
+
+class QueuedModLog(NamedTuple):
+    id: int
+    payload: ModLogPayload
+    # how many times this has been claimed, including the current claim.
+    attempts: int
+
+
+class ModLogQueue:
+    """A durable queue of discord.py moderation log payloads, backed by the ``modlog_queue`` table.
+
+    Producers (the webserver) only pay for a single insert, consumers claim rows in batches
+    and rows are only deleted once they have been processed.
+    """
+
+    __slots__ = ("_depth", "_depth_checked_at", "_listener", "_relisten_task", "_wakeup", "pool")
+
+    # how long a counted queue depth is trusted for before we ask the database again.
+    DEPTH_TTL: float = 1.0
+
+    def __init__(self, pool: asyncpg.Pool[asyncpg.Record], /) -> None:
+        self.pool: asyncpg.Pool[asyncpg.Record] = pool
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._depth: int = 0
+        self._depth_checked_at: float = 0.0
+        self._listener: asyncpg.pool.PoolConnectionProxy[asyncpg.Record] | None = None
+        self._relisten_task: asyncio.Task[None] | None = None
+
+    async def put(self, payload: ModLogPayload, /) -> None:
+        await self.pool.execute(
+            "WITH inserted AS (INSERT INTO modlog_queue (payload) VALUES ($1::jsonb) RETURNING id) "
+            "SELECT pg_notify($2, '') FROM inserted;",
+            json.dumps(payload),
+            NOTIFY_CHANNEL,
+        )
+        self._depth += 1
+        self._wakeup.set()
+
+    async def put_many(self, payloads: list[ModLogPayload], /) -> None:
+        """Queue several payloads with a single statement."""
+        if not payloads:
+            return
+
+        await self.pool.execute(
+            "WITH inserted AS ("
+            "INSERT INTO modlog_queue (payload) SELECT payload::jsonb FROM unnest($1::text[]) AS payload RETURNING id"
+            ") SELECT pg_notify($2, '') FROM (SELECT 1 FROM inserted LIMIT 1) AS notified;",
+            [json.dumps(payload) for payload in payloads],
+            NOTIFY_CHANNEL,
+        )
+        self._depth += len(payloads)
+        self._wakeup.set()
+
+    async def depth(self) -> int:
+        """An approximate count of queued payloads, refreshed at most once every :attr:`DEPTH_TTL` seconds."""
+        now = time.monotonic()
+        if now - self._depth_checked_at > self.DEPTH_TTL:
+            self._depth = await self.pool.fetchval("SELECT COUNT(*) FROM modlog_queue;")
+            self._depth_checked_at = now
+
+        return self._depth
+
+    async def listen(self) -> None:
+        """Hold a connection open to be woken up by payloads queued from other processes.
+
+        If the connection is lost it is replaced, until :meth:`unlisten` is called or the pool is closed.
+        """
+        if self._listener:
+            return
+
+        listener = await self.pool.acquire()
+        listener.add_termination_listener(self._on_listener_terminated)
+        try:
+            await listener.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except BaseException:
+            listener.remove_termination_listener(self._on_listener_terminated)
+            await self.pool.release(listener)
+            raise
+
+        self._listener = listener
+
+    async def unlisten(self) -> None:
+        if self._relisten_task:
+            self._relisten_task.cancel()
+            self._relisten_task = None
+
+        if not self._listener:
+            return
+
+        listener, self._listener = self._listener, None
+        listener.remove_termination_listener(self._on_listener_terminated)
+        await listener.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+        await self.pool.release(listener)
+
+    def _on_listener_terminated(self, _: asyncpg.Connection[Any], /) -> None:
+        # the pool hands the dead connection's slot back itself, there is nothing to release.
+        self._listener = None
+        if self.pool.is_closing():
+            return
+
+        LOGGER.warning("Lost the modlog queue's LISTEN connection, reconnecting.")
+        # anything queued while we weren't listening is picked up by the next claim.
+        self._wakeup.set()
+        self._relisten_task = asyncio.create_task(self._relisten())
+
+    async def _relisten(self) -> None:
+        backoff = ExponentialBackoff()
+
+        while not self.pool.is_closing():
+            try:
+                await self.listen()
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                delay = backoff.delay()
+                LOGGER.warning("Could not listen on the modlog queue again (%s), retrying in %.2fs.", e, delay)
+                await asyncio.sleep(delay)
+            else:
+                LOGGER.info("Listening on the modlog queue again.")
+                return
+
+    def _on_notify(self, *_: object) -> None:
+        self._wakeup.set()
+
+    async def wait(self, *, timeout: float) -> None:
+        """Wait until something has been queued in this process, or until ``timeout`` seconds have passed."""
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+
+        self._wakeup.clear()
+
+    async def claim(self, limit: int, /, *, lease: float) -> list[QueuedModLog]:
+        """Hand out up to ``limit`` of the oldest queued payloads, hidden from other claims for ``lease`` seconds.
+
+        The claim is committed straight away, so no transaction (or row lock) is held while they are processed.
+        Entries that are not :meth:`ack`-ed before the lease runs out are handed out again.
+        """
+        rows = await self.pool.fetch(
+            "UPDATE modlog_queue SET available_at = NOW() + make_interval(secs => $2), attempts = attempts + 1 "
+            "WHERE id IN ("
+            "SELECT id FROM modlog_queue WHERE available_at <= NOW() ORDER BY id LIMIT $1 FOR UPDATE SKIP LOCKED"
+            ") RETURNING id, payload, attempts;",
+            limit,
+            lease,
+        )
+        entries = (QueuedModLog(row["id"], json.loads(row["payload"]), row["attempts"]) for row in rows)
+        return sorted(entries, key=lambda entry: entry.id)
+
+    async def ack(self, ids: Sequence[int], /) -> None:
+        """Remove processed entries from the queue."""
+        if ids:
+            await self.pool.execute("DELETE FROM modlog_queue WHERE id = ANY($1::bigint[]);", ids)
+            self._depth = max(self._depth - len(ids), 0)
+
+    async def retry(self, ids: Sequence[int], /, *, delay: float, max_delay: float) -> None:
+        """Hand entries that could not be processed out again later, ``delay`` seconds doubling with every attempt."""
+        if ids:
+            await self.pool.execute(
+                "UPDATE modlog_queue SET available_at = NOW() + "
+                "make_interval(secs => LEAST($2 * power(2, attempts - 1), $3)) WHERE id = ANY($1::bigint[]);",
+                ids,
+                delay,
+                max_delay,
+            )
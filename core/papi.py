@@ -0,0 +1,261 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from discord.backoff import ExponentialBackoff
+
+from types_.papi import ModLogPayload
+from types_.validation import validate
+
+from .enums import PythonistaAPIOp
+
+if TYPE_CHECKING:
+    from types_.papi import PythonistaAPIHelloPayload, PythonistaAPIWebsocketPayload
+
+    from .bot import Bot
+
+
+__all__ = ("PythonistaAPIWebsocket",)
+
+LOGGER = logging.getLogger(__name__)
+
+# event payloads are checked against these before they are dispatched, like the webserver does for webhooks.
+SUBSCRIPTION_PAYLOADS: dict[str, type] = {"dpy_modlog": ModLogPayload}
+
+
+class ReconnectWebsocket(Exception):
+    def __init__(self, *, resume: bool = True) -> None:
+        self.resume: bool = resume
+        super().__init__()
+
+
+class HandshakeFailed(Exception):
+    pass
+
+
+class PythonistaAPIWebsocket:
+    """A persistent websocket connection to the Pythonista API.
+
+    Events received for our subscriptions are dispatched on the bot as ``papi_<subscription>``,
+    the same events the webserver dispatches for pushed webhooks.
+
+    The connection sends heartbeats at the interval given in ``HELLO``, reconnects with exponential backoff
+    and resumes from the last sequence it saw so events sent while we were away are replayed.
+    """
+
+    def __init__(self, bot: Bot, /, *, url: str, token: str, subscriptions: list[str]) -> None:
+        self.bot: Bot = bot
+        self.url: str = url
+        self.subscriptions: set[str] = set(subscriptions)
+        self.sequence: int | None = None
+        self.latency: float = float("inf")
+
+        self.__token: str = token
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._last_heartbeat: float = 0.0
+        self._last_ack: float = 0.0
+        self._stopped: asyncio.Event = asyncio.Event()
+        self._heartbeat_task: asyncio.Task[None] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def send(self, op: PythonistaAPIOp, /, **data: Any) -> None:
+        if not self._ws:
+            return
+
+        await self._ws.send_json({"op": op.value, **data})
+
+    async def subscribe(self, *subscriptions: str) -> None:
+        self.subscriptions.update(subscriptions)
+        await self.send(PythonistaAPIOp.subscribe, subscriptions=list(subscriptions))
+
+    async def unsubscribe(self, *subscriptions: str) -> None:
+        self.subscriptions.difference_update(subscriptions)
+        await self.send(PythonistaAPIOp.unsubscribe, subscriptions=list(subscriptions))
+
+    async def connect(self) -> None:
+        """Connect and stay connected until :meth:`close` is called or the task is cancelled."""
+        backoff = ExponentialBackoff()
+        resume = False
+        self._stopped.clear()
+
+        while not self._stopped.is_set() and not self.bot.is_closed():
+            try:
+                async with self.bot.upstreams["papi"].ws_connect(self.url, heartbeat=None, autoping=True) as ws:
+                    self._ws = ws
+                    await self._run(ws, resume=resume)
+            except ReconnectWebsocket as e:
+                resume = e.resume and self.sequence is not None
+                if not e.resume:
+                    # identifying again straight away would spin if the server keeps invalidating us.
+                    await self._sleep(backoff.delay())
+                continue
+            except HandshakeFailed as e:
+                # the session itself wasn't rejected, so it's still worth resuming.
+                resume = self.sequence is not None
+                delay = backoff.delay()
+                LOGGER.warning("[PAPI] Websocket handshake failed (%s), retrying in %.2fs.", e, delay)
+                await self._sleep(delay)
+                continue
+            except (aiohttp.ClientError, TimeoutError, OSError) as e:
+                resume = self.sequence is not None
+                delay = backoff.delay()
+                LOGGER.warning("[PAPI] Websocket connection failed (%s), retrying in %.2fs.", e, delay)
+                await self._sleep(delay)
+                continue
+            except ValueError:
+                # a frame that isn't JSON, the events we've already handled are still good to resume from.
+                resume = self.sequence is not None
+                delay = backoff.delay()
+                LOGGER.exception("[PAPI] Received an invalid frame, reconnecting in %.2fs.", delay)
+                await self._sleep(delay)
+                continue
+            finally:
+                self._ws = None
+
+            if self._stopped.is_set():
+                break
+
+            # the server closed the connection on us
+            resume = self.sequence is not None
+            delay = backoff.delay()
+            LOGGER.warning("[PAPI] Websocket closed by the server, reconnecting in %.2fs.", delay)
+            await self._sleep(delay)
+
+    async def close(self) -> None:
+        """Disconnect and stop :meth:`connect` from reconnecting."""
+        self._stopped.set()
+        if self._ws:
+            await self._ws.close()
+
+    async def _sleep(self, delay: float, /) -> None:
+        # a backoff delay that ends early when we're closed.
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+
+    async def _hello(self, ws: aiohttp.ClientWebSocketResponse, /) -> float:
+        message = await ws.receive(timeout=30)
+        if message.type is not aiohttp.WSMsgType.TEXT:
+            msg = f"expected HELLO, got a {message.type.name} frame"
+            raise HandshakeFailed(msg)
+
+        hello: PythonistaAPIHelloPayload = message.json()
+        if not isinstance(hello, dict) or hello.get("op") != PythonistaAPIOp.hello.value:
+            msg = f"expected HELLO, got {hello!r}"
+            raise HandshakeFailed(msg)
+
+        interval = hello.get("heartbeat_interval")
+        if not isinstance(interval, int | float) or interval <= 0:
+            msg = f"invalid heartbeat interval in HELLO: {interval!r}"
+            raise HandshakeFailed(msg)
+
+        return interval / 1000
+
+    async def _run(self, ws: aiohttp.ClientWebSocketResponse, /, *, resume: bool) -> None:
+        interval = await self._hello(ws)
+
+        if resume:
+            await self.send(PythonistaAPIOp.resume, token=self.__token, sequence=self.sequence)
+        else:
+            self.sequence = None
+            await self.send(PythonistaAPIOp.identify, token=self.__token, subscriptions=sorted(self.subscriptions))
+
+        LOGGER.info("[PAPI] Websocket connected to %s (%s).", self.url, "resumed" if resume else "identified")
+
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(interval))
+        try:
+            async for message in ws:
+                if message.type is aiohttp.WSMsgType.TEXT:
+                    self._handle(message.json())
+                elif message.type is aiohttp.WSMsgType.ERROR:
+                    raise ws.exception() or ReconnectWebsocket()
+        finally:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    async def _heartbeat(self, interval: float, /) -> None:
+        self._last_ack = time.perf_counter()
+
+        while True:
+            await asyncio.sleep(interval)
+
+            if self._last_ack < self._last_heartbeat:
+                # the last heartbeat was never acknowledged, this connection is a zombie.
+                LOGGER.warning("[PAPI] Heartbeat was not acknowledged, reconnecting.")
+                if self._ws:
+                    await self._ws.close()
+                return
+
+            self._last_heartbeat = time.perf_counter()
+            await self.send(PythonistaAPIOp.heartbeat, sequence=self.sequence)
+
+    def _handle(self, data: PythonistaAPIWebsocketPayload[Any], /) -> None:
+        if not isinstance(data, dict):
+            LOGGER.warning("[PAPI] Ignoring a message that isn't an object: %r", data)
+            return
+
+        op = data.get("op")
+
+        if op == PythonistaAPIOp.event.value:
+            # the sequence moves past bad events too, so resuming doesn't replay them.
+            if (sequence := data.get("sequence")) is not None:
+                self.sequence = sequence
+
+            subscription = data.get("subscription")
+            if not isinstance(subscription, str) or "payload" not in data:
+                LOGGER.warning("[PAPI] Ignoring an event without a subscription or payload: %r", data)
+                return
+
+            payload_type = SUBSCRIPTION_PAYLOADS.get(subscription)
+            if payload_type and (errors := validate(payload_type, data["payload"])):
+                LOGGER.warning("[PAPI] Ignoring an invalid %s event: %s", subscription, "; ".join(errors))
+                return
+
+            self.bot.dispatch(f"papi_{subscription}", data["payload"])
+
+        elif op == PythonistaAPIOp.heartbeat_ack.value:
+            self._last_ack = time.perf_counter()
+            self.latency = self._last_ack - self._last_heartbeat
+
+        elif op == PythonistaAPIOp.heartbeat.value:
+            task = asyncio.create_task(self.send(PythonistaAPIOp.heartbeat, sequence=self.sequence))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        elif op == PythonistaAPIOp.reconnect.value:
+            raise ReconnectWebsocket(resume=True)
+
+        elif op == PythonistaAPIOp.invalid_session.value:
+            LOGGER.info("[PAPI] Session was invalidated, identifying again.")
+            raise ReconnectWebsocket(resume=False)
@@ -0,0 +1,214 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, TypeAlias
+
+import discord
+
+from .utils.cache import TTLCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .bot import Bot
+
+
+__all__ = ("UserResolver",)
+
+LOGGER = logging.getLogger(__name__)
+
+# the gateway will only look up this many members per request.
+QUERY_CHUNK_SIZE = 100
+
+_MISSING = object()
+
+ResolvedUser: TypeAlias = discord.User | discord.Member
+_Key: TypeAlias = tuple[int, int]
+
+
+class UserResolver:
+    """Resolves user ids to users (or members of a guild) with as few API calls as possible.
+
+    Concurrent lookups of the same id share a single request, ids the API reports as unknown are
+    remembered for ``negative_ttl`` seconds and fetched users are kept for ``ttl`` seconds.
+    Batches of members are looked up over the gateway, ``QUERY_CHUNK_SIZE`` ids at a time.
+    """
+
+    __slots__ = ("_bot", "_inflight", "_semaphore", "cache", "negative_ttl")
+
+    def __init__(
+        self,
+        bot: Bot,
+        /,
+        *,
+        maxsize: int = 1024,
+        ttl: float = 3600.0,
+        negative_ttl: float = 600.0,
+        concurrency: int = 4,
+    ) -> None:
+        self._bot: Bot = bot
+        # (guild id or 0, user id) -> user, a user of None is a known unknown.
+        self.cache: TTLCache[_Key, ResolvedUser | None] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: dict[_Key, asyncio.Future[ResolvedUser | None]] = {}
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self.negative_ttl: float = negative_ttl
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    @staticmethod
+    def _key(user_id: int, guild: discord.Guild | None) -> _Key:
+        return (guild.id if guild else 0, user_id)
+
+    def _remember(self, key: _Key, user: ResolvedUser | None, /) -> None:
+        self.cache.set(key, user, ttl=None if user else self.negative_ttl)
+
+    def _lookup(self, key: _Key, /) -> tuple[bool, ResolvedUser | None]:
+        user = self.cache.get(key, _MISSING)
+        if user is _MISSING:
+            return False, None
+
+        return True, user  # pyright: ignore[reportReturnType] # narrowed by the sentinel check above.
+
+    def get(self, user_id: int, /, *, guild: discord.Guild | None = None) -> ResolvedUser | None:
+        """Resolve from the bot's and our own cache only."""
+        user = guild.get_member(user_id) if guild else self._bot.get_user(user_id)
+        return user or self._lookup(self._key(user_id, guild))[1]
+
+    async def resolve(
+        self,
+        user_id: int,
+        /,
+        *,
+        guild: discord.Guild | None = None,
+        refresh: bool = False,
+    ) -> ResolvedUser | None:
+        """Resolve a user, or a member when ``guild`` is given. Returns ``None`` if they can't be found.
+
+        With ``refresh``, a user only we have cached is fetched again rather than served from our cache.
+        """
+        user = guild.get_member(user_id) if guild else self._bot.get_user(user_id)
+        if user:
+            return user
+
+        key = self._key(user_id, guild)
+        found, user = (False, None) if refresh else self._lookup(key)
+        if found:
+            return user
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = asyncio.create_task(self._fetch(key, user_id, guild))
+            future.add_done_callback(self._forget_inflight(key))
+
+        # a cancelled caller shouldn't cancel the lookup for everyone else waiting on it.
+        return await asyncio.shield(future)
+
+    def _forget_inflight(self, key: _Key, /) -> Callable[[asyncio.Future[ResolvedUser | None]], None]:
+        def callback(future: asyncio.Future[ResolvedUser | None]) -> None:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        return callback
+
+    async def _fetch(self, key: _Key, user_id: int, guild: discord.Guild | None, /) -> ResolvedUser | None:
+        async with self._semaphore:
+            try:
+                user = await guild.fetch_member(user_id) if guild else await self._bot.fetch_user(user_id)
+            except discord.NotFound:
+                user = None
+            except discord.HTTPException:
+                # transient, so not remembered.
+                return None
+
+        self._remember(key, user)
+        return user
+
+    async def resolve_many(
+        self,
+        user_ids: Iterable[int],
+        /,
+        *,
+        guild: discord.Guild | None = None,
+    ) -> dict[int, ResolvedUser]:
+        """Resolve many users (or members of ``guild``) at once, ids that can't be found are left out."""
+        resolved: dict[int, ResolvedUser] = {}
+        pending: list[int] = []
+
+        for user_id in dict.fromkeys(user_ids):
+            user = guild.get_member(user_id) if guild else self._bot.get_user(user_id)
+            if not user:
+                found, user = self._lookup(self._key(user_id, guild))
+                if found and not user:
+                    continue
+
+            if user:
+                resolved[user_id] = user
+            else:
+                pending.append(user_id)
+
+        if not pending:
+            return resolved
+
+        if guild and self._bot.intents.members:
+            # ids already being looked up are joined, the rest are queried in chunks.
+            loop = asyncio.get_running_loop()
+            to_query = [user_id for user_id in pending if self._key(user_id, guild) not in self._inflight]
+            queries: list[asyncio.Task[None]] = []
+            for chunk in discord.utils.as_chunks(to_query, QUERY_CHUNK_SIZE):
+                futures: dict[int, asyncio.Future[ResolvedUser | None]] = {}
+                for user_id in chunk:
+                    futures[user_id] = self._inflight[self._key(user_id, guild)] = loop.create_future()
+                queries.append(asyncio.create_task(self._query(guild, futures)))
+
+            waiting = [asyncio.shield(self._inflight[self._key(user_id, guild)]) for user_id in pending]
+            results = await asyncio.gather(*waiting)
+            await asyncio.gather(*queries)
+        else:
+            # there's no bulk endpoint for users, so these are (concurrency limited) individual fetches.
+            results = await asyncio.gather(*(self.resolve(user_id, guild=guild) for user_id in pending))
+
+        resolved.update((user_id, user) for user_id, user in zip(pending, results, strict=True) if user)
+
+        return resolved
+
+    async def _query(self, guild: discord.Guild, futures: dict[int, asyncio.Future[ResolvedUser | None]], /) -> None:
+        user_ids = list(futures)
+        members: dict[int, discord.Member] = {}
+        try:
+            result = await guild.query_members(user_ids=user_ids, limit=len(user_ids), cache=True)
+            members = {member.id: member for member in result}
+        except (TimeoutError, discord.HTTPException):
+            LOGGER.warning("Could not query %d member(s) of %s, they'll be looked up again.", len(user_ids), guild.id)
+        else:
+            for user_id in user_ids:
+                self._remember(self._key(user_id, guild), members.get(user_id))
+        finally:
+            for user_id, future in futures.items():
+                self._inflight.pop(self._key(user_id, guild), None)
+                if not future.done():
+                    future.set_result(members.get(user_id))
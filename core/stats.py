@@ -0,0 +1,139 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+from .utils.histogram import LatencyHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import asyncpg
+
+
+__all__ = (
+    "CommandStat",
+    "CommandStats",
+    "CommandStatsRow",
+)
+
+
+class CommandStat:
+    __slots__ = ("failures", "latency", "upstream_requests", "upstream_seconds")
+
+    def __init__(self) -> None:
+        self.latency: LatencyHistogram = LatencyHistogram()
+        self.failures: int = 0
+        self.upstream_seconds: float = 0.0
+        self.upstream_requests: int = 0
+
+    def record(self, seconds: float, upstream_seconds: float, upstream_requests: int, *, failed: bool) -> None:
+        self.latency.record(seconds)
+        self.failures += failed
+        self.upstream_seconds += upstream_seconds
+        self.upstream_requests += upstream_requests
+
+
+class CommandStatsRow(NamedTuple):
+    command: str
+    calls: int
+    failures: int
+    total_seconds: float
+    upstream_seconds: float
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+    max_seconds: float
+
+
+class CommandStats:
+    """Latency and usage of every command, since startup and for the current window.
+
+    The window is written to the ``command_stats`` table and started again by :meth:`flush`.
+    """
+
+    __slots__ = ("_total", "_window", "window_start")
+
+    def __init__(self) -> None:
+        self._total: dict[str, CommandStat] = {}
+        self._window: dict[str, CommandStat] = {}
+        self.window_start: datetime.datetime = datetime.datetime.now(datetime.UTC)
+
+    def record(
+        self,
+        command: str,
+        seconds: float,
+        /,
+        *,
+        upstream_seconds: float = 0.0,
+        upstream_requests: int = 0,
+        failed: bool = False,
+    ) -> None:
+        for stats in (self._total, self._window):
+            stat = stats.get(command) or stats.setdefault(command, CommandStat())
+            stat.record(seconds, upstream_seconds, upstream_requests, failed=failed)
+
+    def __iter__(self) -> Iterator[tuple[str, CommandStat]]:
+        """Every command's stats since startup."""
+        return iter(self._total.items())
+
+    async def flush(self, pool: asyncpg.Pool[asyncpg.Record], /) -> int:
+        """Write the current window's aggregates with a single insert and start a new window.
+
+        The window is started again even if the insert fails, its aggregates are then lost.
+        """
+        window, self._window = self._window, {}
+        window_start, self.window_start = self.window_start, datetime.datetime.now(datetime.UTC)
+        if not window:
+            return 0
+
+        rows = [
+            CommandStatsRow(
+                command,
+                stat.latency.count,
+                stat.failures,
+                stat.latency.total,
+                stat.upstream_seconds,
+                stat.latency.percentile(50),
+                stat.latency.percentile(95),
+                stat.latency.percentile(99),
+                stat.latency.max,
+            )
+            for command, stat in window.items()
+        ]
+
+        await pool.execute(
+            "INSERT INTO command_stats (command, window_start, window_end, calls, failures, total_seconds, "
+            "upstream_seconds, p50_seconds, p95_seconds, p99_seconds, max_seconds) "
+            "SELECT command, $1, $2, calls, failures, total_seconds, upstream_seconds, p50, p95, p99, max_seconds "
+            "FROM unnest($3::text[], $4::int[], $5::int[], $6::float8[], $7::float8[], $8::float8[], $9::float8[], "
+            "$10::float8[], $11::float8[]) "
+            "AS t(command, calls, failures, total_seconds, upstream_seconds, p50, p95, p99, max_seconds);",
+            window_start,
+            self.window_start,
+            *map(list, zip(*rows, strict=True)),
+        )
+        return len(rows)
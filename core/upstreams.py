@@ -0,0 +1,195 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import TYPE_CHECKING, NamedTuple, Self
+
+import aiohttp
+
+from .utils.metrics import Gauge, http_trace_config
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from types_.config import Config, Http, Upstream
+
+
+__all__ = (
+    "UPSTREAMS",
+    "UpstreamSettings",
+    "Upstreams",
+    "WarmResult",
+    "warm_urls",
+)
+
+LOGGER = logging.getLogger(__name__)
+
+DNS_CACHE_TTL = 300
+# commands wait on these hosts, so a connection to each is set up at startup and then kept alive.
+WARM_URLS = {
+    "github": "https://raw.githubusercontent.com/",
+    "idevision": "https://idevision.net/",
+    "mystbin": "https://mystb.in/",
+}
+
+UPSTREAM_WARM_SECONDS = Gauge(
+    "http_client_warm_seconds",
+    "Round trip of the last keep-warm request to each upstream, including any connection setup it needed.",
+    ("upstream",),
+)
+
+
+class UpstreamSettings(NamedTuple):
+    limit: int
+    limit_per_host: int
+    connect_timeout: float
+    # seconds between reads once connected, and for the whole request. None waits forever.
+    read_timeout: float | None
+    total_timeout: float | None
+    keepalive_timeout: float
+
+
+UPSTREAMS: dict[str, UpstreamSettings] = {
+    # webhooks and anything else that doesn't warrant its own pool.
+    "default": UpstreamSettings(10, 5, 10.0, 30.0, 60.0, 30.0),
+    # api.github.com and raw.githubusercontent.com
+    "github": UpstreamSettings(10, 5, 5.0, 15.0, 30.0, 30.0),
+    "idevision": UpstreamSettings(5, 5, 5.0, 15.0, 30.0, 30.0),
+    # evaluation itself can take a while.
+    "snekbox": UpstreamSettings(4, 4, 5.0, 30.0, 45.0, 30.0),
+    "badbin": UpstreamSettings(4, 2, 5.0, 15.0, 30.0, 15.0),
+    "mystbin": UpstreamSettings(4, 4, 5.0, 20.0, 30.0, 30.0),
+    # a single long lived websocket.
+    "papi": UpstreamSettings(2, 2, 10.0, None, None, 30.0),
+}
+
+
+class WarmResult(NamedTuple):
+    upstream: str
+    url: str
+    seconds: float
+    error: str | None
+
+
+def warm_urls(config: Config, /) -> dict[str, str]:
+    """The URL to keep a connection open to for each upstream the bot is configured to use."""
+    urls = dict(WARM_URLS)
+    if snekbox := config.get("SNEKBOX"):
+        urls["snekbox"] = snekbox["url"]
+
+    return urls
+
+
+def _settings(name: str, defaults: UpstreamSettings, overrides: Upstream | None, /) -> UpstreamSettings:
+    if not overrides:
+        return defaults
+
+    unknown = [key for key in overrides if key not in UpstreamSettings._fields]
+    if unknown:
+        msg = f"Unknown setting(s) in the HTTP.{name} config: {', '.join(unknown)}"
+        raise ValueError(msg)
+
+    return defaults._replace(**overrides)
+
+
+class Upstreams:
+    """One :class:`aiohttp.ClientSession` per upstream, each with its own connection pool and timeouts.
+
+    An upstream that is slow or down can only tie up its own connections, never the ones other upstreams use.
+    Sessions are created when they are first used and resolve hostnames through a DNS cache.
+    """
+
+    __slots__ = ("_sessions", "dns_cache_ttl", "settings")
+
+    def __init__(self, config: Http | None = None, /) -> None:
+        config = config or {}
+        self.dns_cache_ttl: int = config.get("dns_cache_ttl", DNS_CACHE_TTL)
+        self.settings: dict[str, UpstreamSettings] = {
+            name: _settings(name, defaults, config.get(name)) for name, defaults in UPSTREAMS.items()
+        }
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    def __repr__(self) -> str:
+        return f"<Upstreams open={sorted(self._sessions)}>"
+
+    def __getitem__(self, name: str, /) -> aiohttp.ClientSession:
+        session = self._sessions.get(name)
+        if session is None:
+            settings = self.settings[name]
+            connector = aiohttp.TCPConnector(
+                limit=settings.limit,
+                limit_per_host=settings.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=settings.keepalive_timeout,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=settings.total_timeout,
+                sock_connect=settings.connect_timeout,
+                sock_read=settings.read_timeout,
+            )
+            session = self._sessions[name] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[http_trace_config(name)],
+            )
+
+        return session
+
+    async def warm(self, name: str, url: str, /) -> WarmResult:
+        """Make a ``HEAD`` request to ``url``, leaving an idle connection to its host in the upstream's pool.
+
+        Whatever the response is, the connection is kept, so the request only fails if the host can't be reached.
+        """
+        start = time.perf_counter()
+        try:
+            async with self[name].head(url, allow_redirects=False) as response:
+                await response.read()
+        except (aiohttp.ClientError, TimeoutError) as e:
+            return WarmResult(name, url, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+        elapsed = time.perf_counter() - start
+        UPSTREAM_WARM_SECONDS.labels(name).set(elapsed)
+        return WarmResult(name, url, elapsed, None)
+
+    async def warm_all(self, urls: Mapping[str, str], /) -> list[WarmResult]:
+        return await asyncio.gather(*itertools.starmap(self.warm, urls.items()))
+
+    async def close(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+
+        results = await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER.warning("Could not cleanly close an HTTP session.", exc_info=result)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
@@ -21,5 +21,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from . import metrics as metrics
 from .formatters import *
 from .logging import LogHandler as LogHandler
+from .paste import *
@@ -0,0 +1,154 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, NamedTuple, TypeVar, overload
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+__all__ = (
+    "CacheStats",
+    "TTLCache",
+)
+
+K = TypeVar("K")
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class CacheStats(NamedTuple):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(MutableMapping[K, V]):
+    """A mapping that holds at most ``maxsize`` entries, each for at most ``ttl`` seconds.
+
+    The least recently used entry is evicted to make room, and expired entries are dropped when they are looked up,
+    counted, iterated over or when :meth:`purge` is called. A ``ttl`` of ``None`` keeps entries until they are evicted.
+    """
+
+    __slots__ = ("_data", "_timer", "evictions", "expirations", "hits", "maxsize", "misses", "ttl")
+
+    def __init__(self, *, maxsize: int, ttl: float | None = None, timer: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        # key -> (expires at, value)
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._timer: Callable[[], float] = timer
+        self.maxsize: int = maxsize
+        self.ttl: float | None = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    def __repr__(self) -> str:
+        return f"<TTLCache size={len(self._data)} maxsize={self.maxsize} ttl={self.ttl}>"
+
+    def __len__(self) -> int:
+        # at most maxsize entries to look at, and sizes are only asked for by metrics and the memory command.
+        self.purge()
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        self.purge()
+        return iter(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)  # pyright: ignore[reportArgumentType] # a key of the wrong type just isn't there.
+        return entry is not None and entry[0] > self._timer()
+
+    def __getitem__(self, key: K) -> V:
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry[0] > self._timer():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            del self._data[key]
+            self.expirations += 1
+
+        self.misses += 1
+        raise KeyError(key)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    @overload
+    def get(self, key: K, /) -> V | None: ...
+
+    @overload
+    def get(self, key: K, default: T, /) -> V | T: ...
+
+    def get(self, key: K, default: T | None = None, /) -> V | T | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def set(self, key: K, value: V, /, *, ttl: float | None = None) -> None:
+        """Store ``value``, for ``ttl`` seconds if given rather than the cache's own ``ttl``."""
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (float("inf") if ttl is None else self._timer() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def purge(self) -> int:
+        """Drop every expired entry, returning how many there were."""
+        now = self._timer()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+
+        self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(len(self), self.maxsize, self.hits, self.misses, self.evictions, self.expirations)
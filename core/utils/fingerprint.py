@@ -0,0 +1,140 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+import traceback
+from collections import OrderedDict
+from typing import NamedTuple
+
+__all__ = (
+    "ErrorAggregator",
+    "ErrorSummary",
+    "fingerprint",
+)
+
+
+def fingerprint(exception: BaseException, /, *, scope: str = "") -> str:
+    """A stable identifier for "the same error".
+
+    This is the exception type and the code location of every frame it passed through,
+    the message is left out as it often contains ids or user input.
+    """
+    parts = [scope, type(exception).__module__, type(exception).__qualname__]
+    for frame, lineno in traceback.walk_tb(exception.__traceback__):
+        code = frame.f_code
+        parts.append(f"{code.co_filename}:{code.co_qualname}:{lineno}")
+
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=8).hexdigest()
+
+
+class ErrorSummary(NamedTuple):
+    fingerprint: str
+    title: str
+    count: int
+    window: float
+
+
+class _Entry:
+    __slots__ = ("suppressed", "title", "window_start")
+
+    def __init__(self, title: str, now: float) -> None:
+        self.title: str = title
+        self.window_start: float = now
+        self.suppressed: int = 0
+
+
+class ErrorAggregator:
+    """Decides which errors are worth reporting in full.
+
+    The first occurrence of a fingerprint within ``window`` seconds should be reported,
+    repeats are only counted and handed back from :meth:`drain` to be summarised.
+    At most ``maxsize`` fingerprints are tracked, the least recently seen are forgotten first,
+    though repeats counted before a fingerprint's window ends or it's forgotten still make it into the next drain.
+    """
+
+    __slots__ = ("_entries", "_retired", "maxsize", "window")
+
+    def __init__(self, *, window: float = 300.0, maxsize: int = 512) -> None:
+        self.window: float = window
+        self.maxsize: int = maxsize
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # undrained counts of entries that were replaced or evicted, only one per fingerprint.
+        self._retired: dict[str, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, key: str, /, *, title: str) -> bool:
+        """Record an occurrence of ``key``, returning whether it should be reported in full."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry and now - entry.window_start < self.window:
+            entry.suppressed += 1
+            self._entries.move_to_end(key)
+            return False
+
+        if entry:
+            self._retire(key, entry)
+
+        self._entries[key] = _Entry(title, now)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.maxsize:
+            self._retire(*self._entries.popitem(last=False))
+
+        return True
+
+    def _retire(self, key: str, entry: _Entry, /) -> None:
+        if not entry.suppressed:
+            return
+
+        if retired := self._retired.get(key):
+            retired.suppressed += entry.suppressed
+        else:
+            self._retired[key] = entry
+
+    def drain(self) -> list[ErrorSummary]:
+        """Take the counts of every suppressed repeat since the last drain."""
+        now = time.monotonic()
+        retired, self._retired = self._retired, {}
+        summaries: list[ErrorSummary] = []
+
+        for key, entry in self._entries.items():
+            count = entry.suppressed
+            window_start = entry.window_start
+            if previous := retired.pop(key, None):
+                count += previous.suppressed
+                window_start = previous.window_start
+
+            if count:
+                summaries.append(ErrorSummary(key, entry.title, count, now - window_start))
+                entry.suppressed = 0
+
+        summaries.extend(
+            ErrorSummary(key, entry.title, entry.suppressed, now - entry.window_start) for key, entry in retired.items()
+        )
+        return summaries
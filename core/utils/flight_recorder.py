@@ -0,0 +1,176 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import time
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+__all__ = (
+    "FlightRecorder",
+    "FlightRecorderSnapshot",
+    "GatewayEventRecord",
+)
+
+
+class GatewayEventRecord(NamedTuple):
+    received_at: float
+    op: int
+    t: str | None
+    s: int | None
+    size: int
+
+
+class FlightRecorderSnapshot(NamedTuple):
+    events: list[GatewayEventRecord]
+    payloads: list[tuple[float, Any]]
+    total: int
+
+    def format(self) -> str:
+        """Render the snapshot as text. This can be slow for large payloads, so it is safe to call from a thread."""
+        lines = [f"{len(self.events)} most recent of {self.total} gateway events (oldest first):", ""]
+        lines.append(f"{'received at (UTC)':<26} {'op':>2} {'seq':>8} {'bytes':>8} event")
+
+        for event in self.events:
+            when = datetime.datetime.fromtimestamp(event.received_at, tz=datetime.UTC).isoformat(timespec="microseconds")
+            seq = "" if event.s is None else str(event.s)
+            size = "" if event.size < 0 else str(event.size)
+            lines.append(f"{when[:26]:<26} {event.op:>2} {seq:>8} {size:>8} {event.t or ''}")
+
+        lines.extend(("", f"{len(self.payloads)} sampled payload(s):"))
+        for received_at, payload in self.payloads:
+            when = datetime.datetime.fromtimestamp(received_at, tz=datetime.UTC).isoformat()
+            try:
+                rendered = json.dumps(payload, ensure_ascii=True, indent=2)
+            except (ValueError, TypeError):
+                rendered = repr(payload)
+
+            lines.extend(("", f"[{when}]", rendered))
+
+        return "\n".join(lines) + "\n"
+
+
+class FlightRecorder:
+    """Keeps compact metadata about the most recent gateway events in a preallocated ring.
+
+    Only the op, event name, sequence, size and receive time of each event are kept,
+    full payloads are sampled once every ``sample_rate`` events into a much smaller ring.
+
+    An entry is started from the raw message with :meth:`record` and filled in afterwards,
+    from the decoded payload when there is one or from :meth:`dispatched` when the event is parsed.
+    """
+
+    __slots__ = (
+        "_ops",
+        "_sequences",
+        "_sizes",
+        "_timestamps",
+        "_types",
+        "depth",
+        "payloads",
+        "sample_rate",
+        "total",
+    )
+
+    def __init__(self, depth: int = 1024, *, sample_rate: int = 100, payload_depth: int = 10) -> None:
+        self.depth: int = depth
+        self.sample_rate: int = sample_rate
+        self.total: int = 0
+
+        self._timestamps: array[float] = array("d", [0.0]) * depth
+        self._ops: array[int] = array("b", [0]) * depth
+        self._sequences: array[int] = array("q", [-1]) * depth
+        self._sizes: array[int] = array("q", [-1]) * depth
+        self._types: list[str | None] = [None] * depth
+
+        self.payloads: deque[tuple[float, Any]] = deque(maxlen=payload_depth)
+
+    def __len__(self) -> int:
+        return min(self.total, self.depth)
+
+    @property
+    def last_size(self) -> int:
+        """The size of the most recently recorded message, ``-1`` if unknown or nothing was recorded yet."""
+        return self._sizes[(self.total - 1) % self.depth] if self.total else -1
+
+    def record(self, size: int = -1, /) -> bool:
+        """Start an entry for a received message, returning whether its payload should be sampled."""
+        index = self.total % self.depth
+
+        self._timestamps[index] = time.time()
+        self._ops[index] = -1
+        self._types[index] = None
+        self._sequences[index] = -1
+        self._sizes[index] = size
+        self.total += 1
+
+        return self.total % self.sample_rate == 0
+
+    def fill(self, payload: dict[str, Any], /, *, sample: bool = False) -> None:
+        """Fill in the most recent entry from its decoded payload, keeping the payload itself with ``sample``."""
+        if not self.total:
+            return
+
+        index = (self.total - 1) % self.depth
+        self._ops[index] = payload.get("op", -1)
+        self._types[index] = payload.get("t")
+        sequence = payload.get("s")
+        self._sequences[index] = -1 if sequence is None else sequence
+
+        if sample:
+            self.payloads.append((self._timestamps[index], payload))
+
+    def dispatched(self, event: str, sequence: int | None, /) -> None:
+        """Fill in the most recent entry for a dispatched event, without its payload."""
+        if not self.total:
+            return
+
+        index = (self.total - 1) % self.depth
+        self._ops[index] = 0
+        self._types[index] = event
+        self._sequences[index] = -1 if sequence is None else sequence
+
+    def __iter__(self) -> Iterator[GatewayEventRecord]:
+        start = self.total - len(self)
+        for position in range(start, self.total):
+            index = position % self.depth
+            sequence = self._sequences[index]
+            yield GatewayEventRecord(
+                self._timestamps[index],
+                self._ops[index],
+                self._types[index],
+                None if sequence < 0 else sequence,
+                self._sizes[index],
+            )
+
+    def snapshot(self) -> FlightRecorderSnapshot:
+        """Copy the current contents, cheap enough to do on the event loop before formatting elsewhere."""
+        return FlightRecorderSnapshot(list(self), list(self.payloads), self.total)
@@ -0,0 +1,90 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+__all__ = ("LatencyHistogram",)
+
+
+# every power of two range is split into this many linear buckets, so values are recorded to within ~1.6%.
+_SUB_BUCKET_BITS = 6
+_SUB_BUCKET_HALF = 1 << _SUB_BUCKET_BITS
+# microseconds, anything above an hour is recorded as an hour.
+_MAX_VALUE = 3600 * 1_000_000
+_BUCKETS = (max(0, _MAX_VALUE.bit_length() - 1 - _SUB_BUCKET_BITS) + 2) * _SUB_BUCKET_HALF
+
+
+def _index(value: int, /) -> int:
+    shift = max(0, value.bit_length() - 1 - _SUB_BUCKET_BITS)
+    return (shift << _SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _upper_bound(index: int, /) -> int:
+    shift = max(0, (index >> _SUB_BUCKET_BITS) - 1)
+    sub_bucket = index - (shift << _SUB_BUCKET_BITS)
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """A fixed memory, log-linear (HDR style) histogram of durations.
+
+    Durations are recorded in microseconds into ~1.7k counters regardless of how many are recorded,
+    and percentiles are accurate to within ~1.6% of the true value.
+    """
+
+    __slots__ = ("_counts", "count", "max", "total")
+
+    def __init__(self) -> None:
+        self._counts: array[int] = array("I", [0]) * _BUCKETS
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, seconds: float, /) -> None:
+        value = min(_MAX_VALUE, max(1, int(seconds * 1_000_000)))
+        self._counts[_index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percentile: float, /) -> float:
+        """The duration (in seconds) that ``percentile`` percent of recorded durations were at or below."""
+        if not self.count:
+            return 0.0
+
+        target = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self.max, _upper_bound(index) / 1_000_000)
+
+        return self.max
+
+    def reset(self) -> None:
+        self._counts = array("I", [0]) * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
@@ -0,0 +1,151 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+import traceback
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Generator
+    from types import FrameType
+
+
+__all__ = (
+    "ListenerStat",
+    "timed_listener",
+)
+
+
+class ListenerStat:
+    """Timings of one listener. Wall time includes awaits, busy time is only the listener's synchronous steps."""
+
+    __slots__ = ("busy", "calls", "last_warned", "max", "max_step", "name", "slow_steps", "total")
+
+    def __init__(self, name: str, /) -> None:
+        self.name: str = name
+        self.calls: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.busy: float = 0.0
+        self.max_step: float = 0.0
+        self.slow_steps: int = 0
+        self.last_warned: float = 0.0
+
+
+def _suspended_stack(coro: Coroutine[Any, Any, Any], /) -> str:
+    # suspended coroutines have no f_back, so the stack is rebuilt by following what each one is awaiting.
+    frames: list[tuple[FrameType, int]] = []
+    awaitable: Any = coro
+    while awaitable is not None:
+        frame: FrameType | None = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame:
+            frames.append((frame, frame.f_lineno))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+    if not frames:
+        return "(the listener had finished)"
+    return "".join(traceback.StackSummary.extract(iter(frames)).format())
+
+
+class _TimedCoroutine:
+    """Drives a coroutine one step (``send``/``throw``) at a time, timing each step."""
+
+    __slots__ = ("_coro", "_on_slow", "_stat", "_threshold")
+
+    def __init__(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        stat: ListenerStat,
+        threshold: float,
+        on_slow: Callable[[ListenerStat, float, str], None],
+        /,
+    ) -> None:
+        self._coro = coro
+        self._stat = stat
+        self._threshold = threshold
+        self._on_slow = on_slow
+
+    def _step_done(self, elapsed: float, /) -> None:
+        stat = self._stat
+        stat.busy += elapsed
+        stat.max_step = max(stat.max_step, elapsed)
+        if elapsed >= self._threshold:
+            stat.slow_steps += 1
+            self._on_slow(stat, elapsed, _suspended_stack(self._coro))
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        coro = self._coro
+        value: Any = None
+        error: BaseException | None = None
+
+        while True:
+            start = time.perf_counter()
+            try:
+                future = coro.throw(error) if error else coro.send(value)
+            except StopIteration as e:
+                self._step_done(time.perf_counter() - start)
+                return e.value
+            except BaseException:
+                self._step_done(time.perf_counter() - start)
+                raise
+
+            self._step_done(time.perf_counter() - start)
+
+            try:
+                value, error = (yield future), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:  # noqa: BLE001 # handed to the listener, as the event loop would have done
+                value, error = None, e
+
+
+def timed_listener(
+    listener: Callable[..., Coroutine[Any, Any, Any]],
+    stat: ListenerStat,
+    /,
+    *,
+    threshold: float,
+    on_slow: Callable[[ListenerStat, float, str], None],
+) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Wrap a listener to record its timings in ``stat``.
+
+    ``on_slow`` is called with the stat, how long the step took and the listener's stack whenever
+    one synchronous step (the code between two awaits that actually suspend) takes ``threshold`` seconds or more.
+    """
+
+    @functools.wraps(listener)
+    async def timed(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await _TimedCoroutine(listener(*args, **kwargs), stat, threshold, on_slow)
+        finally:
+            elapsed = time.perf_counter() - start
+            stat.calls += 1
+            stat.total += elapsed
+            stat.max = max(stat.max, elapsed)
+
+    return timed
@@ -1,9 +1,20 @@
 from __future__ import annotations  # noqa: A005 # we access this as a namespace
 
+import asyncio
+import copy
+import datetime
+import gzip
+import json
 import logging
 import pathlib
-from logging.handlers import RotatingFileHandler
-from typing import TYPE_CHECKING
+import queue
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import TYPE_CHECKING, Any, Literal
 
 from discord.utils import (
     _ColourFormatter as ColourFormatter,  # pyright: ignore[reportPrivateUsage] # shh, I need it  # noqa: PLC2701
@@ -18,13 +29,197 @@ if TYPE_CHECKING:
     from core import Bot
 
 
+OverflowPolicy = Literal["drop_oldest", "sample"]
+
+# extra fields that are attached to every record logged while it is set, e.g. during a command invocation.
+LOG_CONTEXT: ContextVar[dict[str, Any] | None] = ContextVar("LOG_CONTEXT", default=None)
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if context := LOG_CONTEXT.get():
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as single line JSON objects, for ``[LOGGING] format = "json"``."""
+
+    EXTRA_FIELDS: tuple[str, ...] = ("command", "guild", "channel", "latency")
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "time": datetime.datetime.fromtimestamp(record.created, tz=datetime.UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for field in self.EXTRA_FIELDS:
+            if (value := getattr(record, field, None)) is not None:
+                data[field] = value
+
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class LocalQueueHandler(QueueHandler):
+    """A :class:`QueueHandler` for a queue that never leaves the process.
+
+    The default :meth:`QueueHandler.prepare` formats the record and strips its exception info so it can be pickled,
+    which would leave the handlers on the listener's thread (and the JSON ``exception`` field) without a traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the message is still merged here, the arguments could change before the listener gets to them.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """A :class:`RotatingFileHandler` that gzips files once they have been rolled over.
+
+    The roll over itself is only a rename, the compression happens on a dedicated background thread.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._compressor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compressor")
+
+    def rotation_filename(self, default_name: str) -> str:
+        return f"{default_name}.gz"
+
+    def rotate(self, source: str, dest: str) -> None:
+        pending = pathlib.Path(f"{dest}.pending")
+        pathlib.Path(source).rename(pending)
+        self._compressor.submit(self._compress, pending, pathlib.Path(dest))
+
+    @staticmethod
+    def _compress(source: pathlib.Path, dest: pathlib.Path) -> None:
+        partial = dest.with_name(f"{dest.name}.partial")
+        with source.open("rb") as uncompressed, gzip.open(partial, "wb") as compressed:
+            shutil.copyfileobj(uncompressed, compressed)
+
+        partial.replace(dest)
+        source.unlink()
+
+    def close(self) -> None:
+        super().close()
+        self._compressor.shutdown(wait=True)
+
+
+class LogQueue:
+    """A bounded ring buffer of log records, consumed by the webhook logging loop.
+
+    Records can be put from any thread (aiohttp, uvicorn, executors), the consumer is woken up on its own loop.
+    Once full the oldest records are dropped. With the ``sample`` policy, records below ``ERROR`` are also
+    sampled down to one in ``sample_rate`` once the queue is three quarters full, so errors are kept for longer.
+    """
+
+    __slots__ = (
+        "_event",
+        "_lock",
+        "_loop",
+        "_pressure_count",
+        "_records",
+        "dropped",
+        "maxsize",
+        "policy",
+        "sample_rate",
+    )
+
+    def __init__(self, maxsize: int = 1000, *, policy: OverflowPolicy = "drop_oldest", sample_rate: int = 10) -> None:
+        self.maxsize: int = maxsize
+        self.policy: OverflowPolicy = policy
+        self.sample_rate: int = sample_rate
+        self.dropped: int = 0
+
+        self._records: deque[logging.LogRecord] = deque(maxlen=maxsize)
+        self._lock: threading.Lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._event: asyncio.Event | None = None
+        self._pressure_count: int = 0
+
+    def qsize(self) -> int:
+        return len(self._records)
+
+    def empty(self) -> bool:
+        return not self._records
+
+    def put(self, record: logging.LogRecord, /) -> None:
+        """Queue a record. This is safe to call from any thread."""
+        with self._lock:
+            size = len(self._records)
+
+            if self.policy == "sample" and size >= self.maxsize * 0.75 and record.levelno < logging.ERROR:
+                self._pressure_count += 1
+                if self._pressure_count % self.sample_rate:
+                    self.dropped += 1
+                    return
+
+            if size == self.maxsize:
+                self.dropped += 1  # the deque will evict the oldest record for us
+
+            self._records.append(record)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        loop, event = self._loop, self._event
+        if loop is None or event is None or event.is_set():
+            return
+
+        try:
+            if asyncio.get_running_loop() is loop:
+                event.set()
+                return
+        except RuntimeError:
+            pass  # no running loop in this thread
+
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # the loop has been closed
+
+    def get_nowait(self) -> logging.LogRecord:
+        with self._lock:
+            if not self._records:
+                raise asyncio.QueueEmpty
+
+            return self._records.popleft()
+
+    async def get(self) -> logging.LogRecord:
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+            self._event.clear()
+            if self._records:
+                continue  # something was put between us checking and clearing
+
+            await self._event.wait()
+
+
 class QueueEmitHandler(logging.Handler):
     def __init__(self, bot: Bot, /) -> None:
         self.bot: Bot = bot
         super().__init__(logging.INFO)
 
     def emit(self, record: logging.LogRecord) -> None:
-        self.bot.logging_queue.put_nowait(record)
+        self.bot.logging_queue.put(record)
 
 
 class LogHandler:
@@ -35,6 +230,7 @@ class LogHandler:
         self.logging_path.mkdir(exist_ok=True)
         self.stream: bool = stream
         self.bot: Bot = bot
+        self.listener: QueueListener | None = None
         self.debug = self.log.debug
         self.info = self.log.info
         self.warning = self.log.warning
@@ -50,26 +246,47 @@ class LogHandler:
         logging.getLogger("discord.state").setLevel(logging.WARNING)
         logging.getLogger("discord.gateway").setLevel(logging.WARNING)
         logging.getLogger("starlette_plus.core").setLevel(logging.WARNING)
+        # one record per command, DEBUG keeps them out of the webhook.
+        logging.getLogger("core.bot.commands").setLevel(logging.DEBUG)
 
         self.log.setLevel(logging.INFO)
-        handler = RotatingFileHandler(
-            filename=self.logging_path / "PythonistaBot.log",
+
+        # file and stream output happens on the listener's thread, so the event loop never waits on disk I/O or rollovers.
+        output_handlers: list[logging.Handler] = []
+
+        logging_config = core.CONFIG["LOGGING"]
+        structured = logging_config.get("format", "text") == "json"
+
+        handler_cls = CompressingRotatingFileHandler if logging_config.get("compress", False) else RotatingFileHandler
+        handler = handler_cls(
+            filename=self.logging_path / ("PythonistaBot.jsonl" if structured else "PythonistaBot.log"),
             encoding="utf-8",
             mode="w",
             maxBytes=self.max_bytes,
             backupCount=5,
         )
-        dt_fmt = "%Y-%m-%d %H:%M:%S"
-        fmt = logging.Formatter("[{asctime}] [{levelname:<7}] {name}: {message}", dt_fmt, style="{")
-        handler.setFormatter(fmt)
-        self.log.addHandler(handler)
+        if structured:
+            handler.setFormatter(JSONFormatter())
+        else:
+            dt_fmt = "%Y-%m-%d %H:%M:%S"
+            fmt = logging.Formatter("[{asctime}] [{levelname:<7}] {name}: {message}", dt_fmt, style="{")
+            handler.setFormatter(fmt)
+        output_handlers.append(handler)
 
         if self.stream:
             stream_handler = logging.StreamHandler()
             if stream_supports_colour(stream_handler):
                 stream_handler.setFormatter(ColourFormatter())
-            self.log.addHandler(stream_handler)
-        if core.CONFIG["LOGGING"].get("webhook_url"):
+            output_handlers.append(stream_handler)
+
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        queue_handler = LocalQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        self.log.addHandler(queue_handler)
+        self.listener = QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+        self.listener.start()
+
+        if logging_config.get("webhook_url"):
             self.log.addHandler(QueueEmitHandler(self.bot))
 
         return self
@@ -78,6 +295,15 @@ class LogHandler:
         return self.__exit__(*args)
 
     def __exit__(self, *args: object) -> None:
+        if self.listener:
+            # this processes anything still queued before joining the thread.
+            self.listener.stop()
+
+            for hdlr in self.listener.handlers:
+                hdlr.close()
+
+            self.listener = None
+
         handlers = self.log.handlers[:]
         for hdlr in handlers:
             hdlr.close()
@@ -0,0 +1,141 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+__all__ = (
+    "LoopMonitor",
+    "LoopStall",
+)
+
+
+class LoopStall(NamedTuple):
+    lag: float
+    stack: str
+
+
+class LoopMonitor:
+    """Measures event loop scheduling lag, and captures what the loop was doing when it stalls.
+
+    A heartbeat task wakes up every ``interval`` seconds and records how late it was. A watchdog thread
+    checks the heartbeat, and once it is ``threshold`` seconds overdue it captures the stack of the loop's
+    thread while the blocking code is still running. The stall is handed to ``on_stall`` from the loop
+    once it recovers.
+    """
+
+    __slots__ = (
+        "_beat",
+        "_captured",
+        "_stopped",
+        "_task",
+        "_thread",
+        "_thread_id",
+        "interval",
+        "lag",
+        "max_lag",
+        "on_lag",
+        "on_stall",
+        "stalls",
+        "threshold",
+    )
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.1,
+        threshold: float = 0.25,
+        on_lag: Callable[[float], None] | None = None,
+        on_stall: Callable[[LoopStall], None] | None = None,
+    ) -> None:
+        self.interval: float = interval
+        self.threshold: float = threshold
+        self.on_lag: Callable[[float], None] | None = on_lag
+        self.on_stall: Callable[[LoopStall], None] | None = on_stall
+        self.lag: float = 0.0
+        self.max_lag: float = 0.0
+        self.stalls: int = 0
+
+        self._beat: float = time.monotonic()
+        # (heartbeat, stack) captured by the watchdog, only ever replaced as a whole.
+        self._captured: tuple[float, str] | None = None
+        self._stopped: threading.Event = threading.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._thread_id: int = 0
+
+    def start(self) -> None:
+        """Start monitoring the running loop, this must be called from the loop's thread."""
+        if self._task:
+            return
+
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            beat = self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+            self.lag = lag = max(0.0, time.monotonic() - beat - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            if self.on_lag:
+                self.on_lag(lag)
+
+            captured = self._captured
+            if lag >= self.threshold and captured and captured[0] == beat:
+                self.stalls += 1
+                self._captured = None
+                if self.on_stall:
+                    self.on_stall(LoopStall(lag, captured[1]))
+
+    def _watchdog(self) -> None:
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.threshold or (self._captured and self._captured[0] == beat):
+                continue
+
+            frame = sys._current_frames().get(self._thread_id)  # pyright: ignore[reportPrivateUsage] # the only way to see another thread's stack
+            if frame:
+                self._captured = (beat, "".join(traceback.format_stack(frame)))
@@ -0,0 +1,368 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import functools
+import logging
+import math
+import time
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, ClassVar, Generic, TypeVar
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+__all__ = (
+    "REGISTRY",
+    "UPSTREAM_WAIT",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "UpstreamWait",
+    "http_trace_config",
+)
+
+ChildT = TypeVar("ChildT")
+
+LOGGER = logging.getLogger(__name__)
+
+# seconds, roughly doubling from 1ms to 30s.
+DEFAULT_BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped, strict=True)) + "}"
+
+
+class Registry:
+    """A minimal, in-process metric registry that renders the Prometheus text exposition format.
+
+    Metrics are updated with plain attribute arithmetic on the event loop thread, there are no locks on the hot path.
+    Anything expensive to compute (cache sizes etc) should be a :class:`Gauge` function, which is only called on scrape.
+    """
+
+    __slots__ = ("_failing", "_metrics")
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric[object]] = {}
+        # metrics that failed to collect last time, so a broken gauge is only logged once rather than every scrape.
+        self._failing: set[str] = set()
+
+    def register(self, metric: Metric[object], /) -> None:
+        if metric.name in self._metrics:
+            msg = f"A metric named {metric.name!r} is already registered."
+            raise ValueError(msg)
+
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str, /) -> Metric[object] | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric, leaving out any that raise while they are collected."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.render())
+            except Exception:
+                if metric.name not in self._failing:
+                    self._failing.add(metric.name)
+                    LOGGER.exception("Could not collect %s, it is left out of scrapes until it can be.", metric.name)
+                continue
+
+            self._failing.discard(metric.name)
+            lines.extend((f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {metric.type}"))
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric(abc.ABC, Generic[ChildT]):
+    type: ClassVar[str]
+
+    __slots__ = ("_children", "documentation", "labelnames", "name")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        registry: Registry | None = REGISTRY,
+    ) -> None:
+        self.name: str = f"pythonistabot_{name}"
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self._children: dict[tuple[str, ...], ChildT] = {}
+
+        if registry is not None:
+            registry.register(self)  # pyright: ignore[reportArgumentType] # variance of the child type doesn't matter here
+
+    @abc.abstractmethod
+    def _new_child(self) -> ChildT: ...
+
+    def labels(self, *values: str) -> ChildT:
+        try:
+            return self._children[values]
+        except KeyError:
+            if len(values) != len(self.labelnames):
+                msg = f"{self.name} expects {len(self.labelnames)} label value(s), got {len(values)}."
+                raise ValueError(msg) from None
+
+            child = self._children[values] = self._new_child()
+            return child
+
+    def remove(self, *values: str) -> None:
+        self._children.pop(values, None)
+
+    def items(self) -> Iterator[tuple[tuple[str, ...], ChildT]]:
+        yield from self._children.items()
+
+    @abc.abstractmethod
+    def render(self) -> Iterator[str]: ...
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(Metric[CounterChild]):
+    type = "counter"
+
+    __slots__ = ()
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def render(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class GaugeChild:
+    __slots__ = ("_function", "_value")
+
+    def __init__(self) -> None:
+        self._value: float = 0.0
+        self._function: Callable[[], float] | None = None
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def set_function(self, function: Callable[[], float], /) -> None:
+        """Compute the value lazily, only when the metric is collected."""
+        self._function = function
+
+
+class Gauge(Metric[GaugeChild]):
+    type = "gauge"
+
+    __slots__ = ()
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float], /) -> None:
+        self.labels().set_function(function)
+
+    def render(self) -> Iterator[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class HistogramChild:
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        # the final slot is the implicit +Inf bucket
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Histogram(Metric[HistogramChild]):
+    type = "histogram"
+
+    __slots__ = ("buckets",)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry | None = REGISTRY,
+    ) -> None:
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry=registry)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> Iterator[str]:
+        names = (*self.labelnames, "le")
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip((*child.buckets, math.inf), child.counts, strict=True):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, (*values, _format_value(bound)))} {cumulative}"
+
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_client_request_seconds",
+    "Latency of outgoing HTTP requests, by upstream and host.",
+    ("upstream", "host"),
+)
+HTTP_REQUEST_ERRORS = Counter(
+    "http_client_request_errors",
+    "Outgoing HTTP requests that failed or returned a 5xx, by upstream and host.",
+    ("upstream", "host"),
+)
+
+
+class UpstreamWait:
+    """Accumulates time spent waiting on outgoing HTTP requests, see :data:`UPSTREAM_WAIT`."""
+
+    __slots__ = ("requests", "seconds")
+
+    def __init__(self) -> None:
+        self.seconds: float = 0.0
+        self.requests: int = 0
+
+
+# set this for the duration of some work (a command invocation, etc) to find out how much of it was spent on upstreams.
+# concurrent requests are each counted in full.
+UPSTREAM_WAIT: ContextVar[UpstreamWait | None] = ContextVar("UPSTREAM_WAIT", default=None)
+
+
+def _add_upstream_wait(seconds: float, /) -> None:
+    if wait := UPSTREAM_WAIT.get():
+        wait.seconds += seconds
+        wait.requests += 1
+
+
+async def _on_request_start(  # noqa: RUF029 # aiohttp requires coroutine callbacks
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    context.start = time.perf_counter()
+
+
+async def _on_request_end(  # noqa: RUF029 # aiohttp requires coroutine callbacks
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestEndParams,
+) -> None:
+    host = params.url.host or "unknown"
+    elapsed = time.perf_counter() - context.start
+    HTTP_REQUEST_LATENCY.labels(context.upstream, host).observe(elapsed)
+    _add_upstream_wait(elapsed)
+
+    if params.response.status >= 500:
+        HTTP_REQUEST_ERRORS.labels(context.upstream, host).inc()
+
+
+async def _on_request_exception(  # noqa: RUF029 # aiohttp requires coroutine callbacks
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestExceptionParams,
+) -> None:
+    HTTP_REQUEST_ERRORS.labels(context.upstream, params.url.host or "unknown").inc()
+    _add_upstream_wait(time.perf_counter() - context.start)
+
+
+def http_trace_config(upstream: str = "default") -> aiohttp.TraceConfig:
+    """A trace config that records latency and errors for every request made by the session it is attached to.
+
+    The metrics are labelled with ``upstream``, the name of what the session talks to.
+    """
+    context_factory = functools.partial(SimpleNamespace, upstream=upstream)
+    config = aiohttp.TraceConfig(trace_config_ctx_factory=context_factory)  # pyright: ignore[reportArgumentType] # called like the class
+    config.on_request_start.append(_on_request_start)
+    config.on_request_end.append(_on_request_end)
+    config.on_request_exception.append(_on_request_exception)
+
+    return config
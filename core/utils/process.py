@@ -0,0 +1,61 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import resource
+import sys
+
+__all__ = (
+    "peak_rss",
+    "rss",
+    "uptime",
+)
+
+
+def rss() -> int:
+    """The current resident set size of this process in bytes, or the peak where the current value isn't available."""
+    try:
+        return int(pathlib.Path("/proc/self/statm").read_bytes().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """The peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, everything else reports KiB.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def uptime() -> float | None:
+    """Seconds since this process was started, where the platform exposes it."""
+    try:
+        # the command name can contain spaces, so fields are counted from the end of it.
+        stat = pathlib.Path("/proc/self/stat").read_bytes().rsplit(b")", 1)[1].split()
+        started = int(stat[19]) / os.sysconf("SC_CLK_TCK")
+        return float(pathlib.Path("/proc/uptime").read_bytes().split()[0]) - started
+    except (OSError, ValueError, IndexError):
+        return None
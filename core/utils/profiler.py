@@ -0,0 +1,134 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import collections
+import pathlib
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from types import CodeType, FrameType
+
+
+__all__ = (
+    "ProfileResult",
+    "SamplingProfiler",
+)
+
+
+class ProfileResult(NamedTuple):
+    stacks: collections.Counter[str]
+    samples: int
+    idle: int
+    duration: float
+    # time the profiled thread was held up by sampling, as the sampler needs the GIL.
+    overhead: float
+
+    def folded(self) -> str:
+        """The stacks in the folded format understood by flamegraph.pl, speedscope, etc."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 10, /) -> list[tuple[str, int]]:
+        """The functions most often found at the top of the stack."""
+        leaves: collections.Counter[str] = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rpartition(";")[2]] += count
+
+        return leaves.most_common(limit)
+
+
+def _is_idle(code: CodeType, /) -> bool:
+    # the event loop waiting for IO in selector.select().
+    return code.co_name == "select" and code.co_filename.endswith("selectors.py")
+
+
+class SamplingProfiler:
+    """Periodically samples the stack of one thread (by default the one that created it).
+
+    Nothing is hooked into the profiled thread, so there's no cost to it beyond the time the sampler
+    holds the GIL: walking one stack every ``interval`` seconds.
+    """
+
+    __slots__ = ("_labels", "interval", "thread_id")
+
+    def __init__(self, *, interval: float = 0.005, thread_id: int | None = None) -> None:
+        self.interval: float = interval
+        self.thread_id: int = threading.get_ident() if thread_id is None else thread_id
+        self._labels: dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType, /) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # ";" separates frames and " " separates the count in the folded format.
+            filename = pathlib.Path(code.co_filename).name
+            label = f"{code.co_qualname}({filename}:{code.co_firstlineno})".replace(";", ":").replace(" ", "_")
+            self._labels[code] = label
+        return label
+
+    def _sample(self, frame: FrameType, /) -> str:
+        labels: list[str] = []
+        current: FrameType | None = frame
+        while current:
+            labels.append(self._label(current.f_code))
+            current = current.f_back
+
+        labels.reverse()
+        return ";".join(labels)
+
+    def run(self, duration: float, /, *, include_idle: bool = False) -> ProfileResult:
+        """Sample for ``duration`` seconds, blocking the calling thread (which must not be the profiled one)."""
+        if threading.get_ident() == self.thread_id:
+            msg = "A thread cannot profile itself."
+            raise RuntimeError(msg)
+
+        stacks: collections.Counter[str] = collections.Counter()
+        samples = idle = 0
+        overhead = 0.0
+
+        start = time.perf_counter()
+        deadline = start + duration
+        next_sample = start
+        while (now := time.perf_counter()) < deadline:
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            next_sample += self.interval
+
+            sample_start = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)  # pyright: ignore[reportPrivateUsage] # the only way to see another thread's stack
+            if frame is None:
+                break
+
+            samples += 1
+            if not include_idle and _is_idle(frame.f_code):
+                idle += 1
+            else:
+                stacks[self._sample(frame)] += 1
+
+            del frame
+            overhead += time.perf_counter() - sample_start
+
+        return ProfileResult(stacks, samples, idle, time.perf_counter() - start, overhead)
@@ -0,0 +1,23 @@
+CREATE TABLE IF NOT EXISTS modlog_queue (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    payload JSONB NOT NULL,
+    received_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- claimed rows are hidden from other claims until this passes.
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS command_stats (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    command TEXT NOT NULL,
+    window_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    window_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    calls INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total_seconds DOUBLE PRECISION NOT NULL,
+    upstream_seconds DOUBLE PRECISION NOT NULL,
+    p50_seconds DOUBLE PRECISION NOT NULL,
+    p95_seconds DOUBLE PRECISION NOT NULL,
+    p99_seconds DOUBLE PRECISION NOT NULL,
+    max_seconds DOUBLE PRECISION NOT NULL
+);
@@ -22,55 +22,88 @@ SOFTWARE.
 """
 
 import asyncio
+import sys
 
-import aiohttp
 import asyncpg
 import mystbin
 import uvicorn
 
 import core
 from core.utils import LogHandler
+from core.utils.logging import LogQueue
 from modules import EXTENSIONS
-from server.application import Application
 
 tasks: set[asyncio.Task[None]] = set()
 
 
 async def main() -> None:
     async with (
-        core.Bot() as bot,
-        aiohttp.ClientSession() as session,
         asyncpg.create_pool(dsn=core.CONFIG["DATABASE"]["dsn"]) as pool,
+        core.Bot() as bot,
+        core.Upstreams(core.CONFIG.get("HTTP")) as upstreams,
         LogHandler(bot=bot) as handler,
     ):
-        bot.logging_queue = asyncio.Queue()
+        logging_config = core.CONFIG["LOGGING"]
+        bot.logging_queue = LogQueue(
+            logging_config.get("queue_size", 1000),
+            policy=logging_config.get("overflow_policy", "drop_oldest"),
+        )
         bot.strip_after_prefix = True
         bot.case_insensitive = True
-        bot.session = session
+        bot.upstreams = upstreams
+        bot.session = upstreams["default"]
         bot.pool = pool
+        bot.modlog_queue = core.ModLogQueue(pool)
         bot.log_handler = handler
 
         _mystbin_token = core.CONFIG["TOKENS"]
-        bot.mb_client = mystbin.Client(session=session)
+        bot.mb_client = mystbin.Client(session=upstreams["mystbin"])
 
-        await bot.load_extension("jishaku")
-        for extension in EXTENSIONS:
-            await bot.load_extension(extension.name)
-
-            bot.log_handler.log.info(
-                "Loaded %sextension: %s",
-                "module " if extension.ispkg else "",
-                extension.name,
-            )
+        await core.load_extensions(
+            bot,
+            ["jishaku", *(extension.name for extension in EXTENSIONS)],
+            lazy=core.CONFIG.get("lazy_extensions", False),
+        )
 
+        server_process: asyncio.subprocess.Process | None = None
         server_config = core.CONFIG.get("WEBSERVER")
-        if server_config:
+        if server_config and server_config.get("mode", "inline") == "process":
+            # keep HTTP traffic off the gateway's event loop entirely.
+            flags = ["-O"] * sys.flags.optimize
+            server_process = await asyncio.create_subprocess_exec(sys.executable, *flags, "-m", "server")
+
+            if metrics_port := server_config.get("metrics_port"):
+                # the workers can't see the bot's metrics, so the bot serves its own.
+                from server.application import MetricsApplication  # noqa: PLC0415 # starlette_plus is only imported when it's used
+
+                metrics_config = uvicorn.Config(MetricsApplication(), host=server_config["host"], port=metrics_port)
+                tasks.add(asyncio.create_task(uvicorn.Server(metrics_config).serve()))
+        elif server_config:
+            from server.application import Application  # noqa: PLC0415 # starlette_plus is only imported when it's used
+
             app: Application = Application(bot=bot)
             config: uvicorn.Config = uvicorn.Config(app, host=server_config["host"], port=server_config["port"])
             server: uvicorn.Server = uvicorn.Server(config)
 
             tasks.add(asyncio.create_task(server.serve()))
-        await bot.start(core.CONFIG["TOKENS"]["bot"])
+
+        papi_config = core.CONFIG.get("PAPI")
+        papi_token = core.CONFIG["TOKENS"].get("pythonista")
+        if papi_config and papi_config["websocket_url"] and papi_token:
+            papi = core.PythonistaAPIWebsocket(
+                bot,
+                url=papi_config["websocket_url"],
+                token=papi_token,
+                subscriptions=papi_config["subscriptions"],
+            )
+            tasks.add(asyncio.create_task(papi.connect()))
+
+        try:
+            await bot.start(core.CONFIG["TOKENS"]["bot"])
+        finally:
+            if server_process and server_process.returncode is None:
+                server_process.terminate()
+                await server_process.wait()
 
 
 try:
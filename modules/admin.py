@@ -21,13 +21,19 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
 import logging
+import operator
+import time
 
+import mystbin
 from discord.ext import commands
 
 import core
 from constants import GUILD_ID
+from core.bot import GATEWAY_EVENT_BYTES, GATEWAY_EVENTS, GATEWAY_PARSE_SECONDS, LISTENER_CALLS, LISTENER_SECONDS
 from core.context import Context
+from core.utils import formatters, upload_paste
 
 LOGGER = logging.getLogger(__name__)
 
@@ -45,28 +51,131 @@ class Administration(commands.Cog):
     async def populate_owners(self, owner_ids: list[int]) -> None:
         await self.bot.wait_until_ready()
 
+        guild = self.bot.get_guild(GUILD_ID)
         new_owners: list[int] = []
+        user_ids: list[int] = []
         for id_ in owner_ids:
-            user = self.bot.get_user(id_)
-            if user:
-                LOGGER.info("[Ownership] New User found for owner: %s (%s)", str(user), user.id)
-                new_owners.append(id_)
-                continue
-
-            guild = self.bot.get_guild(GUILD_ID)
-            if not guild:
-                continue
-
-            role = guild.get_role(id_)
+            role = guild and guild.get_role(id_)
             if role:
+                if not self.bot.intents.members:
+                    # without it the role has no members to read, every owner in it would silently be dropped.
+                    LOGGER.warning(
+                        "[Ownership] Role %s (%s) can't grant ownership without the members intent, see [GATEWAY].",
+                        role,
+                        role.id,
+                    )
+                    continue
+
+                await self.bot.ensure_chunked(role.guild)
                 LOGGER.info("[Ownership] New Role found for owner: %s (%s)", str(role), role.id)
                 new_owners += [m.id for m in role.members]
                 continue
 
+            user_ids.append(id_)
+
+        # owners are looked up as members first (one gateway request), anyone left over as a user.
+        users = await self.bot.resolver.resolve_many(user_ids, guild=guild) if guild else {}
+        users.update(await self.bot.resolver.resolve_many([id_ for id_ in user_ids if id_ not in users]))
+        for id_ in user_ids:
+            if user := users.get(id_):
+                LOGGER.info("[Ownership] New User found for owner: %s (%s)", str(user), user.id)
+                new_owners.append(id_)
+
         if new_owners:
             self.bot.owner_id = None
             self.bot.owner_ids = set(new_owners)
 
+    @commands.command(name="flightrecorder", aliases=["fr"])
+    async def flight_recorder(self, ctx: Context) -> None:
+        """Uploads the most recent gateway events kept by the flight recorder."""
+        recorder = self.bot.flight_recorder
+        if recorder is None:
+            await ctx.send("The flight recorder is disabled.")
+            return
+
+        snapshot = recorder.snapshot()
+        content = await asyncio.to_thread(snapshot.format)
+
+        try:
+            url = await upload_paste(self.bot.mb_client, "flight_recorder.txt", content)
+        except mystbin.APIException as e:
+            await ctx.send(f"Could not upload the flight recorder: {e}")
+            return
+
+        await ctx.send(f"Flight recorder ({len(snapshot.events)} of {snapshot.total} events): {url}")
+
+    @commands.command(name="events")
+    async def events(self, ctx: Context, limit: commands.Range[int, 1, 12] = 10) -> None:
+        """Shows gateway event throughput and the time spent dispatching and listening to them."""
+        uptime = time.monotonic() - self.bot.started_at
+        sizes = {values: child.value for values, child in GATEWAY_EVENT_BYTES.items()}
+        parse_costs = {values: child.value for values, child in GATEWAY_PARSE_SECONDS.items()}
+        received = sorted(
+            ((values, child.value) for values, child in GATEWAY_EVENTS.items() if child.value),
+            key=operator.itemgetter(1),
+            reverse=True,
+        )
+
+        lines = [f"{'Event':<32}{'Count':>10}{'/s':>9}{'KiB':>10}{'Parse µs':>10}"]
+        for values, count in received[:limit]:
+            lines.append(
+                f"{values[0]:<32}{count:>10.0f}{count / uptime:>9.2f}"
+                f"{sizes.get(values, 0) / 1024:>10.1f}{parse_costs[values] / count * 1e6:>10.1f}",
+            )
+
+        listener_costs = {values: child.value for values, child in LISTENER_SECONDS.items()}
+        listeners = sorted(
+            ((values, child.value) for values, child in LISTENER_CALLS.items()),
+            key=lambda item: listener_costs[item[0]],
+            reverse=True,
+        )
+
+        lines += ["", f"{'Listener':<32}{'Calls':>10}{'Total s':>9}{'Avg ms':>10}"]
+        for values, calls in listeners[:limit]:
+            total = listener_costs[values]
+            lines.append(f"{values[0]:<32}{calls:>10.0f}{total:>9.2f}{total / calls * 1e3:>10.2f}")
+
+        total_events = sum(count for _, count in received)
+        header = f"{total_events:.0f} gateway events in {uptime:.0f}s ({total_events / uptime:.2f}/s)"
+        table = formatters.to_codeblock("\n".join(lines), language="", escape_md=False)
+        await ctx.send(f"{header}\n{table}")
+
+    @commands.command(name="stats")
+    async def stats(self, ctx: Context, limit: commands.Range[int, 1, 20] = 15) -> None:
+        """Shows command latency percentiles, call counts and time spent waiting on upstreams since startup."""
+        stats = sorted(self.bot.command_stats, key=lambda item: item[1].latency.count, reverse=True)
+        if not stats:
+            await ctx.send("No commands have been used yet.")
+            return
+
+        lines = [f"{'Command':<20}{'Calls':>7}{'Fails':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Max ms':>9}{'Up %':>6}"]
+        for name, stat in stats[:limit]:
+            latency = stat.latency
+            upstream = min(100.0, stat.upstream_seconds / latency.total * 100) if latency.total else 0.0
+            lines.append(
+                f"{name[:19]:<20}{latency.count:>7}{stat.failures:>6}{latency.percentile(50) * 1e3:>9.1f}"
+                f"{latency.percentile(95) * 1e3:>9.1f}{latency.percentile(99) * 1e3:>9.1f}{latency.max * 1e3:>9.1f}"
+                f"{upstream:>6.0f}",
+            )
+
+        await ctx.send(formatters.to_codeblock("\n".join(lines), language="", escape_md=False))
+
+    @commands.command(name="listeners")
+    async def listeners(self, ctx: Context, limit: commands.Range[int, 1, 20] = 15) -> None:
+        """Shows how long cog listeners take, and how long they block the event loop for."""
+        stats = sorted(self.bot.listener_stats.values(), key=lambda stat: stat.busy, reverse=True)
+
+        lines = [f"{'Listener':<32}{'Calls':>8}{'Avg ms':>9}{'Max ms':>9}{'Busy s':>8}{'Step ms':>9}{'Slow':>6}"]
+        for stat in stats[:limit]:
+            average = stat.total / stat.calls * 1e3 if stat.calls else 0.0
+            lines.append(
+                f"{stat.name[:31]:<32}{stat.calls:>8}{average:>9.1f}{stat.max * 1e3:>9.1f}"
+                f"{stat.busy:>8.2f}{stat.max_step * 1e3:>9.1f}{stat.slow_steps:>6}",
+            )
+
+        table = formatters.to_codeblock("\n".join(lines), language="", escape_md=False)
+        await ctx.send(f"Steps over {self.bot.slow_listener_threshold * 1e3:.0f}ms count as slow.\n{table}")
+
 
 async def setup(bot: core.Bot) -> None:
     await bot.add_cog(Administration(bot))
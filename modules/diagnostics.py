@@ -0,0 +1,181 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import pathlib
+import threading
+import tracemalloc
+from typing import Literal
+
+import mystbin
+from discord.ext import commands
+
+import core
+from core.context import Context
+from core.utils import formatters, upload_paste
+from core.utils.process import rss
+from core.utils.profiler import SamplingProfiler
+
+MAX_PROFILE_SECONDS = 120.0
+# allocations made by tracemalloc itself (and the import system) are noise in a diff.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+    tracemalloc.Filter(inclusive=False, filename_pattern="<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(inclusive=False, filename_pattern="<unknown>"),
+)
+
+
+def _short_path(filename: str, /) -> str:
+    parts = pathlib.PurePath(filename).parts
+    return "/".join(parts[-2:])
+
+
+def _diff(
+    baseline: tracemalloc.Snapshot,
+    snapshot: tracemalloc.Snapshot,
+    key_type: Literal["lineno", "filename"],
+    limit: int,
+    /,
+) -> list[str]:
+    stats = snapshot.filter_traces(SNAPSHOT_FILTERS).compare_to(baseline.filter_traces(SNAPSHOT_FILTERS), key_type)
+    lines = [f"{'Size diff':>11}{'Count diff':>12}{'Size':>11}  Location"]
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        location = _short_path(frame.filename) if key_type == "filename" else f"{_short_path(frame.filename)}:{frame.lineno}"
+        lines.append(f"{stat.size_diff / 1024:>+10.1f}K{stat.count_diff:>+12}{stat.size / 1024:>10.1f}K  {location}")
+
+    return lines
+
+
+class Diagnostics(commands.Cog):
+    """Owner only tools for looking into the running bot."""
+
+    def __init__(self, bot: core.Bot, /) -> None:
+        self.bot: core.Bot = bot
+        # the event loop's thread, which is what the profiler samples.
+        self.loop_thread_id: int = threading.get_ident()
+        self.snapshot: tracemalloc.Snapshot | None = None
+
+    async def cog_check(self, ctx: Context) -> bool:  # pyright: ignore[reportIncompatibleMethodOverride]  # maybecoro override woes
+        return await self.bot.is_owner(ctx.author)
+
+    @commands.command(name="profile")
+    @commands.max_concurrency(1, wait=False)
+    async def profile(
+        self,
+        ctx: Context,
+        seconds: commands.Range[float, 1.0, MAX_PROFILE_SECONDS] = 10.0,
+        interval_ms: commands.Range[float, 1, 100] = 5.0,
+    ) -> None:
+        """Samples the event loop's thread for a while and uploads the stacks in folded (flamegraph) format.
+
+        Time the loop spent idle, waiting on IO, is left out.
+        """
+        profiler = SamplingProfiler(interval=interval_ms / 1000, thread_id=self.loop_thread_id)
+        await ctx.send(f"Profiling for {seconds:g}s...")
+
+        result = await asyncio.to_thread(profiler.run, seconds)
+        if not result.stacks:
+            await ctx.send(f"The event loop was idle for all {result.samples} samples.")
+            return
+
+        try:
+            url = await upload_paste(self.bot.mb_client, "profile.folded", result.folded())
+        except mystbin.APIException as e:
+            await ctx.send(f"Could not upload the profile: {e}")
+            return
+
+        busy = result.samples - result.idle
+        lines = [f"{count / busy:>6.1%}  {function}" for function, count in result.top(10)]
+        table = formatters.to_codeblock("\n".join(lines), language="", escape_md=False)
+        await ctx.send(
+            f"{result.samples} samples over {result.duration:.1f}s, the loop was busy in {busy / result.samples:.0%}. "
+            f"Sampling held it up for {result.overhead * 1e3:.1f}ms ({result.overhead / result.duration:.2%}).\n"
+            f"Folded stacks (for speedscope.app or flamegraph.pl): {url}\n{table}",
+        )
+
+    @commands.group(name="memory", invoke_without_command=True)
+    async def memory(self, ctx: Context) -> None:
+        """Shows memory usage and the size of every registered cache."""
+        lines = [f"{'Cache':<32}{'Items':>10}{'Hit rate':>10}{'Evicted':>10}  Owner"]
+        for name, cache in sorted(self.bot.caches.items()):
+            owner = cache.owner.qualified_name if cache.owner else "bot"
+            hit_rate = evicted = ""
+            if cache.stats:
+                stats = cache.stats()
+                hit_rate, evicted = f"{stats.hit_rate:.1%}", str(stats.evictions + stats.expirations)
+
+            lines.append(f"{name:<32}{cache.size():>10}{hit_rate:>10}{evicted:>10}  {owner}")
+
+        tracing = "off"
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            tracing = f"{current / 1024**2:.1f} MiB traced, {peak / 1024**2:.1f} MiB peak"
+
+        table = formatters.to_codeblock("\n".join(lines), language="", escape_md=False)
+        await ctx.send(f"RSS: {rss() / 1024**2:.1f} MiB, tracemalloc: {tracing}\n{table}")
+
+    @memory.command(name="start")
+    async def memory_start(self, ctx: Context, frames: commands.Range[int, 1, 25] = 1) -> None:
+        """Starts tracing allocations and takes the snapshot that ``memory diff`` compares against.
+
+        Tracing slows down allocations noticeably, more so with more frames. Stop it when you're done.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+        self.snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+        await ctx.send(f"Tracing allocations ({tracemalloc.get_traceback_limit()} frame(s)), baseline taken.")
+
+    @memory.command(name="diff")
+    async def memory_diff(
+        self,
+        ctx: Context,
+        key_type: Literal["lineno", "filename"] = "lineno",
+        limit: commands.Range[int, 1, 20] = 15,
+    ) -> None:
+        """Shows the allocations that grew the most since the last snapshot, which this then replaces."""
+        if not self.snapshot or not tracemalloc.is_tracing():
+            await ctx.send(f"Start tracing first, with `{ctx.clean_prefix}memory start`.")
+            return
+
+        snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+        lines = await asyncio.to_thread(_diff, self.snapshot, snapshot, key_type, limit)
+        self.snapshot = snapshot
+
+        await ctx.send(formatters.to_codeblock("\n".join(lines), language="", escape_md=False))
+
+    @memory.command(name="stop")
+    async def memory_stop(self, ctx: Context) -> None:
+        """Stops tracing allocations and frees the traces."""
+        tracemalloc.stop()
+        self.snapshot = None
+        await ctx.send("Stopped tracing allocations.")
+
+    async def cog_unload(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+async def setup(bot: core.Bot) -> None:
+    await bot.add_cog(Diagnostics(bot))
@@ -36,6 +36,7 @@ from core.errors import InvalidEval
 from core.utils import formatters
 
 LOGGER = logging.getLogger(__name__)
+REQUIRES_CONFIG = "SNEKBOX"
 
 
 CODE = """
@@ -78,7 +79,7 @@ class Evaluation(core.Cog):
 
         formatted = CODE.format(user_code=textwrap.indent(source.replace("\t", "    "), "    "))
 
-        async with self.bot.session.post(self.eval_endpoint, json={"input": formatted}) as eval_response:
+        async with self.bot.upstreams["snekbox"].post(self.eval_endpoint, json={"input": formatted}) as eval_response:
             if eval_response.status != 200:
                 response_text = await eval_response.text()
                 raise InvalidEval(eval_response.status, response_text)
@@ -85,7 +85,7 @@ class GitHub(core.Cog):
         raw_url = GITHUB_RAW_CONTENT_URL + file_path.replace("blob/", "")  # Convert it to a raw user content URL
 
         code = ""
-        async with self.bot.session.get(raw_url) as resp:
+        async with self.bot.upstreams["github"].get(raw_url) as resp:
             if resp.status == 404:
                 return None
 
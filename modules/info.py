@@ -153,6 +153,9 @@ class Information(core.Cog):
 
         entity: Accepts a Person's ID, a Role ID or a Channel ID. Defaults to showing info on the Guild.
         """
+        if isinstance(entity, discord.Role):
+            await self.bot.ensure_chunked(entity.guild)
+
         embed = self._embed_factory(entity)  # pyright: ignore[reportArgumentType] # converter usage messes with types
         await ctx.reply(embed=embed, mention_author=False)
 
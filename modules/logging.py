@@ -23,71 +23,175 @@ SOFTWARE.
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import logging
 import textwrap
+from typing import TYPE_CHECKING, Any
 
+import aiohttp
 import discord
 from discord.ext import commands, tasks
 from discord.utils import MISSING, format_dt
 
 import core
 
+if TYPE_CHECKING:
+    from logging import LogRecord
+
+# a batch is flushed once it holds this many records, or once the first record has waited this long.
+BATCH_SIZE = 50
+BATCH_WINDOW = 2.0
+
+# discord's limits for a single webhook message.
+MAX_CONTENT_LENGTH = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARACTERS = 6000
+MAX_EMBED_DESCRIPTION = 4096
+
+LEVEL_EMOJI = {"INFO": "\U00002139\U0000fe0f", "WARNING": "\U000026a0\U0000fe0f"}
+
 
 class Logging(commands.Cog):
     def __init__(self, bot: core.Bot) -> None:
         self.bot = bot
 
-        self.user: discord.User | None = MISSING  # none is for a failed fetch
+        self.user: discord.User | discord.Member | None = MISSING  # none is for a failed fetch
+        self.reported_dropped: int = 0
 
-        if url := core.CONFIG["LOGGING"].get("webhook_url"):
-            self.webhook = discord.Webhook.from_url(url, session=bot.session, client=bot)
-        else:
+        self.webhook_url: str | None = core.CONFIG["LOGGING"].get("webhook_url")
+        if not self.webhook_url:
             bot.log_handler.warning("Not enabling webhook logging due to config key not existing.")
-            self.webhook = None
 
     async def cog_load(self) -> None:
-        if self.webhook:
+        if self.webhook_url:
             self.logging_loop.start()
 
     async def cog_unload(self) -> None:
-        if self.webhook:
+        if self.webhook_url:
             self.logging_loop.cancel()
 
-    @tasks.loop(seconds=0)
-    async def logging_loop(self) -> None:
-        assert self.webhook
+    async def get_batch(self) -> list[LogRecord]:
+        queue = self.bot.logging_queue
+        records = [await queue.get()]
 
-        to_log = await self.bot.logging_queue.get()
+        if dropped := queue.dropped - self.reported_dropped:
+            self.reported_dropped = queue.dropped
+            message = f"The logging queue was full, {dropped} record(s) were dropped."
+            records.append(logging.makeLogRecord({"msg": message, "levelname": "WARNING", "levelno": logging.WARNING}))
 
-        attributes = {"INFO": "\U00002139\U0000fe0f", "WARNING": "\U000026a0\U0000fe0f"}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + BATCH_WINDOW
 
-        emoji = attributes.get(to_log.levelname, "\N{CROSS MARK}")
-        dt = datetime.datetime.fromtimestamp(to_log.created, tz=datetime.UTC)
-
-        message = textwrap.shorten(f"{emoji} {format_dt(dt)}\n{to_log.message}", width=1990)
+        while len(records) < BATCH_SIZE:
+            try:
+                records.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
 
-        embed = to_log.__dict__.get("embed") or discord.utils.MISSING
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
 
+            try:
+                records.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except TimeoutError:
+                break
+
+        return records
+
+    def pack(self, records: list[LogRecord]) -> list[tuple[str, list[discord.Embed]]]:
+        """Pack records into as few webhook messages as Discord's message limits allow."""
+        messages: list[tuple[str, list[discord.Embed]]] = []
+        content = ""
+        embeds: list[discord.Embed] = []
+        embed_characters = 0
+
+        for record in records:
+            emoji = LEVEL_EMOJI.get(record.levelname, "\N{CROSS MARK}")
+            dt = datetime.datetime.fromtimestamp(record.created, tz=datetime.UTC)
+            line = textwrap.shorten(f"{emoji} {format_dt(dt)}\n{record.getMessage()}", width=MAX_CONTENT_LENGTH - 10)
+
+            embed: discord.Embed | None = record.__dict__.get("embed")
+            if embed and embed.description and len(embed.description) > MAX_EMBED_DESCRIPTION:
+                embed.description = embed.description[: MAX_EMBED_DESCRIPTION - 8] + "\n...```"
+
+            if (
+                len(content) + len(line) + 1 > MAX_CONTENT_LENGTH
+                or (embed and len(embeds) >= MAX_EMBEDS)
+                or (embed and embed_characters + len(embed) > MAX_EMBED_CHARACTERS)
+            ):
+                messages.append((content, embeds))
+                content, embeds, embed_characters = "", [], 0
+
+            content = f"{content}\n{line}" if content else line
+            if embed:
+                embeds.append(embed)
+                embed_characters += len(embed)
+
+        if content or embeds:
+            messages.append((content, embeds))
+
+        return messages
+
+    async def get_identity(self) -> tuple[str, str | None]:
         avatar_url: str | None = core.CONFIG["LOGGING"].get("webhook_avatar_url")
         actor_name = "PythonistaBot Logging"
 
-        if not avatar_url and self.user is not None and "runner" in core.CONFIG["LOGGING"]:
-            runner_id: int = core.CONFIG["LOGGING"]["runner"]
+        if avatar_url or "runner" not in core.CONFIG["LOGGING"]:
+            return actor_name, avatar_url
+
+        if self.user is MISSING:
+            # resolve this once, a failed fetch is remembered as None so we don't try again.
+            self.user = await self.bot.resolver.resolve(core.CONFIG["LOGGING"]["runner"])
+
+        if self.user:
+            avatar_url = self.user.display_avatar.url
+            actor_name = f"Logging: Dev: {self.user.display_name}"
+
+        return actor_name, avatar_url
+
+    async def send(self, payload: dict[str, Any]) -> None:
+        assert self.webhook_url
+
+        while True:
+            async with self.bot.session.post(self.webhook_url, json=payload) as response:
+                if response.status == 429:
+                    data = await response.json()
+                    await asyncio.sleep(float(data.get("retry_after", 1)))
+                    continue
+
+                if response.status >= 400:
+                    # logging these would feed straight back into this loop.
+                    return
+
+                if response.headers.get("X-RateLimit-Remaining") == "0":
+                    # we're out of requests for this bucket, wait for it to reset before sending again.
+                    await asyncio.sleep(discord.utils._parse_ratelimit_header(response))  # pyright: ignore[reportPrivateUsage,reportArgumentType] # shh this is okay
+
+                return
+
+    @tasks.loop(seconds=0)
+    async def logging_loop(self) -> None:
+        records = await self.get_batch()
+        username, avatar_url = await self.get_identity()
+
+        for content, embeds in self.pack(records):
+            payload: dict[str, Any] = {
+                "content": content,
+                "username": username,
+                "embeds": [embed.to_dict() for embed in embeds],
+                "allowed_mentions": {"parse": []},
+            }
+            if avatar_url:
+                payload["avatar_url"] = avatar_url
+
             try:
-                user = self.user or await self.bot.get_or_fetch_user(runner_id)
-            except discord.HTTPException:
-                self.user = user = None  # This will tell us not to attempt again.
-
-            if user:
-                avatar_url = user.display_avatar.url
-                actor_name = f"Logging: Dev: {user.display_name}"
-
-        await self.webhook.send(
-            message,
-            username=actor_name,
-            avatar_url=avatar_url,
-            embed=embed,
-        )
+                await self.send(payload)
+            except aiohttp.ClientError:
+                # same as above, there's nowhere sensible to report this.
+                continue
 
 
 async def setup(bot: core.Bot) -> None:
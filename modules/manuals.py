@@ -205,7 +205,7 @@ class Manuals(commands.Cog):
         if self._idevision_auth:
             headers["Authorization"] = self._idevision_auth
 
-        async with self.bot.session.get(url, headers=headers) as resp:
+        async with self.bot.upstreams["idevision"].get(url, headers=headers) as resp:
             if resp.status != 200:
                 await ctx.send(f"The api returned an irregular status ({resp.status}) ({await resp.text()})")
                 return
@@ -277,7 +277,7 @@ class Manuals(commands.Cog):
         if self._idevision_auth:
             headers["Authorization"] = self._idevision_auth
 
-        async with self.bot.session.get(url, headers=headers) as resp:
+        async with self.bot.upstreams["idevision"].get(url, headers=headers) as resp:
             if resp.status != 200:
                 await ctx.send(f"The api returned an irregular status ({resp.status}) ({await resp.text()})")
                 return
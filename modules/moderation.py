@@ -32,18 +32,21 @@ import re
 from textwrap import shorten
 from typing import TYPE_CHECKING, Any, Self
 
+import asyncpg
 import discord
 import mystbin
 import yarl
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import core
-from constants import Channels
+from constants import GUILD_ID, Channels
 from core.utils import random_pastel_colour
+from core.utils.cache import TTLCache
+from types_.papi import ModLogPayload
+from types_.validation import validate
 
 if TYPE_CHECKING:
     from core.context import Interaction
-    from types_.papi import ModLogPayload
 
 
 logger = logging.getLogger(__name__)
@@ -63,6 +66,20 @@ PROSE_LOOKUP = {
     9: "un-helpblocked",
 }
 
+MODLOG_POLL_INTERVAL = 30.0
+MODLOG_LINGER = 2.0
+MODLOG_BATCH_SIZE = 200
+# long enough to send a full batch through the channel's rate limit.
+MODLOG_LEASE = 600.0
+# events that can't be sent are retried after 30s, 60s, ... up to an hour apart, for roughly six hours.
+MODLOG_RETRY_DELAY = 30.0
+MODLOG_MAX_RETRY_DELAY = 3600.0
+MODLOG_MAX_ATTEMPTS = 12
+MODLOG_DIGEST_THRESHOLD = 3
+MODLOG_DIGEST_MAX_LENGTH = 3900
+MODERATOR_CACHE_SIZE = 256
+MODERATOR_CACHE_TTL = 1800.0
+
 
 def validate_token(token: str) -> bool:
     try:
@@ -87,12 +104,12 @@ class ModerationRespostView(discord.ui.View):
         timeout: float | None = 180,
         event_type: core.DiscordPyModerationEvent,
         target_id: int,
-        target_reason: str,
+        target_reason: str | None,
     ) -> None:
         super().__init__(timeout=timeout)
         self.event_type: core.DiscordPyModerationEvent = event_type
         self.target: discord.Object = discord.Object(id=target_id, type=discord.Member)
-        self.target_reason: str = target_reason
+        self.target_reason: str | None = target_reason
 
         if self.event_type.value in (4, 7, 8, 9):
             self._disable_all_components()
@@ -140,8 +157,14 @@ class ModerationRespostView(discord.ui.View):
 class Moderation(commands.Cog):
     def __init__(self, bot: core.Bot, /) -> None:
         self.bot = bot
-        self.dpy_mod_cache: dict[int, discord.User | discord.Member] = {}
+        # moderators are few, refetching them now and then keeps names and avatars in the modlog current.
+        self.dpy_mod_cache: TTLCache[int, discord.User | discord.Member] = TTLCache(
+            maxsize=MODERATOR_CACHE_SIZE,
+            ttl=MODERATOR_CACHE_TTL,
+        )
         self._req_lock = asyncio.Lock()
+        # the queue is durable, so database hiccups (or a dropped connection) just mean we try again shortly.
+        self.modlog_consumer.add_exception_type(asyncpg.PostgresError, asyncpg.InterfaceError)
 
         domains = core.CONFIG["BADBIN"]["domains"]
         formatted = BASE_BADBIN_RE.format(domains="|".join(domains))
@@ -173,7 +196,10 @@ class Moderation(commands.Cog):
         if headers is not None:
             hdrs.update(headers)
 
-        async with self._req_lock, self.bot.session.request(method, req_url, params=params, json=data, headers=hdrs) as r:
+        async with (
+            self._req_lock,
+            self.bot.upstreams["github"].request(method, req_url, params=params, json=data, headers=hdrs) as r,
+        ):
             remaining = r.headers.get("X-Ratelimit-Remaining")
             js = await r.json()
 
@@ -240,7 +266,7 @@ class Moderation(commands.Cog):
         await message.reply(msg)
 
     async def pull_badbin_content(self, site: str, slug: str, *, fail_hard: bool = True) -> str:
-        async with self.bot.session.get(f"https://{site}/raw/{slug}") as f:
+        async with self.bot.upstreams["badbin"].get(f"https://{site}/raw/{slug}") as f:
             if 200 > f.status > 299:
                 if fail_hard:
                     f.raise_for_status()
@@ -280,8 +306,103 @@ class Moderation(commands.Cog):
 
         await message.reply(msg, mention_author=False)
 
+    async def cog_load(self) -> None:
+        self.bot.register_cache("moderation.dpy_mod_cache", self.dpy_mod_cache, owner=self)
+        await self.bot.modlog_queue.listen()
+        self.modlog_consumer.start()
+
+    async def cog_unload(self) -> None:
+        self.modlog_consumer.cancel()
+        await self.bot.modlog_queue.unlisten()
+
     @commands.Cog.listener()
     async def on_papi_dpy_modlog(self, payload: ModLogPayload, /) -> None:
+        await self.bot.modlog_queue.put(payload)
+
+    @tasks.loop(seconds=0)
+    async def modlog_consumer(self) -> None:
+        await self.bot.modlog_queue.wait(timeout=MODLOG_POLL_INTERVAL)
+        # give bursts (mass bans etc) a moment to land so they can be collapsed into a single digest.
+        await asyncio.sleep(MODLOG_LINGER)
+
+        while True:
+            queue = self.bot.modlog_queue
+            entries = await queue.claim(MODLOG_BATCH_SIZE, lease=MODLOG_LEASE)
+            # if this raises, the entries are handed out again once their lease runs out.
+            failed = await self.process_modlog_batch(entries)
+
+            retry = {entry.id for entry in failed if entry.attempts < MODLOG_MAX_ATTEMPTS}
+            for entry in failed:
+                if entry.id not in retry:
+                    logger.error(
+                        "Giving up on modlog event %d after %d attempts: %r",
+                        entry.id,
+                        entry.attempts,
+                        entry.payload,
+                    )
+
+            await queue.ack([entry.id for entry in entries if entry.id not in retry])
+            await queue.retry(sorted(retry), delay=MODLOG_RETRY_DELAY, max_delay=MODLOG_MAX_RETRY_DELAY)
+
+            if len(entries) < MODLOG_BATCH_SIZE:
+                break
+
+    @modlog_consumer.before_loop
+    async def before_modlog_consumer(self) -> None:
+        await self.bot.wait_until_ready()
+
+    async def process_modlog_batch(self, entries: list[core.QueuedModLog]) -> list[core.QueuedModLog]:
+        """Send queued events to the modlog channel, returning the ones that could not be sent."""
+        guild = self.bot.get_guild(GUILD_ID)
+        assert guild
+
+        channel = guild.get_channel(Channels.DPY_MOD_LOGS)
+        assert isinstance(channel, discord.TextChannel)  # This is static
+
+        groups: dict[tuple[int, int], list[core.QueuedModLog]] = {}
+        user_ids: set[int] = set()
+        for entry in entries:
+            payload = entry.payload
+            # a malformed payload would otherwise fail the whole batch, and with it every batch after.
+            if errors := validate(ModLogPayload, payload):
+                logger.error("Dropping malformed modlog event %r: %s", payload, "; ".join(errors))
+                continue
+
+            groups.setdefault((payload["moderation_event_type"], payload["author_id"]), []).append(entry)
+            user_ids.update((payload["author_id"], payload["target_id"]))
+
+        # resolve everyone up front, the entries below are then built from cache.
+        await self.bot.resolver.resolve_many(user_ids)
+
+        failed: list[core.QueuedModLog] = []
+        for group in groups.values():
+            # a digest is sent as a single message, otherwise each event is sent (and can fail) on its own.
+            parts = [group] if len(group) >= MODLOG_DIGEST_THRESHOLD else [[entry] for entry in group]
+            for part in parts:
+                try:
+                    if len(part) > 1:
+                        await channel.send(embed=await self.build_modlog_digest([entry.payload for entry in part]))
+                    else:
+                        embed, view = await self.build_modlog_entry(part[0].payload)
+                        view.message = await channel.send(embed=embed, view=view)
+                except discord.HTTPException:
+                    logger.exception("Failed to send %d modlog event(s), they'll be retried.", len(part))
+                    failed.extend(part)
+                except (KeyError, ValueError):
+                    # a malformed payload would otherwise be retried forever, so we drop it.
+                    logger.exception("Dropping %d malformed modlog event(s): %r", len(part), part)
+
+        return failed
+
+    async def _resolve_moderator(self, moderator_id: int, /) -> discord.User | discord.Member | None:
+        # once our entry expires the moderator is fetched again, not served from the resolver's (longer lived) cache.
+        return self.dpy_mod_cache.get(moderator_id) or await self.bot.get_or_fetch_user(
+            moderator_id,
+            cache=self.dpy_mod_cache,
+            refresh=True,
+        )
+
+    async def build_modlog_entry(self, payload: ModLogPayload, /) -> tuple[discord.Embed, ModerationRespostView]:
         moderation_event = core.DiscordPyModerationEvent(payload["moderation_event_type"])
 
         embed = discord.Embed(
@@ -295,13 +416,9 @@ class Moderation(commands.Cog):
         moderation_reason = payload["reason"]
 
         moderator_id = payload["author_id"]
-        moderator = self.dpy_mod_cache.get(moderator_id) or await self.bot.get_or_fetch_user(
-            moderator_id,
-            cache=self.dpy_mod_cache,
-        )
+        moderator = await self._resolve_moderator(moderator_id)
 
         if moderator:
-            self.dpy_mod_cache[moderator.id] = moderator
             moderator_format = f"{moderator.name} {PROSE_LOOKUP[moderation_event.value]} "
             embed.set_author(name=moderator.name, icon_url=moderator.display_avatar.url)
         else:
@@ -321,19 +438,51 @@ class Moderation(commands.Cog):
         when = datetime.datetime.fromisoformat(payload["event_time"])
         embed.timestamp = when
 
-        guild = self.bot.get_guild(490948346773635102)
-        assert guild
-
-        channel = guild.get_channel(Channels.DPY_MOD_LOGS)
-        assert isinstance(channel, discord.TextChannel)  # This is static
-
         view = ModerationRespostView(
             timeout=60 * 60,
             event_type=moderation_event,
             target_id=target_id,
             target_reason=moderation_reason,
         )
-        view.message = await channel.send(embed=embed, view=view)
+
+        return embed, view
+
+    async def build_modlog_digest(self, payloads: list[ModLogPayload], /) -> discord.Embed:
+        # every payload in a digest shares the same event type and moderator.
+        moderation_event = core.DiscordPyModerationEvent(payloads[0]["moderation_event_type"])
+        moderator_id = payloads[0]["author_id"]
+        moderator = await self._resolve_moderator(moderator_id)
+
+        embed = discord.Embed(
+            title=f"Discord.py Moderation Digest: {moderation_event.name.title()}",
+            colour=random_pastel_colour(),
+        )
+
+        if moderator:
+            moderator_format = moderator.name
+            embed.set_author(name=moderator.name, icon_url=moderator.display_avatar.url)
+        else:
+            moderator_format = f"Unknown Moderator with ID: {moderator_id}"
+            embed.set_author(name="Unknown Moderator.")
+
+        lines = [
+            f"- <@{payload['target_id']}> ({payload['target_id']}): "
+            f"{shorten(payload['reason'] or 'No reason given.', width=100)}"
+            for payload in payloads
+        ]
+
+        description = f"{len(payloads)} users {PROSE_LOOKUP[moderation_event.value]} by {moderator_format}\n\n"
+        for index, line in enumerate(lines):
+            if len(description) + len(line) > MODLOG_DIGEST_MAX_LENGTH:
+                description += f"...and {len(lines) - index} more."
+                break
+
+            description += f"{line}\n"
+
+        embed.description = description
+        embed.timestamp = max(datetime.datetime.fromisoformat(payload["event_time"]) for payload in payloads)
+
+        return embed
 
 
 async def setup(bot: core.Bot) -> None:
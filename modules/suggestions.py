@@ -30,6 +30,7 @@ from discord.ext import commands
 import core
 
 LOGGER = logging.getLogger(__name__)
+REQUIRES_CONFIG = "SUGGESTIONS"
 
 
 def get_suggestion_type(value: str) -> str:
@@ -0,0 +1,134 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+Streams log files, including gzipped rollovers, without decompressing them to disk.
+
+Usage::
+
+    python query_logs.py --level ERROR --command rtfm
+    python query_logs.py --grep "Forbidden" --logger discord.http logs/PythonistaBot.jsonl.1.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import gzip
+import json
+import pathlib
+import re
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# only the bot's own log, logs/ also has startup.jsonl and the like.
+LOG_FILE_RE = re.compile(r"PythonistaBot\.(?:log|jsonl)(?:\.(?P<rollover>\d+))?(?:\.gz)?")
+TEXT_LINE_RE = re.compile(r"^\[(?P<time>[^\]]+)\] \[(?P<level>[A-Z]+) *\] (?P<logger>[^:]+): (?P<message>.*)$")
+
+
+def discover(directory: pathlib.Path) -> list[pathlib.Path]:
+    """Every log file the bot wrote to ``directory`` (rollovers included), oldest first."""
+    if not directory.is_dir():
+        return []
+
+    matches = [(path, LOG_FILE_RE.fullmatch(path.name)) for path in directory.iterdir()]
+    # PythonistaBot.log.3.gz is older than PythonistaBot.log.1.gz, which is older than PythonistaBot.log
+    found = [(-int(match["rollover"] or 0), path.name, path) for path, match in matches if match]
+    return [path for *_, path in sorted(found)]
+
+
+def read_lines(path: pathlib.Path) -> Iterator[str]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as fp:
+        for line in fp:
+            yield line.rstrip("\n")
+
+
+def parse(line: str) -> dict[str, Any] | None:
+    if line.startswith("{"):
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    if match := TEXT_LINE_RE.match(line):
+        return match.groupdict()
+
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Search the bot's (optionally compressed) log files.")
+    parser.add_argument("paths", nargs="*", type=pathlib.Path, help="files to read, defaults to everything in ./logs/")
+    parser.add_argument("--level", choices=LEVELS, help="minimum level to show")
+    parser.add_argument("--logger", help="only show records from this logger (or its children)")
+    parser.add_argument("--command", help="only show records logged during this command (JSON logs only)")
+    parser.add_argument("--since", type=datetime.datetime.fromisoformat, help="only show records at or after this time")
+    parser.add_argument("--grep", type=re.compile, help="only show records whose message matches this regex")
+    parser.add_argument("--json", action="store_true", help="print the parsed records as JSON lines")
+    args = parser.parse_args()
+
+    paths: list[pathlib.Path] = args.paths or discover(pathlib.Path("logs"))
+    minimum = LEVELS.index(args.level) if args.level else 0
+
+    for path in paths:
+        for line in read_lines(path):
+            record = parse(line)
+            if record is None:
+                # continuation lines (tracebacks) of text logs.
+                if not (args.level or args.logger or args.command or args.since or args.grep):
+                    sys.stdout.write(f"{line}\n")
+                continue
+
+            level = record.get("level", "DEBUG")
+            if level in LEVELS and LEVELS.index(level) < minimum:
+                continue
+
+            logger = record.get("logger", "")
+            if args.logger and logger != args.logger and not logger.startswith(f"{args.logger}."):
+                continue
+
+            if args.command and record.get("command") != args.command:
+                continue
+
+            if args.since:
+                when = datetime.datetime.fromisoformat(record["time"])
+                if when.tzinfo is None and args.since.tzinfo is not None:
+                    when = when.replace(tzinfo=args.since.tzinfo)
+                elif args.since.tzinfo is None and when.tzinfo is not None:
+                    when = when.replace(tzinfo=None)
+                if when < args.since:
+                    continue
+
+            if args.grep and not args.grep.search(record.get("message", "")):
+                continue
+
+            sys.stdout.write(f"{json.dumps(record) if args.json else line}\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
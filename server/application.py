@@ -21,41 +21,224 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from json import JSONDecodeError
+import asyncio
+import contextlib
+import json
+import operator
+from collections.abc import AsyncGenerator
 from typing import Any
 
+import asyncpg
 import starlette_plus
 
 from core.bot import Bot
 from core.core import CONFIG
+from core.modlog import ModLogQueue
+from core.utils.metrics import REGISTRY
+from types_.papi import ModLogPayload
+from types_.validation import validate
+
+MODLOG_MAX_BATCH = 1000
+MODLOG_MAX_PENDING = 10_000
+MODLOG_RETRY_AFTER = 30
+
+
+def json_response(content: Any, /, *, status_code: int, headers: dict[str, str] | None = None) -> starlette_plus.Response:
+    return starlette_plus.Response(
+        json.dumps(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def check_auth(request: starlette_plus.Request, expected: str | None, /) -> starlette_plus.Response | None:
+    """The response to send instead when ``request`` doesn't carry the ``expected`` authorization header."""
+    if not expected:
+        return starlette_plus.Response("Unable to process request: Missing Auth (Server)", status_code=503)
+
+    auth: str | None = request.headers.get("authorization", None)
+    if not auth:
+        return starlette_plus.Response("Forbidden", status_code=403)
+
+    if auth != expected:
+        return starlette_plus.Response("Unauthorized", status_code=401)
+
+    return None
+
+
+def metrics_response(request: starlette_plus.Request, /) -> starlette_plus.Response:
+    token = CONFIG["TOKENS"].get("metrics")
+    if failed := check_auth(request, token and f"Bearer {token}"):
+        return failed
+
+    return starlette_plus.Response(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+class MetricsApplication(starlette_plus.Application):
+    """Serves only ``/metrics``, from the bot's process when the webserver runs in its own."""
+
+    def __init__(self) -> None:
+        super().__init__(access_log=False)
+
+    @starlette_plus.route("/metrics", methods=["GET"], prefix=False, include_in_schema=False)
+    async def metrics(self, request: starlette_plus.Request) -> starlette_plus.Response:
+        return metrics_response(request)
 
 
 class Application(starlette_plus.Application):
-    def __init__(self, *, bot: Bot) -> None:
-        self.bot: Bot = bot
+    """The bot's webserver.
+
+    When ``bot`` is passed the application shares the bot's event loop and modlog queue.
+    Without it (see ``server/__main__.py``) the application runs in its own process and opens its own pool,
+    the bot then finds out about new events through Postgres' ``NOTIFY``.
+    """
+
+    def __init__(self, *, bot: Bot | None = None) -> None:
+        self.bot: Bot | None = bot
         self.__auth: str | None = CONFIG["TOKENS"].get("pythonista")
+        self._modlog_queue: ModLogQueue | None = bot.modlog_queue if bot else None
+        self._modlog_queue_lock: asyncio.Lock = asyncio.Lock()
 
-        super().__init__(access_log=False)
+        super().__init__(access_log=False, lifespan=self._lifespan)
 
-    @starlette_plus.route("/dpy/modlog", methods=["POST"], prefix=False, include_in_schema=False)
-    async def dpy_modlog(self, request: starlette_plus.Request) -> starlette_plus.Response:
-        if not self.__auth:
-            return starlette_plus.Response("Unable to process request: Missing Auth (Server)", status_code=503)
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, _: starlette_plus.Application) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Close the pool opened by :meth:`get_modlog_queue`, a queue shared with the bot is left to the bot."""
+        if self.bot or not self._modlog_queue:
+            return
+
+        queue, self._modlog_queue = self._modlog_queue, None
+        await queue.pool.close()
+
+    async def get_modlog_queue(self) -> ModLogQueue:
+        if self._modlog_queue:
+            return self._modlog_queue
+
+        async with self._modlog_queue_lock:
+            if not self._modlog_queue:
+                pool: asyncpg.Pool[asyncpg.Record] = await asyncpg.create_pool(  # pyright: ignore[reportAssignmentType] # never None without a `setup`
+                    dsn=CONFIG["DATABASE"]["dsn"],
+                    min_size=1,
+                    max_size=4,
+                )
+                self._modlog_queue = ModLogQueue(pool)
+
+        return self._modlog_queue
+
+    def _check_auth(self, request: starlette_plus.Request) -> starlette_plus.Response | None:
+        return check_auth(request, self.__auth)
 
-        auth: str | None = request.headers.get("authorization", None)
-        if not auth:
-            return starlette_plus.Response("Forbidden", status_code=403)
+    async def _check_backpressure(self, incoming: int = 1) -> starlette_plus.Response | None:
+        try:
+            depth = await (await self.get_modlog_queue()).depth()
+        except (OSError, asyncpg.PostgresError):
+            return starlette_plus.Response("Unable to process request: Queue unavailable", status_code=503)
+
+        if depth + incoming > MODLOG_MAX_PENDING:
+            return starlette_plus.Response(
+                "Too many queued events, try again later.",
+                status_code=429,
+                headers={"Retry-After": str(MODLOG_RETRY_AFTER)},
+            )
+
+        return None
 
-        if auth != self.__auth:
-            return starlette_plus.Response("Unauthorized", status_code=401)
+    @starlette_plus.route("/metrics", methods=["GET"], prefix=False, include_in_schema=False)
+    async def metrics(self, request: starlette_plus.Request) -> starlette_plus.Response:
+        """Prometheus scrape target. Out of process workers only see their own metrics, see ``metrics_port``."""
+        return metrics_response(request)
+
+    @starlette_plus.route("/dpy/modlog", methods=["POST"], prefix=False, include_in_schema=False)
+    async def dpy_modlog(self, request: starlette_plus.Request) -> starlette_plus.Response:
+        if failed := self._check_auth(request):
+            return failed
 
         try:
             data: dict[str, Any] = await request.json()
-        except (JSONDecodeError, TypeError) as e:
+        except (json.JSONDecodeError, TypeError) as e:
             return starlette_plus.Response(f"Invalid payload: {e}", status_code=400)
 
         if not data:
             return starlette_plus.Response("Invalid payload: Empty payload provided", status_code=400)
 
-        self.bot.dispatch("papi_dpy_modlog", data)
-        return starlette_plus.Response(status_code=204)
+        if errors := validate(ModLogPayload, data):
+            return starlette_plus.Response(f"Invalid payload: {'; '.join(errors)}", status_code=400)
+
+        if failed := await self._check_backpressure():
+            return failed
+
+        try:
+            await (await self.get_modlog_queue()).put(data)  # pyright: ignore[reportArgumentType] # validated above
+        except (OSError, asyncpg.PostgresError):
+            return starlette_plus.Response("Unable to process request: Queue unavailable", status_code=503)
+
+        return starlette_plus.Response(status_code=202)
+
+    @starlette_plus.route("/dpy/modlog/batch", methods=["POST"], prefix=False, include_in_schema=False)
+    async def dpy_modlog_batch(self, request: starlette_plus.Request) -> starlette_plus.Response:
+        """Accepts either a JSON array of payloads, or newline delimited JSON (``application/x-ndjson``)."""
+        if failed := self._check_auth(request):
+            return failed
+
+        body = await request.body()
+
+        # an NDJSON line that can't be parsed is rejected on its own, like a payload that fails validation.
+        items: list[tuple[int, Any]] = []
+        rejected: list[dict[str, Any]] = []
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            for index, line in enumerate(line for line in body.splitlines() if line.strip()):
+                try:
+                    items.append((index, json.loads(line)))
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    rejected.append({"index": index, "errors": [f"Invalid JSON: {e}"]})
+
+        else:
+            try:
+                data = json.loads(body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                return starlette_plus.Response(f"Invalid payload: {e}", status_code=400)
+
+            if isinstance(data, list):
+                items = list(enumerate(data))  # pyright: ignore[reportUnknownArgumentType] # validated below
+
+        count = len(items) + len(rejected)
+        if not count:
+            return starlette_plus.Response("Invalid payload: Expected a non-empty array of payloads", status_code=400)
+
+        if count > MODLOG_MAX_BATCH:
+            return starlette_plus.Response(f"Too many payloads, the limit is {MODLOG_MAX_BATCH}", status_code=413)
+
+        accepted: list[ModLogPayload] = []
+        for index, item in items:
+            if errors := validate(ModLogPayload, item):
+                rejected.append({"index": index, "errors": errors})
+            else:
+                accepted.append(item)
+
+        rejected.sort(key=operator.itemgetter("index"))
+
+        if accepted:
+            if failed := await self._check_backpressure(len(accepted)):
+                return failed
+
+            try:
+                await (await self.get_modlog_queue()).put_many(accepted)
+            except (OSError, asyncpg.PostgresError):
+                return starlette_plus.Response("Unable to process request: Queue unavailable", status_code=503)
+
+        return json_response(
+            {"accepted": len(accepted), "rejected": rejected},
+            status_code=202 if accepted else 400,
+        )
+
+
+def create_app() -> Application:
+    """The application factory used when running the webserver out of process."""
+    return Application()
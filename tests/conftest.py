@@ -0,0 +1,93 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import contextlib
+import os
+import pathlib
+import re
+from collections.abc import AsyncGenerator, Callable, Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import uvicorn
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+# config.py reads the config as soon as core is imported, the template is a valid config.
+os.environ.setdefault("PYTHONISTABOT_CONFIG", str(ROOT / "config.template.toml"))
+
+import config  # noqa: E402 # after the config path is set
+
+
+class Clock:
+    """A monotonic clock that only moves when a test sets ``now``."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.now: float = 0.0
+        self._monkeypatch: pytest.MonkeyPatch = monkeypatch
+
+    def __call__(self) -> float:
+        return self.now
+
+    def install(self, module: str, /) -> None:
+        """Make ``time.monotonic()`` in ``module`` read this clock, for code that doesn't take a timer."""
+        self._monkeypatch.setattr(f"{module}.time", SimpleNamespace(monotonic=self))
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    return Clock(monkeypatch)
+
+
+@pytest.fixture
+def configure(tmp_path: pathlib.Path) -> Iterator[Callable[..., None]]:
+    """Reload the config with some of its string values filled in, the original is reloaded after the test."""
+
+    def configure(**values: str) -> None:
+        text = config.CONFIG_PATH.read_text()
+        for key, value in values.items():
+            text = re.sub(rf"^{key} = .*$", f"{key} = '{value}'", text, flags=re.MULTILINE)
+
+        path = tmp_path / "config.toml"
+        path.write_text(text)
+        config.reload(path)
+
+    yield configure
+    config.reload()
+
+
+@contextlib.asynccontextmanager
+async def serve(app: Any, /) -> AsyncGenerator[str, None]:
+    """Run an ASGI app with uvicorn on a free local port, yielding its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:  # noqa: ASYNC110 # uvicorn has no startup event to wait on
+        await asyncio.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        await serving
@@ -0,0 +1,131 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import json
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+import pytest
+from conftest import serve
+
+TOKEN = "batch"  # noqa: S105 # only used against the local server
+
+MODLOG_EVENT = {
+    "moderation_event_type": 1,
+    "guild_id": 1,
+    "target_id": 2,
+    "author_id": 3,
+    "reason": None,
+    "event_time": "2024-01-01T00:00:00+00:00",
+}
+
+
+class FakeQueue:
+    def __init__(self) -> None:
+        self.queued: list[Any] = []
+
+    async def depth(self) -> int:
+        return len(self.queued)
+
+    async def put_many(self, payloads: list[Any], /) -> None:
+        self.queued.extend(payloads)
+
+
+async def _post_batch(body: bytes, content_type: str) -> tuple[int, Any, list[Any]]:
+    from server.application import Application  # noqa: PLC0415 # needs the config to be loaded first
+
+    queue = FakeQueue()
+    app = Application(bot=SimpleNamespace(modlog_queue=queue))  # pyright: ignore[reportArgumentType] # only the queue is used
+    headers = {"authorization": TOKEN, "content-type": content_type}
+    async with (
+        serve(app) as url,
+        aiohttp.ClientSession() as session,
+        session.post(f"{url}/dpy/modlog/batch", data=body, headers=headers) as response,
+    ):
+        text = await response.text()
+        return response.status, json.loads(text) if response.content_type == "application/json" else text, queue.queued
+
+
+@pytest.fixture(autouse=True)
+def _token(configure: Callable[..., None]) -> None:
+    configure(pythonista=TOKEN)
+
+
+def test_ndjson_lines_are_rejected_on_their_own() -> None:
+    lines = [
+        json.dumps(MODLOG_EVENT),
+        "{not json",
+        "",
+        json.dumps({**MODLOG_EVENT, "guild_id": "1"}),
+        json.dumps(MODLOG_EVENT),
+    ]
+    body = "\n".join(lines).encode()
+
+    status, result, queued = asyncio.run(_post_batch(body, "application/x-ndjson"))
+
+    assert status == 202
+    assert result["accepted"] == 2
+    # blank lines don't count, so the indices match the payloads sent.
+    assert [entry["index"] for entry in result["rejected"]] == [1, 2]
+    assert result["rejected"][0]["errors"][0].startswith("Invalid JSON")
+    assert result["rejected"][1]["errors"] == ["$.guild_id: expected int, got str"]
+    assert queued == [MODLOG_EVENT, MODLOG_EVENT]
+
+
+def test_array_batch() -> None:
+    body = json.dumps([MODLOG_EVENT, {"reason": 1}]).encode()
+
+    status, result, queued = asyncio.run(_post_batch(body, "application/json"))
+
+    assert status == 202
+    assert result["accepted"] == 1
+    assert [entry["index"] for entry in result["rejected"]] == [1]
+    assert queued == [MODLOG_EVENT]
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type"),
+    [
+        (b"{not json", "application/json"),
+        (b"{}", "application/json"),
+        (b"[]", "application/json"),
+        (b"\n\n", "application/x-ndjson"),
+    ],
+)
+def test_unusable_batch(body: bytes, content_type: str) -> None:
+    status, _, queued = asyncio.run(_post_batch(body, content_type))
+
+    assert status == 400
+    assert not queued
+
+
+def test_all_rejected() -> None:
+    status, result, queued = asyncio.run(_post_batch(b"nope\n[]", "application/x-ndjson"))
+
+    assert status == 400
+    assert result["accepted"] == 0
+    assert [entry["index"] for entry in result["rejected"]] == [0, 1]
+    assert not queued
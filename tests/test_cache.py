@@ -0,0 +1,108 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import pytest
+from conftest import Clock
+
+from core.utils.cache import TTLCache
+
+
+def test_evicts_least_recently_used(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=2, timer=clock)
+    cache[1] = "a"
+    cache[2] = "b"
+    assert cache[1] == "a"  # 1 is now more recently used than 2
+
+    cache[3] = "c"
+
+    assert list(cache) == [1, 3]
+    assert cache.stats().evictions == 1
+
+
+def test_entries_expire(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=10, ttl=10.0, timer=clock)
+    cache[1] = "a"
+    cache.set(2, "b", ttl=100.0)
+
+    clock.now = 50.0
+
+    assert 1 not in cache
+    assert cache.get(1) is None
+    assert cache.get(1, "default") == "default"
+    assert cache[2] == "b"
+    with pytest.raises(KeyError):
+        cache[1]
+
+
+def test_size_excludes_expired_entries(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=10, ttl=10.0, timer=clock)
+    cache.update({1: "a", 2: "b"})
+    clock.now = 5.0
+    cache[3] = "c"
+
+    clock.now = 12.0
+
+    assert len(cache) == 1
+    assert list(cache) == [3]
+    assert cache.stats().size == 1
+    assert cache.stats().expirations == 2
+
+
+def test_stats(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=10, timer=clock)
+    cache[1] = "a"
+    cache.get(1)
+    cache.get(1)
+    cache.get(2)
+
+    stats = cache.stats()
+
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_no_ttl_keeps_entries(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=10, timer=clock)
+    cache[1] = "a"
+
+    clock.now = 1e9
+
+    assert cache[1] == "a"
+    assert cache.purge() == 0
+
+
+def test_mutable_mapping_methods(clock: Clock) -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=10, timer=clock)
+    cache[1] = "a"
+
+    assert cache.pop(1) == "a"
+    assert cache.pop(1, None) is None
+    assert cache.setdefault(2, "b") == "b"
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_maxsize_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="maxsize"):
+        TTLCache(maxsize=0)
@@ -0,0 +1,70 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import pytest
+from conftest import Clock
+
+from core.utils.fingerprint import ErrorAggregator, ErrorSummary
+
+
+@pytest.fixture(autouse=True)
+def _monotonic(clock: Clock) -> None:
+    clock.install("core.utils.fingerprint")
+
+
+def test_repeats_are_suppressed(clock: Clock) -> None:
+    aggregator = ErrorAggregator(window=60.0)
+    assert aggregator.record("a", title="A")
+    assert not aggregator.record("a", title="A")
+    assert not aggregator.record("a", title="A")
+
+    clock.now = 10.0
+    assert aggregator.drain() == [ErrorSummary("a", "A", 2, 10.0)]
+    assert aggregator.drain() == []
+
+
+def test_expired_window_keeps_its_count(clock: Clock) -> None:
+    aggregator = ErrorAggregator(window=60.0)
+    aggregator.record("a", title="A")
+    aggregator.record("a", title="A")
+
+    clock.now = 70.0
+    assert aggregator.record("a", title="A")  # a new window, reported in full
+    aggregator.record("a", title="A")
+
+    clock.now = 80.0
+    assert aggregator.drain() == [ErrorSummary("a", "A", 2, 80.0)]
+
+
+def test_evicted_entry_keeps_its_count(clock: Clock) -> None:
+    aggregator = ErrorAggregator(maxsize=2)
+    aggregator.record("a", title="A")
+    aggregator.record("a", title="A")
+    aggregator.record("b", title="B")
+    aggregator.record("c", title="C")  # evicts a
+
+    assert len(aggregator) == 2
+
+    clock.now = 5.0
+    assert aggregator.drain() == [ErrorSummary("a", "A", 1, 5.0)]
+    assert aggregator.drain() == []
@@ -0,0 +1,75 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import discord
+import pytest
+
+import core
+from core.utils.flight_recorder import FlightRecorder
+
+
+@pytest.fixture
+def decoded(monkeypatch: pytest.MonkeyPatch) -> list[str | bytes]:
+    decoded: list[str | bytes] = []
+    from_json = discord.utils._from_json  # pyright: ignore[reportPrivateUsage] # what the recorder decodes with
+
+    def counting(raw: str | bytes) -> Any:
+        decoded.append(raw)
+        return from_json(raw)
+
+    monkeypatch.setattr(discord.utils, "_from_json", counting)
+    return decoded
+
+
+def _message(op: int, /, *, t: str | None = None, s: int | None = None, padding: int = 0) -> str:
+    return json.dumps({"t": t, "s": s, "op": op, "d": {"content": "x" * padding} if padding else None})
+
+
+def test_dispatches_are_not_decoded_again(decoded: list[str | bytes]) -> None:
+    bot = core.Bot()
+    recorder = bot.flight_recorder = FlightRecorder(8, sample_rate=3)
+    bot.ws = SimpleNamespace(sequence=None)  # pyright: ignore[reportAttributeAccessIssue] # only the sequence is read
+    parser = bot._timed_parser("MESSAGE_CREATE", lambda _: None)  # pyright: ignore[reportPrivateUsage] # the gateway's hook
+
+    heartbeat_ack = _message(11)
+    for sequence in (1, 2):
+        raw = _message(0, t="MESSAGE_CREATE", s=sequence, padding=4096)
+        bot._record_gateway_message(recorder, raw)  # pyright: ignore[reportPrivateUsage] # fed from dispatch
+        bot.ws.sequence = sequence
+        parser({})
+
+    bot._record_gateway_message(recorder, heartbeat_ack)  # pyright: ignore[reportPrivateUsage] # fed from dispatch
+
+    # the large dispatches were only decoded by the gateway, the heartbeat ack is small (and the sampled one).
+    assert decoded == [heartbeat_ack]
+    assert [(event.op, event.t, event.s) for event in recorder] == [
+        (0, "MESSAGE_CREATE", 1),
+        (0, "MESSAGE_CREATE", 2),
+        (11, None, None),
+    ]
+    assert [payload["op"] for _, payload in recorder.payloads] == [11]
+    assert recorder.last_size == len(heartbeat_ack)
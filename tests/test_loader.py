@@ -0,0 +1,152 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import pathlib
+import sys
+import textwrap
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import core
+from core.loader import load_extensions, scan_lazy_extension
+
+PACKAGE_EXTENSION = {
+    "__init__.py": """
+        import builtins
+
+        from .cog import Counted
+
+        builtins.loader_test_executions.append(__name__)
+
+
+        async def setup(bot):
+            await bot.add_cog(Counted())
+    """,
+    "cog.py": """
+        import asyncio
+
+        from discord.ext import commands
+
+
+        class Counted(commands.Cog):
+            async def cog_load(self):
+                await asyncio.sleep(0.05)
+    """,
+}
+
+
+@pytest.fixture
+def executions(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
+    package = tmp_path / "loader_test_extension"
+    package.mkdir()
+    for filename, source in PACKAGE_EXTENSION.items():
+        (package / filename).write_text(textwrap.dedent(source))
+
+    executions: list[str] = []
+    monkeypatch.setattr("builtins.loader_test_executions", executions, raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield executions
+
+    for name in [name for name in sys.modules if name.startswith("loader_test_extension")]:
+        del sys.modules[name]
+
+
+def test_package_extension_runs_once(executions: list[str]) -> None:
+    async def run() -> list[core.ExtensionTiming]:
+        bot = core.Bot()  # never logged in, nothing to close
+        timings = await load_extensions(bot, ["loader_test_extension"])
+        assert "loader_test_extension" in bot.extensions
+        assert bot.get_cog("Counted") is not None
+
+        # the real spec is back, so reloading works like it would for any other extension.
+        await bot.reload_extension("loader_test_extension")
+        return timings
+
+    (timing,) = asyncio.run(run())
+
+    assert executions == ["loader_test_extension", "loader_test_extension"]
+    assert timing.name == "loader_test_extension"
+    assert timing.cog_load >= 0.05
+
+
+GATED_EXTENSION = """
+    from discord.ext import commands
+
+    REQUIRES_CONFIG = {section!r}
+
+
+    class Gated(commands.Cog):
+        @commands.command()
+        async def gated(self, ctx):
+            pass
+"""
+
+
+@pytest.mark.parametrize(("section", "lazy"), [("SNEKBOX", True), ("NOT_CONFIGURED", False)])
+def test_config_gated_extension(
+    section: str,
+    lazy: bool,  # noqa: FBT001 # parametrized
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / "loader_test_gated.py").write_text(textwrap.dedent(GATED_EXTENSION.format(section=section)))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # without its section the extension is loaded eagerly, so its setup can decline and no stubs are registered.
+    assert (scan_lazy_extension("loader_test_gated") is not None) is lazy
+
+
+def test_lazy_stub_is_not_measured() -> None:
+    def context(**extras: Any) -> Any:
+        command = SimpleNamespace(qualified_name="command", extras=extras)
+        return SimpleNamespace(command=command, command_failed=False)
+
+    async def run() -> core.Bot:
+        bot = core.Bot()
+        stub, real = context(lazy_extension="extension"), context()
+
+        # the stub's hooks run around the real command's, which are the ones that count.
+        await bot._before_command(stub)  # pyright: ignore[reportPrivateUsage] # the global hooks
+        await bot._before_command(real)  # pyright: ignore[reportPrivateUsage] # the global hooks
+        await bot._after_command(real)  # pyright: ignore[reportPrivateUsage] # the global hooks
+        await bot._after_command(stub)  # pyright: ignore[reportPrivateUsage] # the global hooks
+
+        async def on_command_completion(ctx: Any) -> None:  # noqa: RUF029 # listeners are coroutines
+            completed.append(ctx)
+
+        bot.loop = asyncio.get_running_loop()  # set when the bot logs in, events are scheduled on it
+        bot.add_listener(on_command_completion)
+        bot.dispatch("command_completion", stub)
+        bot.dispatch("command_completion", real)
+        await asyncio.sleep(0)
+        return bot
+
+    completed: list[Any] = []
+    bot = asyncio.run(run())
+
+    assert [(name, stat.latency.count) for name, stat in bot.command_stats] == [("command", 1)]
+    assert len(completed) == 1
@@ -0,0 +1,191 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import pathlib
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueListener
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import core
+import query_logs
+from core.utils.logging import LOG_CONTEXT, ContextFilter, JSONFormatter, LocalQueueHandler, LogQueue, OverflowPolicy
+
+THREADS = 16
+RECORDS_PER_THREAD = 5000
+
+
+@pytest.fixture
+def logger() -> logging.Logger:
+    logger = logging.getLogger("tests.logging")
+    logger.propagate = False
+    logger.handlers.clear()
+    return logger
+
+
+def test_json_exception_survives_queue(logger: logging.Logger) -> None:
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JSONFormatter())
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    logger.addHandler(LocalQueueHandler(log_queue))
+    listener = QueueListener(log_queue, output)
+    listener.start()
+
+    try:
+        1 / 0  # noqa: B018 # raising on purpose
+    except ZeroDivisionError:
+        logger.exception("failed with %s", "args", extra={"command": "test"})
+    finally:
+        listener.stop()
+
+    data = json.loads(stream.getvalue())
+    assert data["message"] == "failed with args"
+    assert data["command"] == "test"
+    assert "ZeroDivisionError" in data["exception"]
+    assert "ZeroDivisionError" not in data["message"]
+
+
+def _record(thread: int, index: int, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("tests.stress", level, __file__, 0, "%d-%d", (thread, index), None)
+
+
+def _produce(log_queue: LogQueue, thread: int) -> None:
+    for index in range(RECORDS_PER_THREAD):
+        log_queue.put(_record(thread, index, logging.ERROR if index % 10 == 0 else logging.INFO))
+
+
+async def _stress(log_queue: LogQueue) -> list[logging.LogRecord]:
+    received: list[logging.LogRecord] = []
+
+    async def consume() -> None:
+        while True:
+            received.append(await log_queue.get())
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0)  # the consumer binds the queue to this loop on its first get
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(THREADS) as pool:
+        await asyncio.gather(*(loop.run_in_executor(pool, _produce, log_queue, thread) for thread in range(THREADS)))
+
+    consumer.cancel()
+    while not log_queue.empty():
+        received.append(log_queue.get_nowait())
+
+    return received
+
+
+@pytest.mark.parametrize("policy", ["drop_oldest", "sample"])
+@pytest.mark.parametrize("maxsize", [100, THREADS * RECORDS_PER_THREAD])
+def test_log_queue_many_threads(policy: OverflowPolicy, maxsize: int) -> None:
+    log_queue = LogQueue(maxsize, policy=policy, sample_rate=5)
+
+    received = asyncio.run(asyncio.wait_for(_stress(log_queue), timeout=60))
+
+    # every record is either delivered or counted as dropped, and each thread's records arrive in order.
+    assert len(received) + log_queue.dropped == THREADS * RECORDS_PER_THREAD
+    last_seen: dict[int, int] = {}
+    for record in received:
+        thread, index = record.args  # pyright: ignore[reportGeneralTypeIssues] # always a tuple here
+        assert index > last_seen.get(thread, -1)
+        last_seen[thread] = index
+
+    if maxsize == THREADS * RECORDS_PER_THREAD and policy == "drop_oldest":
+        assert log_queue.dropped == 0
+
+
+def test_log_queue_drops_oldest() -> None:
+    log_queue = LogQueue(3)
+    for index in range(5):
+        log_queue.put(_record(0, index))
+
+    assert log_queue.dropped == 2
+    assert [log_queue.get_nowait().args for _ in range(3)] == [(0, 2), (0, 3), (0, 4)]
+    assert log_queue.empty()
+
+
+def test_log_queue_samples_under_pressure() -> None:
+    log_queue = LogQueue(100, policy="sample", sample_rate=10)
+    for index in range(75):
+        log_queue.put(_record(0, index))
+
+    for index in range(20):
+        log_queue.put(_record(1, index))
+        log_queue.put(_record(2, index, logging.ERROR))
+
+    # past three quarters full, one in ten INFO records is kept and every ERROR record is.
+    assert log_queue.qsize() == 75 + 2 + 20
+    assert log_queue.dropped == 18
+
+
+def test_command_latency_is_logged(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.addFilter(ContextFilter())
+    output.setFormatter(JSONFormatter())
+    monkeypatch.setattr(logging.getLogger("core.bot.commands"), "handlers", [output])
+    caplog.set_level(logging.DEBUG, logger="core.bot.commands")
+
+    async def run() -> None:
+        bot = core.Bot()
+        ctx: Any = SimpleNamespace(command=SimpleNamespace(qualified_name="rtfm", extras={}), command_failed=False)
+        token = LOG_CONTEXT.set({"command": "rtfm", "guild": 1, "channel": 2})
+        try:
+            await bot._before_command(ctx)  # pyright: ignore[reportPrivateUsage] # the global hooks
+            await bot._after_command(ctx)  # pyright: ignore[reportPrivateUsage] # the global hooks
+        finally:
+            LOG_CONTEXT.reset(token)
+
+    asyncio.run(run())
+
+    record = json.loads(stream.getvalue())
+    assert record["command"] == "rtfm"
+    assert record["guild"] == 1
+    assert isinstance(record["latency"], float)
+
+
+def test_discover_finds_only_the_bot_log(tmp_path: pathlib.Path) -> None:
+    names = [
+        "PythonistaBot.jsonl",
+        "PythonistaBot.jsonl.1.gz",
+        "PythonistaBot.jsonl.2.gz",
+        "PythonistaBot.jsonl.3.gz.partial",
+        "startup.jsonl",
+        "prev_events.log",
+    ]
+    for name in names:
+        (tmp_path / name).touch()
+
+    found = query_logs.discover(tmp_path)
+
+    assert [path.name for path in found] == ["PythonistaBot.jsonl.2.gz", "PythonistaBot.jsonl.1.gz", "PythonistaBot.jsonl"]
+    assert query_logs.discover(tmp_path / "missing") == []
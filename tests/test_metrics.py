@@ -0,0 +1,79 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import aiohttp
+import pytest
+from conftest import serve
+
+from core.utils.metrics import Counter, Gauge, Registry
+
+TOKEN = "scrape"  # noqa: S105 # only used against the local server
+
+
+def test_failing_gauge_is_left_out(caplog: pytest.LogCaptureFixture) -> None:
+    registry = Registry()
+    Counter("events", "Events.", registry=registry).inc()
+    gauge = Gauge("queue_size", "Queue size.", registry=registry)
+    value: list[float] = []
+    gauge.set_function(lambda: value[0])
+
+    with caplog.at_level(logging.ERROR, logger="core.utils.metrics"):
+        first = registry.render()
+        second = registry.render()
+
+    assert "pythonistabot_events_total 1" in first
+    assert "queue_size" not in first
+    assert first == second
+    assert len(caplog.records) == 1  # only logged until it recovers
+
+    value.append(3)
+    assert "pythonistabot_queue_size 3" in registry.render()
+
+
+async def _scrape(headers: dict[str, str]) -> int:
+    from server.application import MetricsApplication  # noqa: PLC0415 # needs the config to be loaded first
+
+    async with (
+        serve(MetricsApplication()) as url,
+        aiohttp.ClientSession() as session,
+        session.get(f"{url}/metrics", headers=headers) as response,
+    ):
+        return response.status
+
+
+@pytest.mark.parametrize(
+    ("token", "headers", "status"),
+    [
+        ("", {"authorization": f"Bearer {TOKEN}"}, 503),
+        (TOKEN, {}, 403),
+        (TOKEN, {"authorization": "Bearer wrong"}, 401),
+        (TOKEN, {"authorization": f"Bearer {TOKEN}"}, 200),
+    ],
+)
+def test_metrics_auth(configure: Callable[..., None], token: str, headers: dict[str, str], status: int) -> None:
+    configure(metrics=token)
+    assert asyncio.run(_scrape(headers)) == status
@@ -0,0 +1,187 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import contextlib
+import os
+import pathlib
+import statistics
+import time
+from collections.abc import AsyncGenerator, Callable
+
+import aiohttp
+import asyncpg
+import pytest
+from conftest import serve
+
+from core.modlog import ModLogQueue
+
+# these need a disposable database, the schema is created in it and the modlog queue is emptied.
+DSN = os.environ.get("PYTHONISTABOT_TEST_DSN")
+SCHEMA = (pathlib.Path(__file__).parent.parent / "database" / "schema.sql").read_text()
+
+pytestmark = pytest.mark.skipif(not DSN, reason="PYTHONISTABOT_TEST_DSN is not set")
+
+TOKEN = "load-test"  # noqa: S105 # only used against the local server
+
+MODLOG_EVENT = {
+    "moderation_event_type": 1,
+    "guild_id": 1,
+    "target_id": 2,
+    "author_id": 3,
+    "reason": None,
+    "event_time": "2024-01-01T00:00:00+00:00",
+}
+
+
+@contextlib.asynccontextmanager
+async def _queue() -> AsyncGenerator[ModLogQueue, None]:
+    async with asyncpg.create_pool(DSN, min_size=1, max_size=8) as pool:
+        await pool.execute(SCHEMA)
+        await pool.execute("TRUNCATE modlog_queue;")
+        yield ModLogQueue(pool)
+
+
+async def _woken(queue: ModLogQueue, /, *, timeout: float) -> bool:
+    start = time.monotonic()
+    await queue.wait(timeout=timeout)
+    return time.monotonic() - start < timeout
+
+
+def test_listen_survives_lost_connection() -> None:
+    async def run() -> None:
+        async with _queue() as queue, _queue() as other:
+            await queue.listen()
+            assert await other.pool.fetchval(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query LIKE 'LISTEN%';",
+            )
+
+            # losing the connection wakes the consumer, in case something was queued while it was gone.
+            assert await _woken(queue, timeout=5)
+
+            # payloads queued by another process wake us up again once we're listening on a new connection.
+            deadline = time.monotonic() + 10
+            while True:
+                await other.put(MODLOG_EVENT)  # pyright: ignore[reportArgumentType] # a valid payload
+                if await _woken(queue, timeout=0.5):
+                    break
+
+                assert time.monotonic() < deadline, "never listened again"
+
+            await queue.unlisten()
+
+    asyncio.run(run())
+
+
+def test_unlisten_while_reconnecting() -> None:
+    async def run() -> None:
+        async with _queue() as queue, _queue() as other:
+            await queue.listen()
+            await other.pool.execute("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query LIKE 'LISTEN%';")
+            await queue.wait(timeout=5)
+
+            await queue.unlisten()
+
+        # closing the pool waits for every connection to be released, a leaked listener would hang here.
+
+    asyncio.run(asyncio.wait_for(run(), timeout=10))
+
+
+def test_claims_are_exclusive_under_load() -> None:
+    async def run() -> list[int]:
+        async with _queue() as queue:
+            await asyncio.gather(*(queue.put_many([MODLOG_EVENT] * 100) for _ in range(20)))  # pyright: ignore[reportArgumentType] # a valid payload
+
+            claimed: list[int] = []
+
+            async def consume() -> None:
+                while entries := await queue.claim(25, lease=60):
+                    claimed.extend(entry.id for entry in entries)
+                    await queue.ack([entry.id for entry in entries])
+
+            await asyncio.gather(*(consume() for _ in range(8)))
+            assert await queue.pool.fetchval("SELECT COUNT(*) FROM modlog_queue;") == 0
+            return claimed
+
+    claimed = asyncio.run(run())
+
+    assert len(claimed) == len(set(claimed)) == 2000
+
+
+def test_retry_and_lease() -> None:
+    async def run() -> None:
+        async with _queue() as queue:
+            await queue.put(MODLOG_EVENT)  # pyright: ignore[reportArgumentType] # a valid payload
+
+            [entry] = await queue.claim(10, lease=60)
+            assert entry.attempts == 1
+            assert entry.payload == MODLOG_EVENT
+            assert await queue.claim(10, lease=60) == []  # still leased
+
+            await queue.retry([entry.id], delay=0, max_delay=0)
+            [entry] = await queue.claim(10, lease=0)
+            assert entry.attempts == 2
+
+            # an expired lease (the consumer crashed) hands the entry out again.
+            [entry] = await queue.claim(10, lease=60)
+            assert entry.attempts == 3
+
+    asyncio.run(run())
+
+
+def test_endpoint_load(configure: Callable[..., None]) -> None:
+    configure(dsn=DSN, pythonista=TOKEN)
+    from server.application import MODLOG_MAX_PENDING, Application  # noqa: PLC0415 # needs the config to be loaded first
+
+    requests = 2000
+    concurrency = 50
+
+    async def post(session: aiohttp.ClientSession, url: str, timings: list[float]) -> None:
+        start = time.perf_counter()
+        async with session.post(url, json=MODLOG_EVENT, headers={"authorization": TOKEN}) as response:
+            assert response.status == 202
+        timings.append(time.perf_counter() - start)
+
+    async def run() -> tuple[list[float], int]:
+        async with _queue() as queue, serve(Application()) as base_url:
+            url = f"{base_url}/dpy/modlog"
+            timings: list[float] = []
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def limited(session: aiohttp.ClientSession) -> None:
+                async with semaphore:
+                    await post(session, url, timings)
+
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(*(limited(session) for _ in range(requests)))
+
+            return timings, await queue.pool.fetchval("SELECT COUNT(*) FROM modlog_queue;")
+
+    assert requests < MODLOG_MAX_PENDING
+    timings, queued = asyncio.run(run())
+
+    assert queued == requests
+    # accepting an event is a single insert, it shouldn't slow down as the queue grows.
+    quarter = requests // 4
+    first, last = statistics.median(timings[:quarter]), statistics.median(timings[-quarter:])
+    assert last < first * 3 + 0.02, f"median went from {first * 1e3:.1f}ms to {last * 1e3:.1f}ms"
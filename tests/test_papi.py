@@ -0,0 +1,220 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+from aiohttp import web
+
+import core
+import core.papi
+from core.enums import PythonistaAPIOp
+from core.papi import PythonistaAPIWebsocket
+
+MODLOG_EVENT = {
+    "moderation_event_type": 1,
+    "guild_id": 1,
+    "target_id": 2,
+    "author_id": 3,
+    "reason": None,
+    "event_time": "2024-01-01T00:00:00+00:00",
+}
+
+
+class NoBackoff:
+    def delay(self) -> float:
+        return 0.0
+
+
+class FakeBot:
+    def __init__(self, upstreams: core.Upstreams) -> None:
+        self.upstreams: core.Upstreams = upstreams
+        self.events: list[tuple[str, tuple[Any, ...]]] = []
+        self.closed: asyncio.Event = asyncio.Event()
+
+    def is_closed(self) -> bool:
+        return self.closed.is_set()
+
+    def dispatch(self, event_name: str, /, *args: Any) -> None:
+        self.events.append((event_name, args))
+
+
+class StandIn:
+    """A local Pythonista API that plays one scripted session per connection."""
+
+    def __init__(self, bot: FakeBot) -> None:
+        self.bot: FakeBot = bot
+        self.received: list[list[dict[str, Any]]] = []
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        received: list[dict[str, Any]] = []
+        self.received.append(received)
+        await ws.send_json({"op": PythonistaAPIOp.hello.value, "heartbeat_interval": 50})
+        received.append(await ws.receive_json())
+
+        session = len(self.received)
+        if session == 1:
+            await ws.send_json({"op": 0, "sequence": 1, "subscription": "dpy_modlog", "payload": MODLOG_EVENT})
+            await ws.send_json({"op": 0, "sequence": 2, "subscription": "dpy_modlog", "payload": {"reason": None}})
+            await ws.send_json({"op": 0, "sequence": 3, "payload": {}})
+            await ws.send_json([1])
+
+            heartbeat = await ws.receive_json()
+            received.append(heartbeat)
+            await ws.send_json({"op": PythonistaAPIOp.heartbeat_ack.value})
+            await ws.send_json({"op": PythonistaAPIOp.reconnect.value})
+        elif session == 2:
+            await ws.send_str("not json")
+        elif session == 3:
+            await ws.send_json({"op": PythonistaAPIOp.invalid_session.value})
+        else:
+            await ws.send_json({"op": 0, "sequence": 1, "subscription": "dpy_modlog", "payload": MODLOG_EVENT})
+            self.bot.closed.set()
+
+        await ws.receive()
+        return ws
+
+
+async def _run_session() -> tuple[FakeBot, StandIn, PythonistaAPIWebsocket]:
+    async with core.Upstreams() as upstreams:
+        bot = FakeBot(upstreams)
+        stand_in = StandIn(bot)
+
+        app = web.Application()
+        app.router.add_get("/ws", stand_in.handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        client = PythonistaAPIWebsocket(
+            bot,  # pyright: ignore[reportArgumentType] # only the parts the client uses
+            url=f"http://127.0.0.1:{port}/ws",
+            token="token",  # noqa: S106 # the stand-in accepts anything
+            subscriptions=["dpy_modlog"],
+        )
+        task = asyncio.create_task(client.connect())
+        try:
+            await asyncio.wait_for(bot.closed.wait(), timeout=10)
+            await client.close()
+            await asyncio.wait_for(task, timeout=10)
+        finally:
+            task.cancel()
+            await runner.cleanup()
+
+    return bot, stand_in, client
+
+
+def test_websocket_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(core.papi, "ExponentialBackoff", NoBackoff)
+
+    bot, stand_in, client = asyncio.run(_run_session())
+
+    first = [session[0] for session in stand_in.received]
+    assert [message["op"] for message in first] == [
+        PythonistaAPIOp.identify.value,
+        PythonistaAPIOp.resume.value,  # after a reconnect request
+        PythonistaAPIOp.resume.value,  # after a frame that wasn't JSON
+        PythonistaAPIOp.identify.value,  # after the session was invalidated
+    ]
+    assert first[0] == {"op": PythonistaAPIOp.identify.value, "token": "token", "subscriptions": ["dpy_modlog"]}
+    # invalid events still move the sequence on, so they aren't replayed.
+    assert first[1]["sequence"] == first[2]["sequence"] == 3
+
+    assert stand_in.received[0][1]["op"] == PythonistaAPIOp.heartbeat.value
+    assert client.latency != float("inf")
+
+    # only the valid events were dispatched, one from the first session and one after identifying again.
+    assert bot.events == [("papi_dpy_modlog", (MODLOG_EVENT,)), ("papi_dpy_modlog", (MODLOG_EVENT,))]
+    assert client.sequence == 1
+
+
+async def _bad_handshakes() -> tuple[int, list[dict[str, Any]]]:
+    connections = 0
+    identified: list[dict[str, Any]] = []
+    ready = asyncio.Event()
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        nonlocal connections
+        connections += 1
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        if connections == 1:
+            await ws.close()  # before HELLO
+            return ws
+        if connections == 2:
+            await ws.send_bytes(b"\x00")
+        elif connections == 3:
+            await ws.send_json({"op": PythonistaAPIOp.hello.value})  # no heartbeat interval
+        elif connections == 4:
+            await ws.send_json([PythonistaAPIOp.hello.value])
+        else:
+            await ws.send_json({"op": PythonistaAPIOp.hello.value, "heartbeat_interval": 60_000})
+            identified.append(await ws.receive_json())
+            ready.set()
+
+        await ws.receive()
+        return ws
+
+    async with core.Upstreams() as upstreams:
+        bot = FakeBot(upstreams)
+        app = web.Application()
+        app.router.add_get("/ws", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+
+        client = PythonistaAPIWebsocket(
+            bot,  # pyright: ignore[reportArgumentType] # only the parts the client uses
+            url=f"http://127.0.0.1:{runner.addresses[0][1]}/ws",
+            token="token",  # noqa: S106 # the stand-in accepts anything
+            subscriptions=[],
+        )
+        task = asyncio.create_task(client.connect())
+        try:
+            await ready.wait()
+
+            # the bot is still running, closing the client alone has to stop it reconnecting.
+            await client.close()
+            await asyncio.wait_for(task, timeout=10)
+        finally:
+            task.cancel()
+            await runner.cleanup()
+
+    return connections, identified
+
+
+def test_bad_handshakes_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(core.papi, "ExponentialBackoff", NoBackoff)
+
+    connections, identified = asyncio.run(asyncio.wait_for(_bad_handshakes(), timeout=20))
+
+    assert connections == 5
+    assert [message["op"] for message in identified] == [PythonistaAPIOp.identify.value]
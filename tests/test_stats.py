@@ -0,0 +1,68 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+from typing import Any
+
+import core
+from core.upstreams import Upstreams
+
+
+class FakePool:
+    def __init__(self, *, closing: bool = False) -> None:
+        self.closing = closing
+        self.queries: list[tuple[str, tuple[Any, ...]]] = []
+
+    def is_closing(self) -> bool:
+        return self.closing
+
+    async def execute(self, query: str, *args: Any) -> str:
+        self.queries.append((query, args))
+        return "INSERT 0 1"
+
+
+def _close(pool: FakePool, /) -> core.Bot:
+    async def run() -> core.Bot:
+        bot = core.Bot()
+        bot.pool = pool  # pyright: ignore[reportAttributeAccessIssue] # only execute and is_closing are used
+        bot.upstreams = Upstreams(None)
+        bot.command_stats.record("command", 0.25)
+        await bot.close()
+        return bot
+
+    return asyncio.run(run())
+
+
+def test_close_writes_pending_command_stats() -> None:
+    pool = FakePool()
+    _close(pool)
+
+    assert len(pool.queries) == 1
+    assert pool.queries[0][1][2] == ["command"]
+
+
+def test_close_skips_command_stats_once_the_pool_is_closing() -> None:
+    pool = FakePool(closing=True)
+    _close(pool)
+
+    assert not pool.queries
@@ -0,0 +1,38 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import pytest
+
+from core.upstreams import UPSTREAMS, Upstreams
+
+
+def test_overrides_replace_the_defaults() -> None:
+    upstreams = Upstreams({"github": {"limit": 20}})  # pyright: ignore[reportArgumentType] # a partial table, like the config
+
+    assert upstreams.settings["github"] == UPSTREAMS["github"]._replace(limit=20)
+    assert upstreams.settings["default"] == UPSTREAMS["default"]
+
+
+def test_unknown_settings_name_the_upstream() -> None:
+    with pytest.raises(ValueError, match=r"HTTP\.github config: limt$"):
+        Upstreams({"github": {"limt": 20}})  # pyright: ignore[reportArgumentType] # the typo is the point
@@ -0,0 +1,93 @@
+"""MIT License
+
+Copyright (c) 2021-Present PythonistaGuild
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import tomllib
+from typing import Any, Literal, NotRequired, TypedDict
+
+import pytest
+from conftest import ROOT
+
+from types_.config import Config
+from types_.papi import ModLogPayload
+from types_.validation import validate
+
+
+class Inner(TypedDict):
+    name: str
+    ratio: float
+
+
+class Outer(TypedDict):
+    kind: Literal[1, 2]
+    inner: Inner
+    tags: list[str]
+    note: str | None
+    extra: NotRequired[int]
+
+
+VALID: dict[str, Any] = {"kind": 1, "inner": {"name": "a", "ratio": 1}, "tags": ["x"], "note": None}
+
+
+def test_valid() -> None:
+    # ints are fine where floats are expected, unknown keys are ignored.
+    assert validate(Outer, {**VALID, "unknown": object()}) == []
+    assert validate(Outer, {**VALID, "extra": 3}) == []
+
+
+@pytest.mark.parametrize(
+    ("changes", "errors"),
+    [
+        ({"kind": 3}, ["$.kind: expected one of 1, 2, got 3"]),
+        ({"kind": True}, ["$.kind: expected one of 1, 2, got True"]),
+        ({"inner": {"name": "a"}}, ["$.inner.ratio: missing required key"]),
+        ({"inner": []}, ["$.inner: expected an object, got list"]),
+        ({"tags": ["x", 1]}, ["$.tags[1]: expected str, got int"]),
+        ({"tags": "x"}, ["$.tags: expected an array, got str"]),
+        ({"note": 1}, ["$.note: expected str | NoneType, got int"]),
+        ({"extra": True}, ["$.extra: expected int, got bool"]),
+    ],
+)
+def test_invalid(changes: dict[str, Any], errors: list[str]) -> None:
+    assert validate(Outer, {**VALID, **changes}) == errors
+
+
+def test_every_error_is_reported() -> None:
+    errors = validate(ModLogPayload, {"moderation_event_type": 1, "guild_id": "1"})
+
+    # required keys come from a set, so the order of those isn't fixed.
+    assert sorted(errors) == [
+        "$.author_id: missing required key",
+        "$.event_time: missing required key",
+        "$.guild_id: expected int, got str",
+        "$.reason: missing required key",
+        "$.target_id: missing required key",
+    ]
+
+
+def test_not_an_object() -> None:
+    assert validate(ModLogPayload, [1]) == ["$: expected an object, got list"]
+
+
+def test_config_template_is_valid() -> None:
+    with (ROOT / "config.template.toml").open("rb") as f:
+        assert validate(Config, tomllib.load(f)) == []
@@ -1,4 +1,4 @@
-from typing import NotRequired, Required, TypedDict
+from typing import Literal, NotRequired, Required, TypedDict
 
 __all__ = ("Config",)
 
@@ -9,6 +9,7 @@ class Tokens(TypedDict, total=False):
     mystbin: str
     github_bot: str
     pythonista: str
+    metrics: str
 
 
 class Database(TypedDict):
@@ -20,6 +21,10 @@ class Logging(TypedDict):
     webhook_avatar_url: NotRequired[str]
     level: int
     runner: NotRequired[int]
+    queue_size: NotRequired[int]
+    overflow_policy: NotRequired[Literal["drop_oldest", "sample"]]
+    format: NotRequired[Literal["text", "json"]]
+    compress: NotRequired[bool]
 
 
 class Snekbox(TypedDict):
@@ -34,14 +39,59 @@ class Suggestions(TypedDict):
     webhook_url: str
 
 
+class PythonistaAPI(TypedDict):
+    websocket_url: str
+    subscriptions: list[str]
+
+
+class Gateway(TypedDict, total=False):
+    profile: Literal["full", "lean", "minimal"]
+    intents: list[str]
+    member_cache: list[str]
+    max_messages: int
+    chunk_guilds_at_startup: bool
+
+
+class Upstream(TypedDict, total=False):
+    limit: int
+    limit_per_host: int
+    connect_timeout: float
+    read_timeout: float
+    total_timeout: float
+    keepalive_timeout: float
+
+
+class Http(TypedDict, total=False):
+    dns_cache_ttl: int
+    keep_warm_interval: float
+    default: Upstream
+    github: Upstream
+    idevision: Upstream
+    snekbox: Upstream
+    badbin: Upstream
+    mystbin: Upstream
+    papi: Upstream
+
+
+class Debug(TypedDict, total=False):
+    flight_recorder_depth: int
+    flight_recorder_sample_rate: int
+    slow_listener_threshold: float
+    loop_stall_threshold: float
+
+
 class Webserver(TypedDict):
     host: str
     port: int
+    mode: NotRequired[Literal["inline", "process"]]
+    workers: NotRequired[int]
+    metrics_port: NotRequired[int]
 
 
 class Config(TypedDict):
     prefix: str
     owner_ids: NotRequired[list[int]]
+    lazy_extensions: NotRequired[bool]
     TOKENS: Tokens
     DATABASE: Database
     LOGGING: Logging
@@ -49,3 +99,7 @@ class Config(TypedDict):
     BADBIN: BadBin
     SUGGESTIONS: NotRequired[Suggestions]
     WEBSERVER: NotRequired[Webserver]
+    PAPI: NotRequired[PythonistaAPI]
+    GATEWAY: NotRequired[Gateway]
+    HTTP: NotRequired[Http]
+    DEBUG: NotRequired[Debug]
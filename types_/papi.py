@@ -1,4 +1,4 @@
-from typing import Generic, Literal, TypedDict, TypeVar
+from typing import Generic, Literal, NotRequired, TypedDict, TypeVar
 
 PayloadT = TypeVar("PayloadT")
 
@@ -10,14 +10,18 @@ class ModLogPayload(TypedDict):
     2. Kick
     3. Mute
     4. Unban
-    5. Helpblock?
+    5. Helpblock
+    6. Generalblock
+    7. Unmute
+    8. Ungeneralblock
+    9. Unhelpblock
     """
 
-    moderation_event_type: Literal[1, 2, 3, 4, 5]
+    moderation_event_type: Literal[1, 2, 3, 4, 5, 6, 7, 8, 9]
     guild_id: int
     target_id: int
     author_id: int
-    reason: str
+    reason: str | None
     event_time: str  # isoformatted datetime
 
 
@@ -28,3 +32,9 @@ class PythonistaAPIWebsocketPayload(TypedDict, Generic[PayloadT]):
     application_name: str
     payload: PayloadT
     user_id: int
+    sequence: NotRequired[int]
+
+
+class PythonistaAPIHelloPayload(TypedDict):
+    op: Literal[10]
+    heartbeat_interval: int  # milliseconds
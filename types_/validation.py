@@ -0,0 +1,81 @@
+import types
+from typing import Any, Literal, TypeVar, Union, get_args, get_origin, get_type_hints, is_typeddict
+
+__all__ = ("validate",)
+
+
+def _type_name(annotation: Any) -> str:
+    return getattr(annotation, "__name__", None) or repr(annotation)
+
+
+def _validate(annotation: Any, value: Any, path: str, errors: list[str]) -> None:
+    if annotation is Any or isinstance(annotation, TypeVar):
+        return
+
+    if is_typeddict(annotation):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object, got {type(value).__name__}")
+            return
+
+        hints = get_type_hints(annotation)
+        errors.extend(f"{path}.{key}: missing required key" for key in annotation.__required_keys__ if key not in value)
+
+        for key, hint in hints.items():
+            if key in value:
+                _validate(hint, value[key], f"{path}.{key}", errors)
+        return
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is Literal:
+        if value not in args or type(value) not in {type(arg) for arg in args}:
+            errors.append(f"{path}: expected one of {', '.join(map(repr, args))}, got {value!r}")
+        return
+
+    if origin in {Union, types.UnionType}:
+        for arg in args:
+            nested: list[str] = []
+            _validate(arg, value, path, nested)
+            if not nested:
+                return
+
+        errors.append(f"{path}: expected {' | '.join(map(_type_name, args))}, got {type(value).__name__}")
+        return
+
+    if origin is list:
+        if not isinstance(value, list):
+            errors.append(f"{path}: expected an array, got {type(value).__name__}")
+            return
+
+        for index, item in enumerate(value):  # pyright: ignore[reportUnknownArgumentType,reportUnknownVariableType] # runtime check
+            _validate(args[0] if args else Any, item, f"{path}[{index}]", errors)
+        return
+
+    if annotation is type(None):
+        if value is not None:
+            errors.append(f"{path}: expected null, got {type(value).__name__}")
+        return
+
+    # bool is a subclass of int, but a JSON `true` is never a valid id.
+    if isinstance(value, bool) and annotation is not bool:
+        errors.append(f"{path}: expected {_type_name(annotation)}, got bool")
+        return
+
+    if annotation is float and isinstance(value, int):
+        return
+
+    expected = origin or annotation
+    if isinstance(expected, type) and not isinstance(value, expected):
+        errors.append(f"{path}: expected {_type_name(annotation)}, got {type(value).__name__}")
+
+
+def validate(typed_dict: type, data: Any, /) -> list[str]:
+    """Validate decoded JSON (or TOML) data against a :class:`~typing.TypedDict` at runtime.
+
+    Returns a list of human readable errors, which is empty if the data is valid.
+    Keys that the TypedDict does not define are ignored.
+    """
+    errors: list[str] = []
+    _validate(typed_dict, data, "$", errors)
+    return errors